@@ -1,14 +1,17 @@
 """This is the core pavilion script.
 It shouldn't be run directly; use bin/pav instead."""
 
+import grp
 import logging
 import os
+import shlex
 import sys
 import traceback
 
 from pavilion import arguments
 from pavilion import commands
 from pavilion import config
+from pavilion import dir_db
 from pavilion import log_setup
 from pavilion import output
 from pavilion import pavilion_variables
@@ -32,6 +35,43 @@ except ImportError:
     )
 
 
+# Set (to the group name) when we've re-run ourselves under the shared group.
+SHARED_GROUP_ENV = 'PAV_SHARED_GROUP'
+
+
+def use_shared_group(pav_cfg):
+    """Re-run this Pavilion command under the configured shared group (via
+    'sg'), so that everything we create belongs to that group. This
+    replaces the current process. Nothing happens if there's no shared group,
+    or we're already running under it."""
+
+    group = pav_cfg['shared_group']
+    if group is None or os.environ.get(SHARED_GROUP_ENV) == group:
+        return
+
+    try:
+        gid = grp.getgrnam(group).gr_gid
+    except KeyError:
+        # The config validation already complains about this.
+        return
+
+    if os.getegid() == gid:
+        return
+
+    os.environ[SHARED_GROUP_ENV] = group
+    cmd = ' '.join(shlex.quote(arg)
+                   for arg in [sys.executable, os.path.abspath(__file__)]
+                   + sys.argv[1:])
+    try:
+        os.execvp('sg', ['sg', group, '-c', cmd])
+    except OSError as err:
+        output.fprint(
+            "Could not switch to shared group '{}', continuing without it: {}"
+            .format(group, err),
+            color=output.YELLOW,
+            file=sys.stderr)
+
+
 def main():
     """Setup Pavilion and run a command."""
 
@@ -56,10 +96,14 @@ def main():
             color=output.RED)
         sys.exit(-1)
 
+    use_shared_group(pav_cfg)
+
     # Create the basic directories in the working directory and the .pavilion
     # directory.
     perm_man = permissions.PermissionsManager(None, pav_cfg['shared_group'],
                                               pav_cfg['umask'])
+    tests_dir = pav_cfg.working_dir/'test_runs'
+    new_tests_dir = not tests_dir.exists()
     for path in [
             config.USER_HOME_PAV,
             config.USER_HOME_PAV/'working_dir',
@@ -80,13 +124,30 @@ def main():
             )
             sys.exit(1)
 
+    # Start a new test_runs directory off with a complete (empty) index, so
+    # it never has to be built by scanning.
+    if new_tests_dir:
+        try:
+            with permissions.PermissionsManager(
+                    tests_dir/dir_db.INDEX_FN, pav_cfg['shared_group'],
+                    pav_cfg['umask']):
+                dir_db.index_init(tests_dir)
+        except (OSError, TimeoutError):
+            # It will be built when it's first used instead.
+            pass
+
     # Setup all the loggers for Pavilion
     if not log_setup.setup_loggers(pav_cfg):
         sys.exit(1)
 
-    # Initialize all the plugins
+    # Initialize the plugins, but only load those for the command we're
+    # running (other plugins are loaded as they're needed). Without a
+    # command, load all the commands so they show up in the help.
     try:
-        plugins.initialize_plugins(pav_cfg)
+        plugins.initialize_plugins(pav_cfg, lazy=True)
+        cmd_name = arguments.find_command_name(sys.argv[1:])
+        if cmd_name is None or not plugins.load_plugins('command', cmd_name):
+            plugins.load_plugins('command')
     except plugins.PluginError as err:
         output.fprint(
             "Error initializing plugins: {}"
@@ -82,3 +82,31 @@ def reset_parser():
     _PAV_PARSER = None
 
     get_parser()
+
+
+def find_command_name(args):
+    """Find the name of the sub-command in the given command line arguments
+    (not including the program name), without fully parsing them. This lets
+    us load just that command's plugin before parsing.
+
+    :param list[str] args: The command line arguments.
+    :returns: The command name, or None if there doesn't seem to be one.
+    :rtype: Union[str, None]
+    """
+
+    parser = get_parser()
+
+    args = iter(args)
+    for arg in args:
+        if arg == '--':
+            return next(args, None)
+        elif arg.startswith('-'):
+            # Skip the values of the base options that take them.
+            action = parser._option_string_actions.get(  # pylint: disable=W0212
+                arg.split('=', 1)[0])
+            if action is not None and action.nargs != 0 and '=' not in arg:
+                next(args, None)
+        else:
+            return arg
+
+    return None
@@ -2,9 +2,11 @@
 the TestBuilder class itself."""
 
 import datetime
+import errno
 import glob
 import hashlib
 import io
+import json
 import logging
 import os
 import shutil
@@ -15,10 +17,13 @@ import threading
 import time
 import urllib.parse
 from collections import defaultdict
+from concurrent.futures import (
+    FIRST_COMPLETED, Future, ThreadPoolExecutor, wait)
 from pathlib import Path
-from typing import Union, List
+from typing import Callable, Dict, Union, List
 
 from pavilion import dir_db
+from pavilion import dir_hash
 from pavilion import extract
 from pavilion import lockfile
 from pavilion import utils
@@ -47,6 +52,7 @@ class MultiBuildTracker:
         self.status = {}
         self.status_files = {}
         self.lock = threading.Lock()
+        self._cache = {}
 
         self.logger = None
         if log:
@@ -69,6 +75,30 @@ class MultiBuildTracker:
         tracker = BuildTracker(builder, self)
         return tracker
 
+    def cached(self, key, compute):
+        """Return the value for the given key, calling compute() to produce
+        it only the first time the key is seen. Builders use this to share
+        hash computations; if another thread is already computing the value
+        for a key, this waits for that result rather than computing it again.
+
+        :param key: A hashable key.
+        :param compute: A function that takes no arguments.
+        """
+
+        with self.lock:
+            future = self._cache.get(key)
+            owner = future is None
+            if owner:
+                future = self._cache[key] = Future()
+
+        if owner:
+            try:
+                future.set_result(compute())
+            except Exception as err:  # pylint: disable=broad-except
+                future.set_exception(err)
+
+        return future.result()
+
     def update(self, builder, note, state=None, log=None):
         """Add a message for the given builder without changes the status.
         :param TestBuilder builder: The builder object to set the message.
@@ -173,6 +203,10 @@ class TestBuilder:
 
     LOG_NAME = "pav_build_log"
 
+    # The maximum number of threads to use when deploying a build to a test
+    # run (limited further by the number of cpus).
+    DEPLOY_THREADS = 16
+
     def __init__(self, pav_cfg, test, mb_tracker, build_name=None):
         """Inititalize the build object.
         :param pav_cfg: The Pavilion config object
@@ -256,34 +290,40 @@ class TestBuilder:
         """Return the last time the build log was updated. Simply returns
         None if the log can't be found or read."""
 
-        # The log will be here during the build.
-        if self.tmp_log_path.exists():
-            try:
-                return self.tmp_log_path.stat().st_mtime
-            except OSError:
-                # This mostly for the race condition, but will also handle
-                # any permission problems.
-                pass
-
-        # After the build, the log will be here.
-        if self.log_path.exists():
-            try:
-                return self.log_path.stat().st_mtime
-            except OSError:
-                return None
+        return build_log_updated(self.path)
 
     def create_build_hash(self):
         """Turn the build config, and everything the build needs, into a hash.
         This includes the build config itself, the source tarball, and all
-        extra files."""
+        extra files. Builders (sharing a build tracker) with identical build
+        scripts and configs share a single hash computation."""
+
+        return self.tracker.tracker.cached(
+            ('build_hash', self._build_hash_key()),
+            self._create_build_hash)
+
+    def _build_hash_key(self) -> str:
+        """Return a canonical key for everything that goes into the build
+        hash, other than the contents of the source and extra files."""
+
+        return json.dumps({
+            'config': self._config,
+            'group': self._group,
+            'umask': self._umask,
+            'script': self._hash_file(self._script_path, save=False).hex(),
+            'suite_path': str(self.test.suite_path),
+        }, sort_keys=True, default=str)
+
+    def _create_build_hash(self):
+        """Actually create the build hash (see create_build_hash)."""
 
         # The hash order is:
         #  - The build script
         #  - The build specificity
         #  - The build group and umask
         #  - The src archive.
-        #    - For directories, the mtime (updated to the time of the most
-        #      recently updated file) is hashed instead.
+        #    - For directories, a hash of the contents of the whole tree
+        #      (see dir_hash).
         #  - All of the build's 'extra_files'
         #  - All files needed to be created at build time 'create_files'
 
@@ -325,7 +365,6 @@ class TestBuilder:
             elif full_path.is_file():
                 hash_obj.update(self._hash_file(full_path))
             elif full_path.is_dir():
-                self._date_dir(full_path)
                 hash_obj.update(self._hash_dir(full_path))
             else:
                 raise TestBuilderError(
@@ -454,9 +493,6 @@ class TestBuilder:
                 "Could not find source '{}'".format(src_path.as_posix()))
 
         if found_src_path.is_dir():
-            # For directories, update the directories mtime to match the
-            # latest mtime in the entire directory.
-            self._date_dir(found_src_path)
             return found_src_path
 
         elif found_src_path.is_file():
@@ -818,28 +854,21 @@ class TestBuilder:
 
             do_copy.update(blob)
 
-        def maybe_symlink_copy(src, dst):
-            """Makes a symlink from src to dst, unless the file is in
-            the list of files to do a regular copy on.
-            """
-
-            if src in do_copy:
-                # Actually copy files that were explicitly asked for.
-                cpy_path = shutil.copy2(src, dst, follow_symlinks=True)
-                base_mode = os.stat(cpy_path).st_mode
-                os.chmod(cpy_path, base_mode | stat.S_IWUSR | stat.S_IWGRP)
-                return cpy_path
-            else:
-                src = os.path.realpath(src)
-                return os.symlink(src, dst)
+        deploy_mode = self._config.get('deploy_mode', 'symlink')
 
-        # Perform a symlink copy of the original build directory into our test
-        # directory.
         try:
-            shutil.copytree(self.path.as_posix(),
-                            dest.as_posix(),
-                            symlinks=True,
-                            copy_function=maybe_symlink_copy)
+            if deploy_mode == 'link_dir':
+                if copy_globs:
+                    self.tracker.error(
+                        state=STATES.BUILD_ERROR,
+                        note="The 'link_dir' build deploy_mode can't be used "
+                             "with 'copy_files'.")
+                    return False
+
+                dest.symlink_to(os.path.realpath(self.path.as_posix()),
+                                target_is_directory=True)
+            else:
+                self._deploy_tree(dest, do_copy, deploy_mode)
         except OSError as err:
             self.tracker.error(
                 state=STATES.BUILD_ERROR,
@@ -859,6 +888,87 @@ class TestBuilder:
 
         return True
 
+    def _deploy_tree(self, dest: Path, do_copy: set, deploy_mode: str):
+        """Recreate the build directory structure at dest, with each file
+        deployed according to deploy_mode (see copy_build). Directories are
+        processed in parallel.
+
+        :param dest: The destination directory (which must not exist).
+        :param do_copy: Paths to files to actually copy.
+        :param deploy_mode: The 'deploy_mode' from the build config.
+        :raises OSError: On failure.
+        """
+
+        # Whether reflinks have failed (for lack of filesystem support).
+        no_reflink = threading.Event()
+
+        def deploy_file(src, dst):
+            """Deploy a single regular file."""
+
+            if src in do_copy:
+                # Actually copy files that were explicitly asked for.
+                shutil.copy2(src, dst, follow_symlinks=True)
+                base_mode = os.stat(dst).st_mode
+                os.chmod(dst, base_mode | stat.S_IWUSR | stat.S_IWGRP)
+                return
+
+            real_src = os.path.realpath(src)
+            if deploy_mode == 'hardlink':
+                try:
+                    os.link(real_src, dst)
+                    return
+                except OSError as err:
+                    if err.errno not in (errno.EXDEV, errno.EPERM,
+                                         errno.EMLINK):
+                        raise
+            elif deploy_mode == 'reflink' and not no_reflink.is_set():
+                try:
+                    utils.reflink(real_src, dst)
+                    return
+                except OSError as err:
+                    if err.errno not in utils.REFLINK_UNSUPPORTED:
+                        raise
+                    no_reflink.set()
+
+            os.symlink(real_src, dst)
+
+        def deploy_dir(src_dir, dst_dir):
+            """Deploy the contents of a single directory. Returns the
+            subdirectories to deploy next."""
+
+            os.mkdir(dst_dir)
+            shutil.copymode(src_dir, dst_dir)
+
+            sub_dirs = []
+            with os.scandir(src_dir) as entries:
+                for entry in entries:
+                    dst = os.path.join(dst_dir, entry.name)
+                    if entry.is_symlink():
+                        os.symlink(os.readlink(entry.path), dst)
+                    elif entry.is_dir():
+                        sub_dirs.append((entry.path, dst))
+                    else:
+                        deploy_file(entry.path, dst)
+
+            return sub_dirs
+
+        threads = min(self.DEPLOY_THREADS, os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            pending = {pool.submit(deploy_dir, self.path.as_posix(),
+                                   dest.as_posix())}
+            try:
+                while pending:
+                    done, pending = wait(pending,
+                                         return_when=FIRST_COMPLETED)
+                    for future in done:
+                        for src_dir, dst_dir in future.result():
+                            pending.add(
+                                pool.submit(deploy_dir, src_dir, dst_dir))
+            except Exception:
+                for future in pending:
+                    future.cancel()
+                raise
+
     def _fix_build_permissions(self, root_path):
         """The files in a build directory should never be writable, but
             directories should be. Users are thus allowed to delete build
@@ -912,6 +1022,17 @@ class TestBuilder:
         """
 
         stat = path.stat()
+        if save:
+            # Don't hash the same (unchanged) file more than once at a time.
+            return self.tracker.tracker.cached(
+                ('file_hash', str(path), stat.st_size, stat.st_mtime_ns),
+                lambda: self._hash_file_uncached(path, stat))
+
+        return self._hash_file_uncached(path, stat, save=False)
+
+    def _hash_file_uncached(self, path, stat, save=True):
+        """Hash the given file, as per _hash_file."""
+
         hash_fn = path.with_name('.' + path.name + '.hash')
 
         # Read the has from the hashfile as long as it was created after
@@ -934,10 +1055,15 @@ class TestBuilder:
         file_hash = hash_obj.digest()
 
         if save:
-            # This should all be under the build lock.
-            with PermissionsManager(hash_fn, self._group, self._umask), \
-                    hash_fn.open('wb') as hash_file:
-                hash_file.write(file_hash)
+            # Write the hash file atomically, so other builders never read a
+            # partial hash.
+            try:
+                with utils.atomic_write(hash_fn, 'wb', self._group,
+                                        self._umask) as hash_file:
+                    hash_file.write(file_hash)
+            except OSError:
+                # The hash file is just a cache.
+                pass
 
         return file_hash
 
@@ -955,17 +1081,23 @@ class TestBuilder:
 
         return hash_obj.digest()
 
-    @staticmethod
-    def _hash_dir(path):
-        """Instead of hashing the files within a directory, we just create a
-            'hash' based on it's name and mtime, assuming we've run _date_dir
-            on it before hand. This produces an arbitrary string, not a hash.
+    def _hash_dir(self, path):
+        """Hash the contents of the given directory. Per-file hashes are
+        cached (in memory and under the working_dir), so only files that
+        have changed since the last time are actually re-read.
         :param Path path: The path to the directory.
-        :returns: The 'hash'
+        :returns: The hash digest.
         """
 
-        dir_stat = path.stat()
-        return '{} {:0.5f}'.format(path, dir_stat.st_mtime).encode()
+        try:
+            return dir_hash.hash_dir(
+                path,
+                manifest_dir=self._pav_cfg.working_dir/dir_hash.MANIFEST_DIR,
+                group=self._group, umask=self._umask)
+        except OSError as err:
+            raise TestBuilderError(
+                "Could not hash source directory '{}': {}"
+                .format(path, err))
 
     @staticmethod
     def _isurl(url):
@@ -1002,24 +1134,6 @@ class TestBuilder:
 
         return None
 
-    @staticmethod
-    def _date_dir(base_path):
-        """Update the mtime of the given directory or path to the the latest
-        mtime contained within.
-        :param Path base_path: The root of the path to evaluate.
-        """
-
-        src_stat = base_path.stat()
-        latest = src_stat.st_mtime
-
-        for path in utils.flat_walk(base_path):
-            dir_stat = path.stat()
-            if dir_stat.st_mtime > latest:
-                latest = dir_stat.st_mtime
-
-        if src_stat.st_mtime != latest:
-            os.utime(base_path.as_posix(), (src_stat.st_atime, latest))
-
     def __hash__(self):
         """Having a comparison operator breaks hashing."""
         return id(self)
@@ -1045,59 +1159,123 @@ class TestBuilder:
         return all(compares)
 
 
-def _get_used_build_paths(tests_dir: Path) -> set:
-    """Generate a set of all build paths currently used by one or more test
-    runs."""
+def build_log_updated(build_path: Path) -> Union[float, None]:
+    """Return the last time the build log for the build at build_path was
+    updated. Simply returns None if the log can't be found or read. This
+    doesn't require a builder object (or the test config needed to make one).
+    """
+
+    # The log will be here during the build.
+    tmp_log_path = build_path.with_suffix('.log')
+    if tmp_log_path.exists():
+        try:
+            return tmp_log_path.stat().st_mtime
+        except OSError:
+            # This mostly for the race condition, but will also handle
+            # any permission problems.
+            pass
+
+    # After the build, the log will be here.
+    log_path = build_path/TestBuilder.LOG_NAME
+    if log_path.exists():
+        try:
+            return log_path.stat().st_mtime
+        except OSError:
+            return None
+
+    return None
+
+
+def build_refcounts(tests_dir: Path) -> Dict[str, int]:
+    """Return the number of test runs using each build, by build name. Test
+    runs record the build they deployed in their attributes (and so in the
+    test run index), so this normally just reads the index. The index is
+    rebuilt first if it isn't current. Test runs without such a record fall
+    back to reading their 'build_origin' symlink."""
+
+    # The test_run module imports this one.
+    from pavilion.test_run import TestAttributes
 
-    used_builds = set()
+    records = dir_db.index_load(tests_dir, TestAttributes.index_record)
+    refcounts = defaultdict(int)
 
-    for path in dir_db.select(tests_dir)[0]:
-        build_origin_symlink = path/'build_origin'
-        build_origin = None
-        if (build_origin_symlink.exists() and
-            build_origin_symlink.is_symlink() and
-                utils.resolve_path(build_origin_symlink).exists()):
-            build_origin = build_origin_symlink.resolve()
+    for name in os.listdir(str(tests_dir)):
+        if not name.isdigit():
+            continue
 
-        if build_origin is not None:
-            used_builds.add(build_origin.name)
+        record = records.get(int(name))
+        if record is not None and record.get('build_origin') is not None:
+            refcounts[record['build_origin']] += 1
+            continue
 
-    return used_builds
+        try:
+            build_origin = os.readlink(os.path.join(str(tests_dir), name,
+                                                    'build_origin'))
+        except OSError:
+            continue
+
+        refcounts[os.path.basename(build_origin.rstrip('/'))] += 1
+
+    return dict(refcounts)
 
 
-def delete_unused(tests_dir: Path, builds_dir: Path, verbose: bool = False) \
+def delete_unused(tests_dir: Path, builds_dir: Path, verbose: bool = False,
+                  threads: int = dir_db.DELETE_THREADS,
+                  progress: Callable[[int, int], None] = None,
+                  group: str = None, umask: int = None) \
         -> (int, List[str]):
     """Delete all the build directories, that are unused by any test run.
+    Unused builds are moved to the trash under the builds lock, and then
+    removed in parallel.
 
     :param tests_dir: The test_runs directory path object.
     :param builds_dir: The builds directory path object.
     :param verbose: Print
+    :param threads: The number of threads to remove builds with.
+    :param progress: As per dir_db.remove_paths.
+    :param group: As per dir_db.move_to_trash.
+    :param umask: As per dir_db.move_to_trash.
 
     :return int count: The number of builds that were removed.
 
     """
 
-    used_build_paths = _get_used_build_paths(tests_dir)
+    used_builds = build_refcounts(tests_dir)
 
     def filter_builds(build_path: Path) -> bool:
         """Return whether a build is not used."""
-        return build_path.name not in used_build_paths
+        return build_path.name not in used_builds
 
     count = 0
 
+    trash_dir = builds_dir.parent/dir_db.TRASH_DIR
     lock_path = builds_dir.with_suffix('.lock')
     msgs = []
+    trashed = []
     with lockfile.LockFile(lock_path):
         for path in dir_db.select(builds_dir, filter_builds, fn_base=16)[0]:
             try:
-                shutil.rmtree(path.as_posix())
                 path.with_suffix(TestBuilder.FINISHED_SUFFIX).unlink()
+            except FileNotFoundError:
+                pass
             except OSError as err:
                 msgs.append("Could not remove build {}: {}"
                             .format(path, err))
                 continue
+
+            try:
+                trashed.append(dir_db.move_to_trash(path, trash_dir,
+                                                    group, umask))
+            except OSError:
+                try:
+                    shutil.rmtree(path.as_posix())
+                except OSError as err:
+                    msgs.append("Could not remove build {}: {}"
+                                .format(path, err))
+                    continue
             count += 1
             if verbose:
                 msgs.append('Removed build {}.'.format(path.name))
 
+    msgs.extend(dir_db.remove_paths(trashed, threads, progress))
     return count, msgs
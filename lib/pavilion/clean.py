@@ -1,44 +1,87 @@
 """Provides utility functions for deleting Pavilion working_dir files."""
 
+import os
 from pathlib import Path
+from typing import Callable
 
 from pavilion import builder
 from pavilion import dir_db
-from pavilion import utils
+from pavilion import series_summary
 from pavilion import test_run
 
+ProgressFunc = Callable[[int, int], None]
 
-def delete_tests(id_dir: Path, filter_func, verbose: bool = False):
+
+def delete_tests(id_dir: Path, filter_func, verbose: bool = False,
+                 threads: int = dir_db.DELETE_THREADS,
+                 progress: ProgressFunc = None,
+                 group: str = None, umask: int = None):
     """Delete tests using the dir_db 'filter' function"""
 
     if filter_func is None:
-        filter_func = dir_db.default_filter
+        # There's no need to deserialize anything to delete everything.
+        return dir_db.delete(id_dir, dir_db.default_filter,
+                             from_index=lambda path, record: path,
+                             verbose=verbose, threads=threads,
+                             progress=progress, group=group, umask=umask)
+
     return dir_db.delete(id_dir, filter_func,
                          transform=test_run.TestAttributes,
-                         verbose=verbose)
+                         from_index=test_run.TestAttributes.from_index,
+                         index_record=test_run.TestAttributes.index_record,
+                         verbose=verbose, threads=threads, progress=progress,
+                         group=group, umask=umask)
 
 
-def delete_series(id_dir: Path, verbose: bool = False) -> int:
+def delete_series(id_dir: Path, verbose: bool = False,
+                  threads: int = dir_db.DELETE_THREADS,
+                  progress: ProgressFunc = None,
+                  group: str = None, umask: int = None) -> int:
     """Delete series if all associated tests have been deleted."""
 
+    # Series link to each of their tests under the test's id, so we only
+    # need to know which test ids exist.
+    tests_dir = id_dir.parent/'test_runs'
+    try:
+        test_ids = set(name for name in os.listdir(str(tests_dir))
+                       if name.isdigit())
+    except OSError:
+        test_ids = set()
+
     def filter_series(path: Path) -> bool:
         """Return True if the series does not have any valid symlinked tests.
-        """
-        for test_path in path.iterdir():
-            if (test_path.is_symlink() and
-                test_path.exists() and
-                    utils.resolve_path(test_path).exists()):
-                return False
-        return True
+        Series that are kept have their deleted tests dropped from their
+        summary."""
+
+        names = [name for name in os.listdir(str(path)) if name.isdigit()]
+        deleted = [name for name in names if name not in test_ids]
+        if len(deleted) == len(names):
+            return True
+
+        if deleted:
+            series_summary.update_tests(
+                path, {int(name): None for name in deleted}, group, umask)
+        return False
 
-    return dir_db.delete(id_dir, filter_series, verbose=verbose)
+    return dir_db.delete(id_dir, filter_series, verbose=verbose,
+                         threads=threads, progress=progress,
+                         group=group, umask=umask)
 
 
-def delete_builds(builds_dir: Path, tests_dir: Path, verbose: bool = False):
+def delete_builds(builds_dir: Path, tests_dir: Path, verbose: bool = False,
+                  threads: int = dir_db.DELETE_THREADS,
+                  progress: ProgressFunc = None,
+                  group: str = None, umask: int = None):
     """Delete all build directories that are unused by any test run.
     :param builds_dir: Path to the pavilion builds directory.
     :param tests_dir: Path to the pavilion test_runs directory.
     :param verbose: Bool to determine if verbose output or not.
+    :param threads: The number of threads to remove builds with.
+    :param progress: As per dir_db.remove_paths.
+    :param group: The group to give the trash directory, if it's created.
+    :param umask: The umask to apply to the trash directory, if it's created.
     """
 
-    return builder.delete_unused(tests_dir, builds_dir, verbose)
+    return builder.delete_unused(tests_dir, builds_dir, verbose,
+                                 threads=threads, progress=progress,
+                                 group=group, umask=umask)
@@ -3,13 +3,18 @@ multiple commands."""
 
 import argparse
 import errno
+import itertools
 import logging
+import multiprocessing
 import pathlib
 import threading
 import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 from io import StringIO
 from pathlib import Path
-from typing import Dict, List, Union, TextIO
+from typing import (Dict, Iterable, Iterator, List, Sized, TextIO, Tuple,
+                    Union)
 
 from pavilion import commands
 from pavilion import dir_db
@@ -24,6 +29,12 @@ from pavilion.test_run import TestAttributes, TestConfigError, TestRunError, \
 
 LOGGER = logging.getLogger(__name__)
 
+# The maximum number of test runs to create at once.
+CREATE_TEST_THREADS = 8
+# The maximum number of test configs to take in ahead of the test runs
+# created from them being used.
+CREATE_TEST_WINDOW = CREATE_TEST_THREADS*8
+
 
 def arg_filtered_tests(pav_cfg, args: argparse.Namespace) -> List[int]:
     """Search for test runs that match based on the argument values in args,
@@ -85,6 +96,8 @@ def arg_filtered_tests(pav_cfg, args: argparse.Namespace) -> List[int]:
         tests = dir_db.select(
             id_dir=pav_cfg.working_dir / 'test_runs',
             transform=TestAttributes,
+            from_index=TestAttributes.from_index,
+            index_record=TestAttributes.index_record,
             filter_func=filter_func,
             order_func=order_func,
             order_asc=order_asc,
@@ -152,6 +165,20 @@ def get_test_configs(
     :param outfile: Where to print user error messages.
     """
 
+    return list(iter_test_configs(pav_cfg, host, test_files, tests, modes,
+                                  overrides, outfile))
+
+
+def iter_test_configs(
+        pav_cfg, host: str, test_files: List[Union[str, Path]],
+        tests: List[str], modes: List[str], overrides: Dict[str, str],
+        outfile: TextIO = StringIO()) -> Iterator[test_config.ProtoTest]:
+    """As per get_test_configs, but generate each resolved configuration as
+    soon as it's ready.
+
+    :raises commands.CommandError: While iterating, on any errors.
+    """
+
     resolver = test_config.TestConfigResolver(pav_cfg)
 
     tests = list(tests)
@@ -167,7 +194,7 @@ def get_test_configs(
                 "Could not read test file {}: {}".format(file, err))
 
     try:
-        resolved_cfgs = resolver.load(
+        yield from resolver.iter_load(
             tests,
             host,
             modes,
@@ -177,11 +204,9 @@ def get_test_configs(
     except TestConfigError as err:
         raise commands.CommandError(err.args[0])
 
-    return resolved_cfgs
-
 
 def configs_to_tests(
-        pav_cfg, proto_tests: List[test_config.ProtoTest],
+        pav_cfg, proto_tests: Iterable[test_config.ProtoTest],
         mb_tracker: Union[MultiBuildTracker, None] = None,
         build_only: bool = False, rebuild: bool = False,
         outfile: TextIO = None) -> List[TestRun]:
@@ -189,33 +214,29 @@ def configs_to_tests(
     tests.
 
     :param pav_cfg: The Pavilion config
-    :param proto_tests: A list of test configs.
+    :param proto_tests: The test configs. These may be generated.
     :param mb_tracker: The build tracker.
     :param build_only: Whether to only build these tests.
     :param rebuild: After figuring out what build to use, rebuild it.
     :param outfile: Output file for printing messages
     """
 
-    test_list = []
-    progress = 0
-    tot_tests = len(proto_tests)
+    tot_tests = None
+    if isinstance(proto_tests, Sized):
+        tot_tests = len(proto_tests)
 
-    for ptest in proto_tests:
-        try:
-            test_list.append(TestRun(
-                pav_cfg=pav_cfg,
-                config=ptest.config,
-                var_man=ptest.var_man,
-                build_tracker=mb_tracker,
-                build_only=build_only,
-                rebuild=rebuild
-            ))
-            progress += 1.0/tot_tests
-            if outfile is not None:
-                output.fprint("Creating Test Runs: {:.0%}".format(progress),
-                              file=outfile, end='\r')
-        except (TestRunError, TestConfigError) as err:
-            raise commands.CommandError(err)
+    test_list = []
+    for test in iter_configs_to_tests(pav_cfg, proto_tests, mb_tracker,
+                                      build_only, rebuild):
+        test_list.append(test)
+
+        if outfile is not None:
+            if tot_tests:
+                progress = "{:.0%}".format(len(test_list)/tot_tests)
+            else:
+                progress = len(test_list)
+            output.fprint("Creating Test Runs: {}".format(progress),
+                          file=outfile, end='\r')
 
     if outfile is not None:
         output.fprint('', file=outfile)
@@ -223,26 +244,168 @@ def configs_to_tests(
     return test_list
 
 
+def iter_configs_to_tests(
+        pav_cfg, proto_tests: Iterable[test_config.ProtoTest],
+        mb_tracker: Union[MultiBuildTracker, None] = None,
+        build_only: bool = False, rebuild: bool = False) \
+        -> Iterator[TestRun]:
+    """Generate a test run for each of the given configs/var_man tuples, in
+    order. Test runs are created in a pool of threads. Only up to
+    CREATE_TEST_WINDOW configs are taken from proto_tests ahead of the test
+    run being consumed, so a (lazily generated) stream of configs never
+    has to be held in memory all at once.
+
+    :param pav_cfg: The Pavilion config
+    :param proto_tests: The test configs.
+    :param mb_tracker: The build tracker.
+    :param build_only: Whether to only build these tests.
+    :param rebuild: After figuring out what build to use, rebuild it.
+    :raises commands.CommandError: While iterating, when a test run can't
+        be created.
+    """
+
+    if mb_tracker is None:
+        # Share a tracker, so that tests with identical builds share
+        # their build hash computations.
+        mb_tracker = MultiBuildTracker(log=False)
+
+    def make_test(ptest, reserved_dir):
+        """Create a single test run."""
+
+        return TestRun(
+            pav_cfg=pav_cfg,
+            config=ptest.config,
+            var_man=ptest.var_man,
+            build_tracker=mb_tracker,
+            build_only=build_only,
+            rebuild=rebuild,
+            reserved_dir=reserved_dir,
+        )
+
+    proto_tests = iter(proto_tests)
+    # The (future, reserved_dir) of each test being created, in order.
+    pending = deque()
+    configs_done = False
+
+    # Creating a test run mostly involves writing files and hashing its build,
+    # so this is largely I/O bound.
+    try:
+        with ThreadPoolExecutor(max_workers=CREATE_TEST_THREADS) as pool:
+            try:
+                while True:
+                    # Keep up to CREATE_TEST_WINDOW tests pending. Configs
+                    # are taken a thread pool's worth at a time, and have
+                    # their test directories reserved together.
+                    if (not configs_done and len(pending) + CREATE_TEST_THREADS
+                            <= CREATE_TEST_WINDOW):
+                        batch = list(itertools.islice(
+                            proto_tests, CREATE_TEST_THREADS))
+                        if not batch:
+                            configs_done = True
+                        else:
+                            reserved_dirs = _reserve_test_dirs(pav_cfg, batch)
+                            for ptest, reserved_dir in zip(batch,
+                                                           reserved_dirs):
+                                pending.append((
+                                    pool.submit(make_test, ptest,
+                                                reserved_dir),
+                                    reserved_dir))
+
+                    if not pending:
+                        break
+
+                    future, _ = pending[0]
+                    try:
+                        test = future.result()
+                    except (TestRunError, TestConfigError) as err:
+                        raise commands.CommandError(err)
+
+                    pending.popleft()
+                    yield test
+            finally:
+                for future, _ in pending:
+                    future.cancel()
+    finally:
+        # Don't leave empty test run directories behind if we failed part
+        # way through, and don't leave tests we created but never handed
+        # out waiting to run.
+        for future, (_, path) in pending:
+            if future.cancelled() or future.exception() is not None:
+                try:
+                    path.rmdir()
+                except OSError:
+                    pass
+            else:
+                test = future.result()
+                test.status.set(STATES.ABORTED,
+                                "Test creation was cancelled.")
+                test.set_run_complete()
+
+
+def _reserve_test_dirs(pav_cfg, proto_tests: List[test_config.ProtoTest]) \
+        -> List[Tuple[int, Path]]:
+    """Reserve a test run directory for each of the given tests. Tests that
+    share a group and umask have their directories reserved together, under
+    a single acquisition of the test run id lock.
+
+    :returns: A list of (id, path) tuples, in the same order as proto_tests.
+    :raises commands.CommandError: When the directories can't be created.
+    """
+
+    tests_path = pav_cfg.working_dir/'test_runs'
+
+    by_perms = defaultdict(list)
+    for i, ptest in enumerate(proto_tests):
+        try:
+            perms = TestRun.get_permissions(pav_cfg, ptest.config)
+        except TestConfigError as err:
+            raise commands.CommandError(err)
+        by_perms[perms].append(i)
+
+    reserved_dirs = [None] * len(proto_tests)
+    for (group, umask), indices in by_perms.items():
+        try:
+            id_dirs = dir_db.create_id_dirs(tests_path, group, umask,
+                                            count=len(indices), index=True)
+        except (OSError, TimeoutError) as err:
+            for id_dir in reserved_dirs:
+                if id_dir is not None:
+                    try:
+                        id_dir[1].rmdir()
+                    except OSError:
+                        pass
+            raise commands.CommandError(
+                "Could not create test run directories: {}".format(err))
+
+        for i, id_dir in zip(indices, id_dirs):
+            reserved_dirs[i] = id_dir
+
+    return reserved_dirs
+
+
 BUILD_STATUS_PREAMBLE = '{when:20s} {test_id:6} {state:{state_len}s}'
 BUILD_SLEEP_TIME = 0.1
 
 
-def build_local(tests: List[TestRun],
+def build_local(tests: Iterable[TestRun],
                 mb_tracker: MultiBuildTracker,
                 max_threads: int = 4,
                 build_verbosity: int = 0,
                 outfile: TextIO = StringIO(),
                 errfile: TextIO = StringIO()):
     """Build all tests that request for their build to occur on the
-    kickoff host.
+    kickoff host. Tests are taken from the given iterable as build threads
+    free up, so builds can start while later tests are still being created.
 
-    :param tests: The list of tests to potentially build.
+    :param tests: The tests to potentially build. These may be generated.
     :param max_threads: Maximum number of build threads to start.
     :param build_verbosity: How much info to print during building.
         0 - Quiet, 1 - verbose, 2+ - very verbose
     :param mb_tracker: The tracker for all builds.
     :param outfile: Where to print user messages.
     :param errfile: Where to print user error messages.
+    :raises Exception: Anything raised while getting the next test is
+        re-raised, after the running builds are cancelled.
     """
 
     test_threads = []   # type: List[Union[threading.Thread, None]]
@@ -250,16 +413,10 @@ def build_local(tests: List[TestRun],
 
     cancel_event = threading.Event()
 
-    # Generate new build names for each test that is rebuilding.
-    # We do this here, even for non_local tests, because otherwise the
-    # non-local tests can't tell what was built fresh either on a
-    # front-end or by other tests rebuilding on nodes.
-    for test in tests:
-        if test.rebuild and test.builder.exists():
-            test.builder.deprecate()
-            test.builder.rename_build()
-            test.build_name = test.builder.name
-            test.save_attributes()
+    tests_iter = iter(tests)
+    # Every test we've taken so far.
+    tests = []
+    tests_done = False
 
     # We don't want to start threads that are just going to wait on a lock,
     # so we'll rearrange the builds so that the uniq build names go first.
@@ -269,7 +426,26 @@ def build_local(tests: List[TestRun],
     # If we've seen a build name, the build can go later.
     seen_build_names = set()
 
-    for test in tests:
+    # Keep track of what the last message printed per build was.
+    # This is for double build verbosity.
+    message_counts = {}
+
+    def add_test(test):
+        """Queue the given test for building."""
+
+        tests.append(test)
+        message_counts[test.id] = 0
+
+        # Generate new build names for each test that is rebuilding.
+        # We do this here, even for non_local tests, because otherwise the
+        # non-local tests can't tell what was built fresh either on a
+        # front-end or by other tests rebuilding on nodes.
+        if test.rebuild and test.builder.exists():
+            test.builder.deprecate()
+            test.builder.rename_build()
+            test.build_name = test.builder.name
+            test.save_attributes()
+
         if not test.build_local:
             remote_builds.append(test)
         elif test.builder.name not in seen_build_names:
@@ -278,10 +454,6 @@ def build_local(tests: List[TestRun],
         else:
             build_order.insert(0, test)
 
-    # Keep track of what the last message printed per build was.
-    # This is for double build verbosity.
-    message_counts = {test.id: 0 for test in tests}
-
     # Used to track which threads are for which tests.
     test_by_threads = {}
 
@@ -297,7 +469,21 @@ def build_local(tests: List[TestRun],
     # to the verbosity level. As threads finish, new ones are started until
     # either all builds complete or a build fails, in which case all tests
     # are aborted.
-    while build_order or test_threads:
+    while build_order or test_threads or not tests_done:
+        # Take in more tests while there are build threads to spare.
+        while (not tests_done and not cancel_event.is_set()
+               and len(build_order) + builds_running < max_threads):
+            try:
+                add_test(next(tests_iter))
+            except StopIteration:
+                tests_done = True
+            except Exception:
+                # Stop the builds we've started before passing on the error.
+                cancel_event.set()
+                for thread in test_threads:
+                    thread.join()
+                raise
+
         # Start a new thread if we haven't hit our limit.
         if build_order and builds_running < max_threads:
             test = build_order.pop()
@@ -308,6 +494,7 @@ def build_local(tests: List[TestRun],
             )
             test_threads.append(test_thread)
             test_by_threads[test_thread] = test
+            builds_running += 1
             test_thread.start()
 
         # Check if all our threads are alive, and join those that aren't.
@@ -396,3 +583,132 @@ def build_local(tests: List[TestRun],
         output.fprint(width=None, file=outfile)
 
     return 0
+
+
+# The pav_cfg for regather worker processes.
+_REGATHER_PAV_CFG = None
+
+
+def regather_results(pav_cfg, tests: List[TestRun], jobs: int = 1,
+                     log_file: TextIO = None, outfile: TextIO = None) \
+        -> List[Union[str, None]]:
+    """Re-gather the results for each of the given tests using the (already
+    updated) result configs in each test object. The new results are
+    attached to each test object, but nothing is saved. Results are gathered
+    in up to 'jobs' worker processes, as result parsing and evaluation is
+    CPU bound.
+
+    :param pav_cfg: The pavilion config.
+    :param tests: The tests to regather results for.
+    :param jobs: The maximum number of processes to use.
+    :param log_file: Where to write the result logs, in test order.
+    :param outfile: Where to print progress. Not printed if None.
+    :returns: A list of the errors (or None) for each test, in order.
+    """
+
+    work = [(test.id, test.config['result_parse'],
+             test.config['result_evaluate'],
+             test.results.get('return_value', 1), log_file is not None)
+            for test in tests]
+
+    gathered = [None] * len(tests)
+    done = 0
+
+    def progress():
+        """Print how many tests have been regathered."""
+
+        nonlocal done
+        done += 1
+        if outfile is not None and len(tests) > 1:
+            output.fprint("Gathered results for {}/{} tests."
+                          .format(done, len(tests)),
+                          file=outfile, end='\r', width=None)
+
+    pool = None
+    if jobs > 1 and len(tests) > 1:
+        try:
+            # Forked workers inherit our loaded plugins.
+            context = multiprocessing.get_context('fork')
+            pool = context.Pool(processes=min(jobs, len(tests)),
+                                initializer=_init_regather_worker,
+                                initargs=(pav_cfg,))
+        except (ValueError, OSError) as err:
+            LOGGER.warning("Could not start result gathering processes, "
+                           "gathering results serially: %s", err)
+
+    if pool is None:
+        for i, test in enumerate(tests):
+            gathered[i] = _regather(test, *work[i][3:])
+            progress()
+    else:
+        try:
+            for i, res in pool.imap_unordered(_regather_worker,
+                                              enumerate(work)):
+                gathered[i] = res
+                progress()
+        finally:
+            pool.terminate()
+            pool.join()
+
+    if outfile is not None and len(tests) > 1:
+        output.fprint(width=None, file=outfile)
+
+    errors = []
+    for test, (results, log, error) in zip(tests, gathered):
+        if results is not None:
+            test.results = results
+        if log_file is not None:
+            log_file.write(log)
+        errors.append(error)
+
+    return errors
+
+
+def _init_regather_worker(pav_cfg):
+    """Set the pav_cfg for a regather worker process."""
+
+    global _REGATHER_PAV_CFG  # pylint: disable=global-statement
+
+    _REGATHER_PAV_CFG = pav_cfg
+
+
+def _regather_worker(item: Tuple[int, tuple]) -> Tuple[int, tuple]:
+    """Load the test with the given id and regather its results, with its
+    result configs replaced with those given."""
+
+    i, (test_id, result_parse, result_evaluate, return_value, want_log) = item
+
+    try:
+        test = TestRun.load(_REGATHER_PAV_CFG, test_id)
+    except Exception as err:  # pylint: disable=broad-except
+        return i, (None, '', "Could not load test {}: {}"
+                   .format(test_id, err))
+
+    test.config['result_parse'] = result_parse
+    test.config['result_evaluate'] = result_evaluate
+
+    return i, _regather(test, return_value, want_log)
+
+
+def _regather(test: TestRun, return_value: int, want_log: bool) \
+        -> Tuple[Union[dict, None], str, Union[str, None]]:
+    """Regather the results of the given test.
+
+    :returns: The results (or None on error), the result log (if wanted),
+        and the error message (or None).
+    """
+
+    log_file = StringIO() if want_log else None
+
+    try:
+        results = test.gather_results(return_value, regather=True,
+                                      log_file=log_file)
+        error = None
+    except Exception as err:  # pylint: disable=broad-except
+        results = None
+        error = "Error gathering results for test {}: {}".format(
+            test.name, err)
+
+    log = log_file.getvalue() if log_file is not None else ''
+
+    return results, log, error
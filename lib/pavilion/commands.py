@@ -57,6 +57,11 @@ def get_command(command_name):
     """
     global _COMMANDS
 
+    if command_name not in _COMMANDS:
+        # The command's plugin may not have been loaded yet.
+        from pavilion import plugins
+        plugins.load_plugins('command', command_name)
+
     return _COMMANDS[command_name]
 
 
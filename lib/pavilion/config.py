@@ -163,6 +163,11 @@ class PavilionConfigLoader(yc.YamlConfigLoader):
             help_text="Maximum simultaneous builds. Note that each build may "
                       "itself spawn off threads/processes, so it's probably "
                       "reasonable to keep this at just a few."),
+        yc.IntRangeElem(
+            "schedule_threads", default=8, vmin=1,
+            help_text="Maximum simultaneous job submissions when scheduling "
+                      "tests. Each scheduler may additionally limit how "
+                      "quickly jobs are submitted to it."),
         yc.StrElem(
             "log_format",
             default="{asctime}, {levelname}, {hostname}, {name}: {message}",
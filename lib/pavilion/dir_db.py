@@ -1,18 +1,46 @@
 """Manage 'id' directories. The name of the directory is an integer, which
 essentially serves as a filesystem primary key."""
 
+import json
+import logging
 import os
 import shutil
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Callable, List, Iterable, Any
+from typing import Callable, List, Iterable, Any, Dict, Union, Tuple
 
 from pavilion import lockfile
 from pavilion import permissions
+from pavilion import utils
+
+LOGGER = logging.getLogger('pav.' + __name__)
 
 ID_DIGITS = 7
 ID_FMT = '{id:0{digits}d}'
 
 PKEY_FN = 'next_id'
+ID_LOCK_FN = '.lockfile'
+# How long to wait on the id lock. Batch id reservations can hold the lock
+# for a while.
+ID_LOCK_TIMEOUT = 10
+
+INDEX_FN = '.index'
+INDEX_LOCK_FN = '.index.lockfile'
+# How long to wait on the index lock before giving up on an index update.
+INDEX_LOCK_TIMEOUT = 3
+# Compact the index once it holds this many more lines than live records.
+INDEX_COMPACT_SLACK = 1000
+# Each update the index misses leaves a mark in this directory, until the
+# index is rebuilt.
+INDEX_DIRTY_DIR = '.index.dirty'
+INDEX_VERSION = 1
+
+# Deleted directories are moved here (relative to the parent of their id
+# directory) before they're actually removed.
+TRASH_DIR = 'trash'
+# How many threads to remove deleted directories with.
+DELETE_THREADS = 8
 
 
 def make_id_path(base_path, id_) -> Path:
@@ -31,14 +59,15 @@ def reset_pkey(id_dir: Path) -> None:
     """Reset the the 'next_id' for the given directory by deleting
     the pkey file ('next_id') if present."""
 
-    with lockfile.LockFile(id_dir/'.lockfile', timeout=1):
+    with lockfile.LockFile(id_dir/ID_LOCK_FN, timeout=ID_LOCK_TIMEOUT):
         try:
             (id_dir/PKEY_FN).unlink()
         except OSError:
             pass
 
 
-def create_id_dir(id_dir: Path, group: str, umask: int) -> (int, Path):
+def create_id_dir(id_dir: Path, group: str, umask: int,
+                  index: bool = False) -> (int, Path):
     """In the given directory, create the lowest numbered (positive integer)
     directory that doesn't already exist.
 
@@ -46,57 +75,119 @@ def create_id_dir(id_dir: Path, group: str, umask: int) -> (int, Path):
         directories
     :param group: The group owner for this path.
     :param umask: The umask to apply to this path.
+    :param index: As per create_id_dirs.
     :returns: The id and path to the created directory.
     :raises OSError: on directory creation failure.
     :raises TimeoutError: If we couldn't get the lock in time.
 """
 
-    lockfile_path = id_dir/'.lockfile'
-    with lockfile.LockFile(lockfile_path, timeout=1):
-        next_fn = id_dir/PKEY_FN
+    return create_id_dirs(id_dir, group, umask, count=1, index=index)[0]
 
-        next_valid = True
 
-        if next_fn.exists():
-            try:
-                with next_fn.open() as next_file:
-                    next_id = int(next_file.read())
+def create_id_dirs(id_dir: Path, group: str, umask: int,
+                   count: int, index: bool = False) -> List[Tuple[int, Path]]:
+    """Create 'count' new id directories in the given directory, under a
+    single acquisition of the id lock. Ids are allocated lowest first, as
+    per create_id_dir.
+
+    The 'next_id' pkey file normally gives the next free id directly. When
+    it's missing (such as after a delete) the directory is listed once, and
+    free ids are found by searching the gaps in that set of ids. The pkey
+    file is always left pointing at a free id, so that subsequent
+    allocations don't have to list the directory again.
+
+    :param id_dir: Path to the directory that contains these 'id'
+        directories
+    :param group: The group owner for these paths.
+    :param umask: The umask to apply to these paths.
+    :param count: The number of id directories to create.
+    :param index: Give each new directory an (empty) record in the id_dir's
+        index, so the index continues to cover every directory.
+    :returns: A list of (id, path) tuples for the created directories.
+    :raises OSError: on directory creation failure.
+    :raises TimeoutError: If we couldn't get the lock in time.
+    """
 
-                next_id_path = make_id_path(id_dir, next_id)
+    reserved = []
 
-                if next_id_path.exists():
-                    next_valid = False
+    with lockfile.LockFile(id_dir/ID_LOCK_FN, timeout=ID_LOCK_TIMEOUT):
+        next_fn = id_dir/PKEY_FN
 
-            except (OSError, ValueError):
-                # In either case, on failure, invalidate the next file.
-                next_valid = False
+        next_id = _read_pkey(id_dir)
+        if next_id is None:
+            # Find the free ids the hard way.
+            used_ids = set(int(name) for name in os.listdir(str(id_dir))
+                           if name.isdigit())
         else:
-            next_valid = False
+            # Trust the pkey file. We'll still notice ids that exist
+            # anyway when we try to create them.
+            used_ids = set()
+            next_id = max(next_id, 1)
 
-        if not next_valid:
-            # If the next file's id wasn't valid, then find the next available
-            # id directory the hard way.
+        # Nothing above this id is in use, so we don't have to check the set.
+        high_water = max(used_ids, default=0)
 
-            ids = list(os.listdir(str(id_dir)))
-            # Only return the test directories that could be integers.
-            ids = [id_ for id_ in ids if id_.isdigit()]
-            ids = [int(id_) for id_ in ids]
-            ids.sort()
+        def next_free(id_):
+            """Find the first free id at or above id_."""
+            while id_ <= high_water and id_ in used_ids:
+                id_ += 1
+            return id_
 
-            # Find the first unused id.
-            next_id = 1
-            while next_id in ids:
-                next_id += 1
+        next_id = next_free(1 if next_id is None else next_id)
 
+        perms = permissions.PermissionsManager(None, group, umask)
+        while len(reserved) < count:
             next_id_path = make_id_path(id_dir, next_id)
+            try:
+                next_id_path.mkdir()
+            except FileExistsError:
+                # Someone created this outside of the lock.
+                next_id = next_free(next_id + 1)
+                continue
+
+            _set_perms(perms, next_id_path)
+            reserved.append((next_id, next_id_path))
+            next_id = next_free(next_id + 1)
+
+        with next_fn.open('w') as next_file:
+            next_file.write(str(next_id))
+        _set_perms(perms, next_fn)
+
+        if index:
+            _index_append(id_dir, [{'id': id_, 'record': {}}
+                                   for id_, _ in reserved])
+
+    return reserved
+
 
-        with permissions.PermissionsManager(next_id_path, group, umask), \
-                permissions.PermissionsManager(next_fn, group, umask):
-            next_id_path.mkdir()
-            with next_fn.open('w') as next_file:
-                next_file.write(str(next_id + 1))
+def _set_perms(perms: permissions.PermissionsManager, path: Path) -> None:
+    """Set the permissions on a single (non-recursive) path, logging any
+    failures as the permissions manager context would."""
 
-        return next_id, next_id_path
+    try:
+        perms.set_perms(path)
+    except OSError as err:
+        LOGGER.warning("Could not set permissions for path '%s': %s",
+                       path, err)
+
+
+def _read_pkey(id_dir: Path) -> Union[int, None]:
+    """Return the id from the pkey file, or None if it's missing, invalid,
+    or refers to a directory that already exists."""
+
+    next_fn = id_dir/PKEY_FN
+
+    try:
+        with next_fn.open() as next_file:
+            next_id = int(next_file.read())
+    except (OSError, ValueError):
+        # In either case, on failure, invalidate the next file.
+        return None
+
+    if make_id_path(id_dir, next_id).exists():
+        return None
+
+    return next_id
 
 
 def default_filter(_: Path) -> bool:
@@ -105,30 +196,342 @@ def default_filter(_: Path) -> bool:
     return True
 
 
+def index_init(id_dir: Path) -> None:
+    """Write an empty (and complete) index for a newly created id_dir, so
+    that it never needs to be rebuilt.
+
+    :raises OSError: When the index can't be written.
+    """
+
+    with lockfile.LockFile(id_dir/INDEX_LOCK_FN, timeout=INDEX_LOCK_TIMEOUT):
+        if not (id_dir/INDEX_FN).exists():
+            _index_write(id_dir, {})
+
+
+def index_update(id_dir: Path, id_: int, record: dict) -> bool:
+    """Record the (json serializable) record for the given id in the id_dir's
+    index. The index is append only; later records for an id replace
+    earlier ones.
+
+    :param id_dir: The directory that contains the id directories.
+    :param id_: The id of the directory the record describes.
+    :param record: The data to save.
+    :returns: False if the index couldn't be updated. The failure is logged,
+        and the index is marked as out of date.
+    """
+
+    return _index_append(id_dir, [{'id': id_, 'record': record}])
+
+
+def index_remove(id_dir: Path, ids: Iterable[int]) -> bool:
+    """Remove the records for the given ids from the id_dir's index.
+
+    :returns: As per index_update.
+    """
+
+    return _index_append(id_dir, [{'id': id_, 'record': None} for id_ in ids])
+
+
+def _index_append(id_dir: Path, entries: List[dict]) -> bool:
+    """Append the given index entries to the index under the index lock.
+    If that fails, the index is marked dirty so that it will be rebuilt."""
+
+    if not entries:
+        return True
+
+    lines = ''.join(json.dumps(entry) + '\n' for entry in entries)
+
+    try:
+        with lockfile.LockFile(id_dir/INDEX_LOCK_FN,
+                               timeout=INDEX_LOCK_TIMEOUT):
+            with (id_dir/INDEX_FN).open('a') as index_file:
+                index_file.write(lines)
+    except (OSError, TimeoutError) as err:
+        LOGGER.warning("Could not update index for '%s': %s", id_dir, err)
+        _index_mark_dirty(id_dir)
+        return False
+
+    return True
+
+
+def _index_mark_dirty(id_dir: Path) -> None:
+    """Note that the index has missed an update. This doesn't need the
+    index lock; each mark is a new, uniquely named file."""
+
+    dirty_dir = id_dir/INDEX_DIRTY_DIR
+    try:
+        try:
+            dirty_dir.mkdir()
+        except FileExistsError:
+            pass
+        else:
+            # Whoever rebuilds the index needs to be able to clear marks.
+            try:
+                stat = id_dir.stat()
+                os.chmod(str(dirty_dir), stat.st_mode & 0o7777)
+                os.chown(str(dirty_dir), -1, stat.st_gid)
+            except OSError:
+                pass
+        (dirty_dir/uuid.uuid4().hex).touch()
+    except OSError as err:
+        LOGGER.error("Could not mark the index for '%s' as out of date. "
+                     "Rebuild it with 'pav maint index': %s", id_dir, err)
+
+
+def _index_dirty_marks(id_dir: Path) -> List[str]:
+    """Return the dirty marks on the index."""
+
+    try:
+        return os.listdir(str(id_dir/INDEX_DIRTY_DIR))
+    except FileNotFoundError:
+        return []
+
+
+def _index_read(id_dir: Path) -> (Dict[int, dict], int, bool):
+    """Read the index file, returning the live records by id, the total
+    number of lines read, and whether the index is complete (was written
+    whole by a rebuild, rather than only ever appended to)."""
+
+    records = {}
+    lines = 0
+    complete = False
+    try:
+        with (id_dir/INDEX_FN).open() as index_file:
+            for line in index_file:
+                lines += 1
+                try:
+                    entry = json.loads(line)
+                    if lines == 1 and 'version' in entry:
+                        complete = entry['version'] == INDEX_VERSION
+                        continue
+                    id_ = int(entry['id'])
+                    record = entry['record']
+                except (ValueError, KeyError, TypeError):
+                    # Ignore partially written or otherwise mangled lines.
+                    continue
+
+                if record is None:
+                    records.pop(id_, None)
+                else:
+                    records[id_] = record
+    except OSError:
+        pass
+
+    return records, lines, complete
+
+
+def _index_write(id_dir: Path, records: Dict[int, dict],
+                 complete: bool = True) -> None:
+    """Replace the index with one containing just the given records. The
+    index lock must be held when calling this.
+
+    :param complete: Whether the records are known to cover every id
+        directory.
+    :raises OSError: When the index can't be written.
+    """
+
+    with utils.atomic_write(id_dir/INDEX_FN, keep_perms=True) as tmp_file:
+        if complete:
+            tmp_file.write(json.dumps({'version': INDEX_VERSION}) + '\n')
+        for id_ in sorted(records):
+            tmp_file.write(
+                json.dumps({'id': id_, 'record': records[id_]}) + '\n')
+
+
+def _index_load(id_dir: Path) -> (Dict[int, dict], bool):
+    """Load the index records for the given id_dir, and whether they're
+    current: the index is complete, and hasn't missed any updates. Indexes
+    with a large number of superseded lines are compacted along the way,
+    provided the index lock can be had quickly."""
+
+    # Check for missed updates first, so any that happen while we read
+    # are noticed next time.
+    dirty = bool(_index_dirty_marks(id_dir))
+    records, lines, complete = _index_read(id_dir)
+
+    if lines > len(records) * 2 + INDEX_COMPACT_SLACK:
+        try:
+            with lockfile.LockFile(id_dir/INDEX_LOCK_FN, timeout=0):
+                # Re-read under the lock, so we don't lose updates.
+                records, _, complete = _index_read(id_dir)
+                _index_write(id_dir, records, complete)
+        except (OSError, TimeoutError):
+            pass
+
+    return records, complete and not dirty
+
+
+def index_load(id_dir: Path,
+               record_func: Callable[[Path], dict] = None) -> Dict[int, dict]:
+    """Load the index records for the given id_dir.
+
+    :param id_dir: The directory of id directories.
+    :param record_func: As per index_rebuild. When given, an index that
+        isn't current (it was never fully built, or it missed an update) is
+        rebuilt first, so the records can be trusted. Without it, records
+        may be missing or out of date.
+    :returns: A dictionary of records by id. Records may exist for
+        directories that were removed by other means than 'delete'.
+    """
+
+    records, current = _index_load(id_dir)
+    if current or record_func is None:
+        return records
+
+    return _index_refresh(id_dir, record_func)
+
+
+def _index_refresh(id_dir: Path,
+                   record_func: Callable[[Path], dict]) -> Dict[int, dict]:
+    """Rebuild the index, or failing that just scan the id directories, and
+    return the resulting records."""
+
+    try:
+        return index_rebuild(id_dir, record_func)
+    except (OSError, TimeoutError) as err:
+        LOGGER.warning("Could not rebuild index for '%s': %s", id_dir, err)
+        return _index_scan(id_dir, record_func)
+
+
+def index_rebuild(id_dir: Path,
+                  record_func: Callable[[Path], dict]) -> Dict[int, dict]:
+    """Rebuild the index for id_dir from scratch by scanning every id
+    directory. This also clears any record of missed updates.
+
+    :param id_dir: The directory of id directories.
+    :param record_func: A function that produces an index record for the
+        given id directory path. Should raise ValueError for paths that
+        can't produce a record.
+    :returns: The records in the new index, by id.
+    :raises OSError: When the index can't be written.
+    :raises TimeoutError: When the index lock can't be acquired.
+    """
+
+    with lockfile.LockFile(id_dir/INDEX_LOCK_FN, timeout=INDEX_LOCK_TIMEOUT):
+        # Only clear the marks our scan is sure to cover.
+        marks = _index_dirty_marks(id_dir)
+        records = _index_scan(id_dir, record_func)
+        _index_write(id_dir, records)
+
+        for mark in marks:
+            try:
+                (id_dir/INDEX_DIRTY_DIR/mark).unlink()
+            except FileNotFoundError:
+                pass
+
+    return records
+
+
+def index_verify(id_dir: Path, record_func: Callable[[Path], dict],
+                 ignore: Iterable[str] = ()) -> List[str]:
+    """Compare the index for id_dir to the id directories themselves.
+
+    :param id_dir: The directory of id directories.
+    :param record_func: As per index_rebuild.
+    :param ignore: Record keys whose values may lag behind the id
+        directories without the record counting as out of date.
+    :returns: A list of messages describing each discrepancy found.
+    """
+
+    indexed, _ = _index_load(id_dir)
+    actual = _index_scan(id_dir, record_func)
+
+    def strip(record: dict) -> dict:
+        """Drop the ignored keys from the record."""
+        return {key: val for key, val in record.items() if key not in ignore}
+
+    msgs = []
+    for id_ in sorted(set(indexed).union(actual)):
+        if id_ not in actual:
+            msgs.append("Index has a record for missing {} {}."
+                        .format(id_dir.name, id_))
+        elif id_ not in indexed:
+            msgs.append("No index record for {} {}."
+                        .format(id_dir.name, id_))
+        elif strip(indexed[id_]) != strip(actual[id_]):
+            msgs.append("Index record for {} {} is out of date."
+                        .format(id_dir.name, id_))
+
+    return msgs
+
+
+def _index_scan(id_dir: Path,
+                record_func: Callable[[Path], dict]) -> Dict[int, dict]:
+    """Produce index records for every id directory in id_dir."""
+
+    records = {}
+    for path in id_dir.iterdir():
+        if not path.name.isdigit() or not path.is_dir():
+            continue
+
+        try:
+            records[int(path.name)] = record_func(path)
+        except ValueError:
+            continue
+
+    return records
+
+
 def select(id_dir: Path,
            filter_func: Callable[[Any], bool] = default_filter,
            transform: Callable[[Path], Any] = lambda v: v,
            order_func: Callable[[Any], Any] = None,
            order_asc: bool = True,
            fn_base: int = 10,
-           limit: int = None) -> (List[Any], List[Path]):
+           limit: int = None,
+           from_index: Union[Callable[[Path, dict], Any], None] = None,
+           index_record: Union[Callable[[Path], dict], None] = None) \
+        -> (List[Any], List[Path]):
     """Takes the same arguments as 'select_from', except a directory to search
     from instead of a list of paths. Then picks from the files in that
     directory according to the given filter.
+    :param from_index: When given, items are created by calling this with
+        the path and index record of each id directory, rather than by
+        listing the directory and calling 'transform'. The index is trusted
+        as long as it's current (see index_load); otherwise it's rebuilt
+        with 'index_record' if given, or the directory is listed as normal.
+    :param index_record: As per index_load's 'record_func'.
     :returns: A filtered, ordered list of transformed objects, and the list
               of untransformed paths.
     Other arguments are as per select_from.
     """
 
-    return select_from(
-        paths=id_dir.iterdir(),
-        transform=transform,
-        filter_func=filter_func,
-        order_func=order_func,
-        order_asc=order_asc,
-        fn_base=fn_base,
-        limit=limit,
-    )
+    records = None
+    if from_index is not None:
+        records, current = _index_load(id_dir)
+        if not current:
+            records = (None if index_record is None
+                       else _index_refresh(id_dir, index_record))
+
+    if records is None:
+        return select_from(
+            paths=id_dir.iterdir(),
+            transform=transform,
+            filter_func=filter_func,
+            order_func=order_func,
+            order_asc=order_asc,
+            fn_base=fn_base,
+            limit=limit,
+        )
+
+    selected = []
+    for id_ in sorted(records):
+        record = records[id_]
+        path = make_id_path(id_dir, id_)
+        try:
+            item = from_index(path, record)
+        except ValueError:
+            continue
+
+        if not filter_func(item):
+            continue
+
+        if order_func is not None and order_func(item) is None:
+            continue
+
+        selected.append((item, path))
+
+    return _order_selected(selected, order_func, order_asc, limit)
 
 
 def select_from(paths: Iterable[Path],
@@ -179,6 +582,14 @@ def select_from(paths: Iterable[Path],
 
         selected.append((item, path))
 
+    return _order_selected(selected, order_func, order_asc, limit)
+
+
+def _order_selected(selected, order_func, order_asc, limit) \
+        -> (List[Any], List[Path]):
+    """Order and limit the (item, path) pairs gathered by the select
+    functions, and split them into separate lists."""
+
     if order_func is not None:
         selected.sort(key=lambda d: order_func(d[0]), reverse=not order_asc)
 
@@ -203,34 +614,167 @@ def paths_to_ids(paths: List[Path]) -> List[int]:
     return ids
 
 
+def move_to_trash(path: Path, trash_dir: Path, group: str = None,
+                  umask: int = None) -> Path:
+    """Atomically move the given path into the trash directory, under a
+    unique name. Once there it can be removed at leisure.
+
+    :param path: The path to trash.
+    :param trash_dir: The trash directory. It's created if needed.
+    :param group: The group to give the trash directory when creating it.
+    :param umask: The umask to apply to the trash directory when creating it.
+    :returns: The new path of the trashed directory.
+    :raises OSError: When the path can't be moved, such as when the trash
+        directory is on another filesystem.
+    """
+
+    try:
+        trash_dir.mkdir()
+    except FileExistsError:
+        pass
+    else:
+        _set_perms(permissions.PermissionsManager(None, group, umask),
+                   trash_dir)
+
+    trash_path = trash_dir/'{}.{}.{}'.format(
+        path.parent.name, path.name, uuid.uuid4().hex)
+    path.rename(trash_path)
+    return trash_path
+
+
+def remove_paths(paths: List[Path], threads: int = DELETE_THREADS,
+                 progress: Callable[[int, int], None] = None) -> List[str]:
+    """Remove the given directory trees (typically trashed ones) using a
+    pool of threads. Removing many small files is mostly a matter of waiting
+    on the filesystem, particularly on network filesystems, so this goes
+    much faster in parallel.
+
+    :param paths: The paths to remove.
+    :param threads: The number of threads to remove paths with.
+    :param progress: Called with the number of paths handled so far, and
+        the total, after each path is handled.
+    :returns: A message for each path that couldn't be removed.
+    """
+
+    msgs = []
+    if not paths:
+        return msgs
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        futures = {pool.submit(_rmtree, path): path for path in paths}
+        for done, future in enumerate(as_completed(futures), 1):
+            try:
+                future.result()
+            except OSError as err:
+                msgs.append("Could not remove {}: {}"
+                            .format(futures[future].as_posix(), err))
+            if progress is not None:
+                progress(done, len(paths))
+
+    return msgs
+
+
+def empty_trash(trash_dir: Path, threads: int = DELETE_THREADS,
+                progress: Callable[[int, int], None] = None) -> List[str]:
+    """Remove everything in the given trash directory, such as leftovers
+    from an interrupted delete.
+
+    :returns: As per remove_paths.
+    """
+
+    try:
+        paths = list(trash_dir.iterdir())
+    except FileNotFoundError:
+        return []
+    except OSError as err:
+        return ["Could not list trash directory {}: {}"
+                .format(trash_dir.as_posix(), err)]
+
+    return remove_paths(paths, threads, progress)
+
+
+def _rmtree(path: Path) -> None:
+    """Remove the given directory tree (or file). Anything that disappears
+    while we're at it (someone else is removing it too) is ignored."""
+
+    def onerror(_func, _path, exc_info):
+        """Ignore files that have already been removed."""
+        if not isinstance(exc_info[1], FileNotFoundError):
+            raise exc_info[1]
+
+    if path.is_dir() and not path.is_symlink():
+        shutil.rmtree(path.as_posix(), onerror=onerror)
+    else:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+
 def delete(id_dir: Path, filter_func: Callable[[Path], bool] = default_filter,
            transform: Callable[[Path], Any] = lambda v: v,
-           verbose: bool = False):
+           verbose: bool = False,
+           from_index: Union[Callable[[Path, dict], Any], None] = None,
+           index_record: Union[Callable[[Path], dict], None] = None,
+           trash_dir: Path = None,
+           threads: int = DELETE_THREADS,
+           progress: Callable[[int, int], None] = None,
+           group: str = None, umask: int = None):
     """Delete all id directories in a given path that match the given filter.
+    Under the directory's lock, each matching directory is only moved into
+    the trash directory. They're actually removed, in parallel, once the
+    lock is released.
+
     :param id_dir: The directory to iterate through.
     :param filter_func: A passed filter function, to be passed to select.
     :param transform: As per 'select_from'
     :param verbose: Verbose output.
+    :param from_index: As per 'select'. Deleted directories are also removed
+        from the index.
+    :param index_record: As per 'select'.
+    :param trash_dir: Where to move directories to be removed. Defaults to
+        a 'trash' directory next to id_dir. This should be on the same
+        filesystem as id_dir.
+    :param threads: The number of threads to remove directories with.
+    :param progress: As per 'remove_paths'.
+    :param group: As per 'move_to_trash'.
+    :param umask: As per 'move_to_trash'.
     :return int count: The number of directories removed.
     :return list msgs: Any messages generated during removal.
     """
 
+    if trash_dir is None:
+        trash_dir = id_dir.parent/TRASH_DIR
+
     count = 0
     msgs = []
+    removed = []
+    trashed = []
 
     lock_path = id_dir.with_suffix('.lock')
     with lockfile.LockFile(lock_path):
         for path in select(id_dir=id_dir, filter_func=filter_func,
-                           transform=transform)[1]:
+                           transform=transform, from_index=from_index,
+                           index_record=index_record)[1]:
             try:
-                shutil.rmtree(path.as_posix())
-            except OSError as err:
-                msgs.append("Could not remove {} {}: {}"
-                            .format(id_dir.name, path.as_posix(), err))
-                continue
+                trashed.append(move_to_trash(path, trash_dir, group, umask))
+            except OSError:
+                # Fall back to removing it in place.
+                try:
+                    _rmtree(path)
+                except OSError as err:
+                    msgs.append("Could not remove {} {}: {}"
+                                .format(id_dir.name, path.as_posix(), err))
+                    continue
             count += 1
+            removed.append(int(path.name))
             if verbose:
                 msgs.append("Removed {} {}.".format(id_dir.name, path.name))
 
+    if from_index is not None:
+        index_remove(id_dir, removed)
+
     reset_pkey(id_dir)
+
+    msgs.extend(remove_paths(trashed, threads, progress))
     return count, msgs
@@ -0,0 +1,181 @@
+"""Content hashes of directory trees (such as test build sources).
+
+Hashing a large source tree is expensive, so the per-file hashes are cached
+in a 'manifest' that maps each file's relative path to its size, mtime,
+and inode along with the sha256 of its contents. Only files whose stat
+info has changed are re-read. Manifests are kept in memory for the life
+of the process, and saved to a manifest directory (normally
+``<working_dir>/hash_manifests``) so that other processes can reuse them.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Union
+
+from pavilion import utils
+
+LOGGER = logging.getLogger(__name__)
+
+MANIFEST_DIR = 'hash_manifests'
+MANIFEST_VERSION = 1
+
+_BLOCK_SIZE = 4096*1024
+
+# Manifests by real (resolved) tree path.
+_MANIFESTS = {}  # type: Dict[str, Dict[str, list]]
+# Locks for hashing each tree, so threads don't hash the same tree at once.
+_TREE_LOCKS = {}  # type: Dict[str, threading.Lock]
+_LOCK = threading.Lock()
+
+
+def hash_dir(path: Path, manifest_dir: Union[Path, None] = None,
+             group: str = None, umask: int = None) -> bytes:
+    """Return a sha256 digest of the directory tree at path. This covers the
+    relative path of every file, directory, and symlink in the tree, the
+    contents of each file (and whether it's executable), and the target of
+    each symlink. Symlinks aren't followed.
+
+    :param path: The directory to hash.
+    :param manifest_dir: Where to load and save the on-disk manifest for
+        this tree. If None, the manifest is only kept in memory.
+    :param group: The group to give saved manifest files.
+    :param umask: The umask to apply to saved manifest files.
+    :raises OSError: When the tree can't be walked or read.
+    """
+
+    root = os.path.realpath(str(path))
+
+    with _LOCK:
+        tree_lock = _TREE_LOCKS.setdefault(root, threading.Lock())
+
+    with tree_lock:
+        manifest = _MANIFESTS.get(root)
+        if manifest is None:
+            manifest = {}
+            if manifest_dir is not None:
+                manifest = _load_manifest(manifest_dir, root)
+
+        racy_after = utils.racy_cutoff()
+        new_manifest = {}
+        hash_obj = hashlib.sha256()
+
+        for rel_path, entry in _walk(root, ''):
+            enc_path = os.fsencode(rel_path)
+
+            if entry.is_symlink():
+                hash_obj.update(b'L\0' + enc_path + b'\0' +
+                                os.fsencode(os.readlink(entry.path)) + b'\0')
+            elif entry.is_dir(follow_symlinks=False):
+                hash_obj.update(b'D\0' + enc_path + b'\0')
+            elif entry.is_file(follow_symlinks=False):
+                stat = entry.stat(follow_symlinks=False)
+                key = [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+
+                record = manifest.get(rel_path)
+                if record is not None and record[:3] == key:
+                    digest = record[3]
+                else:
+                    digest = _hash_file(entry.path)
+
+                if stat.st_mtime_ns < racy_after:
+                    new_manifest[rel_path] = key + [digest]
+
+                exec_flag = b'x' if stat.st_mode & 0o111 else b'-'
+                hash_obj.update(b'F\0' + enc_path + b'\0' + exec_flag +
+                                digest.encode() + b'\0')
+
+        _MANIFESTS[root] = new_manifest
+        if manifest_dir is not None and new_manifest != manifest:
+            _save_manifest(manifest_dir, root, new_manifest, group, umask)
+
+    return hash_obj.digest()
+
+
+def clear_cache():
+    """Forget all in-memory manifests."""
+
+    with _LOCK:
+        _MANIFESTS.clear()
+
+
+def _walk(root: str, rel_dir: str):
+    """Yield (relative path, DirEntry) for everything under root/rel_dir,
+    depth first and sorted by name."""
+
+    with os.scandir(os.path.join(root, rel_dir)) as entries:
+        entries = sorted(entries, key=lambda ent: ent.name)
+
+    for entry in entries:
+        rel_path = os.path.join(rel_dir, entry.name)
+        yield rel_path, entry
+
+        if entry.is_dir(follow_symlinks=False):
+            yield from _walk(root, rel_path)
+
+
+def _hash_file(path: str) -> str:
+    """Return the hex sha256 of the given file's contents."""
+
+    hash_obj = hashlib.sha256()
+    with open(path, 'rb') as file:
+        chunk = file.read(_BLOCK_SIZE)
+        while chunk:
+            hash_obj.update(chunk)
+            chunk = file.read(_BLOCK_SIZE)
+
+    return hash_obj.hexdigest()
+
+
+def _manifest_path(manifest_dir: Path, root: str) -> Path:
+    """Each tree's manifest is named after the hash of its path."""
+
+    name = hashlib.sha256(os.fsencode(root)).hexdigest()[:32]
+    return manifest_dir/(name + '.json')
+
+
+def _load_manifest(manifest_dir: Path, root: str) -> Dict[str, list]:
+    """Load the manifest for the given tree. Returns an empty manifest if
+    there isn't one, or it's unusable."""
+
+    path = _manifest_path(manifest_dir, root)
+
+    try:
+        with path.open() as manifest_file:
+            data = json.load(manifest_file)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as err:
+        LOGGER.warning("Could not read hash manifest '%s': %s", path, err)
+        return {}
+
+    if (not isinstance(data, dict)
+            or data.get('version') != MANIFEST_VERSION
+            or data.get('root') != root
+            or not isinstance(data.get('files'), dict)):
+        return {}
+
+    return data['files']
+
+
+def _save_manifest(manifest_dir: Path, root: str, manifest: Dict[str, list],
+                   group: str, umask: int):
+    """Atomically save the manifest for the given tree. Failures are only
+    logged; the manifest is just a cache."""
+
+    path = _manifest_path(manifest_dir, root)
+
+    data = {
+        'version': MANIFEST_VERSION,
+        'root': root,
+        'files': manifest,
+    }
+
+    try:
+        manifest_dir.mkdir(parents=True, exist_ok=True)
+        utils.atomic_write_json(path, data, group, umask)
+    except OSError as err:
+        LOGGER.warning("Could not save hash manifest '%s': %s", path, err)
@@ -11,6 +11,11 @@ from .core import CoreFunctionPlugin
 def get_plugin(name: str) -> FunctionPlugin:
     """Get the function plugin called 'name'."""
 
+    if name not in _FUNCTIONS:
+        # Function plugins are loaded on first use.
+        from pavilion import plugins
+        plugins.load_plugins('function', name)
+
     if name not in _FUNCTIONS:
         raise FunctionPluginError("No such function '{}'".format(name))
     else:
@@ -19,6 +24,9 @@ def get_plugin(name: str) -> FunctionPlugin:
 def list_plugins():
     """Return the list of function plugin names."""
 
+    from pavilion import plugins
+    plugins.load_plugins('function')
+
     return _FUNCTIONS.keys()
 
 
@@ -0,0 +1,188 @@
+"""Minimal Linux inotify support (via ctypes), for watching for files to
+appear in directories without polling. Inotify only sees changes made
+through the local kernel, so it's only useful on local filesystems; changes
+made by other hosts on network filesystems (NFS, Lustre, etc.) are
+invisible to it. Use ``is_local()`` to check before relying on it."""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+from pathlib import Path
+from typing import Dict, List, Union
+
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+
+# The header of each inotify event: wd, mask, cookie, and name length.
+_EVENT_FMT = 'iIII'
+_EVENT_SIZE = struct.calcsize(_EVENT_FMT)
+
+# Filesystem types (as listed in /proc/mounts) that only change through the
+# local kernel.
+LOCAL_FS_TYPES = (
+    'btrfs',
+    'ext2',
+    'ext3',
+    'ext4',
+    'tmpfs',
+    'xfs',
+    'zfs',
+)
+
+_LIBC = None
+
+
+def _get_libc():
+    """Load libc, and make sure it has the inotify functions.
+
+    :raises OSError: When that isn't possible.
+    """
+
+    global _LIBC  # pylint: disable=global-statement
+
+    if _LIBC is None:
+        libc_name = ctypes.util.find_library('c')
+        if libc_name is None:
+            raise OSError("Could not find libc.")
+
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        for func in 'inotify_init1', 'inotify_add_watch':
+            if not hasattr(libc, func):
+                raise OSError("Libc has no '{}' function.".format(func))
+
+        _LIBC = libc
+
+    return _LIBC
+
+
+def available() -> bool:
+    """Return whether inotify is usable on this system."""
+
+    try:
+        _get_libc()
+    except OSError:
+        return False
+
+    return True
+
+
+def is_local(path: Path) -> bool:
+    """Return whether the given path is on a local filesystem (according to
+    /proc/mounts)."""
+
+    path = os.path.realpath(str(path))
+
+    mount_point = ''
+    fs_type = None
+    try:
+        with open('/proc/mounts') as mounts:
+            for line in mounts:
+                parts = line.split()
+                if len(parts) < 3:
+                    continue
+                # Spaces and such are octal escaped in /proc/mounts.
+                mnt = parts[1].encode().decode('unicode_escape')
+
+                if ((path == mnt or path.startswith(mnt.rstrip('/') + '/'))
+                        and len(mnt) >= len(mount_point)):
+                    mount_point = mnt
+                    fs_type = parts[2]
+    except OSError:
+        return False
+
+    return fs_type in LOCAL_FS_TYPES
+
+
+class Watcher:
+    """Watch directories for files being created (or moved) into them. To be
+    used as a context manager, or closed explicitly when done.
+
+    :raises OSError: On init, if inotify isn't available.
+    """
+
+    def __init__(self):
+
+        libc = _get_libc()
+
+        self._libc = libc
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+        self._watches = {}  # type: Dict[int, Path]
+
+    def add(self, path: Path, mask: int = IN_CREATE | IN_MOVED_TO) -> None:
+        """Watch the given directory.
+
+        :raises OSError: When the watch can't be added, such as when we've
+            hit the system limit on watches.
+        """
+
+        wd = self._libc.inotify_add_watch(
+            self._fd, os.fsencode(str(path)), ctypes.c_uint32(mask))
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), str(path))
+
+        self._watches[wd] = path
+
+    def wait(self, timeout: Union[float, None]) -> Dict[Path, List[str]]:
+        """Wait up to timeout seconds (None is forever) for events on any of
+        the watched directories.
+
+        :returns: A dictionary of the file names created in each watched
+            directory (empty on timeout). If the kernel event queue
+            overflowed, every watched directory is included with no names.
+        """
+
+        try:
+            ready, _, _ = select.select([self._fd], [], [], timeout)
+        except InterruptedError:
+            return {}
+
+        if not ready:
+            return {}
+
+        try:
+            data = os.read(self._fd, 64*1024)
+        except BlockingIOError:
+            return {}
+        except OSError as err:
+            if err.errno == errno.EINTR:
+                return {}
+            raise
+
+        events = {}
+        offset = 0
+        while offset + _EVENT_SIZE <= len(data):
+            wd, mask, _, name_len = struct.unpack_from(_EVENT_FMT, data, offset)
+            offset += _EVENT_SIZE
+            name = data[offset:offset + name_len].rstrip(b'\0')
+            offset += name_len
+
+            if mask & IN_Q_OVERFLOW:
+                return {path: [] for path in self._watches.values()}
+
+            if wd in self._watches:
+                events.setdefault(self._watches[wd], []).append(
+                    os.fsdecode(name))
+
+        return events
+
+    def close(self) -> None:
+        """Close the inotify instance, and with it all watches."""
+
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
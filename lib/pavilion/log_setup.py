@@ -1,21 +1,93 @@
 """Manages the setup of various logging mechanisms for Pavilion."""
 
 import logging
+import os
 from logging import handlers
+import signal
 import socket
 import sys
+import threading
 import traceback
+import weakref
 from pathlib import Path
+from typing import List
 
 from pavilion import output
+from pavilion import result_log
 from pavilion.lockfile import LockFile
 from pavilion.permissions import PermissionsManager
 
+# Result log records are buffered and written in batches of up to this many
+# records, or after this many seconds.
+RESULT_LOG_BUFFER_SIZE = 1000
+RESULT_LOG_FLUSH_INTERVAL = 5
+# How long to spend writing out buffered records on a SIGTERM, before
+# dying of it anyway.
+SIGTERM_FLUSH_TIMEOUT = 10
+
+# Every LockFileRotatingFileHandler in this process.
+_HANDLERS = weakref.WeakSet()
+
+
+def flush_handlers():
+    """Write out the buffered records of every LockFileRotatingFileHandler
+    in this process."""
+
+    for handler in list(_HANDLERS):
+        handler.flush()
+
+
+def _reset_handlers_after_fork():
+    """A forked child shouldn't write out its parent's buffered records too,
+    or wait on locks held by the parent's other threads."""
+
+    for handler in list(_HANDLERS):
+        handler._reset_after_fork()  # pylint: disable=protected-access
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_handlers_after_fork)
+
+
+def _flush_and_terminate(signum, _frame):
+    """Write out any buffered log records, and then die of the signal as we
+    would have without this handler. The flush happens in another thread,
+    as the thread we interrupted could hold a handler's buffer lock."""
+
+    flusher = threading.Thread(target=flush_handlers, daemon=True)
+    flusher.start()
+    flusher.join(SIGTERM_FLUSH_TIMEOUT)
+
+    signal.signal(signum, signal.SIG_DFL)
+    os.kill(os.getpid(), signum)
+
+
+def flush_on_sigterm() -> None:
+    """Write out buffered log records when this process is sent a SIGTERM
+    (such as when Slurm ends a job at its time limit), rather than losing
+    them. This only applies if SIGTERM is otherwise unhandled, and can only
+    be set up from the main thread."""
+
+    try:
+        if signal.getsignal(signal.SIGTERM) is signal.SIG_DFL:
+            signal.signal(signal.SIGTERM, _flush_and_terminate)
+    except ValueError:
+        # We're not in the main thread.
+        pass
+
 
 class LockFileRotatingFileHandler(logging.Handler):
     """A logging handler that manages cross-system, cross-process safety by
     utilizing file based locking. This will also rotate files, as per
     RotatingFileHandler.
+
+    Acquiring the lock file is expensive (particularly on NFS), so records
+    can optionally be buffered in memory and written in batches, under a
+    single lock acquisition. A batch is written when the buffer holds
+    buffer_size records or buffer_bytes of messages, when the oldest record
+    in it is flush_interval seconds old (checked by a background thread),
+    when a record of flush_level or higher is logged, and when the handler
+    is flushed or closed (which logging does at exit).
     """
 
     # What to use to separate logfile lines.
@@ -25,7 +97,9 @@ class LockFileRotatingFileHandler(logging.Handler):
     ERR_OUT = sys.stderr
 
     def __init__(self, file_name, max_bytes=0, backup_count=0,
-                 lock_timeout=10, encoding=None):
+                 lock_timeout=10, encoding=None, buffer_size=0,
+                 buffer_bytes=1024**2, flush_interval=None,
+                 flush_level=logging.ERROR):
         """Initialize the Locking File Handler. This will attempt to open
         the file and use the lockfile, just to check permissions.
 
@@ -36,6 +110,15 @@ class LockFileRotatingFileHandler(logging.Handler):
         :param int lock_timeout: Wait this long before declaring a lock
             deadlock, and giving up.
         :param str encoding: The file encoding to use for the log file.
+        :param int buffer_size: Buffer up to this many records before
+            writing them. Zero (the default) writes every record as it's
+            logged.
+        :param int buffer_bytes: Write the buffered records once their
+            messages are at least this long.
+        :param float flush_interval: Write buffered records after they've
+            waited this many seconds. None denotes no time limit.
+        :param int flush_level: Records of this level or higher are written
+            immediately, along with anything buffered.
         """
 
         self.file_name = Path(file_name)
@@ -48,8 +131,26 @@ class LockFileRotatingFileHandler(logging.Handler):
         self.lock_file = LockFile(lockfile_path,
                                   timeout=self.lock_timeout)
 
+        self.buffer_size = buffer_size
+        self.buffer_bytes = buffer_bytes
+        self.flush_interval = flush_interval
+        self.flush_level = flush_level
+
+        # The buffered (record, message) pairs, and the total message length.
+        self._buffer = []
+        self._buffer_len = 0
+        # Protects the buffer.
+        self._buffer_lock = threading.Lock()
+        # Only one thread in this process may use the lock file (and write to
+        # the log) at a time.
+        self._write_lock = threading.Lock()
+        self._flush_thread = None
+        self._stop_flushing = threading.Event()
+
         super().__init__()
 
+        _HANDLERS.add(self)
+
         # Test acquire the lock file and test open the file.
         with self.lock_file:
             with self.file_name.open(self.mode, encoding=self.encoding):
@@ -57,34 +158,135 @@ class LockFileRotatingFileHandler(logging.Handler):
 
     # We don't need threading based locks.
     def _do_nothing(self):
-        """createLock, acquire, release, flush, and close do nothing in
-        this handler implementation."""
+        """createLock, acquire, and release do nothing in this handler
+        implementation."""
 
     # We don't need thread based locking.
     createLock = _do_nothing
     acquire = _do_nothing
     release = _do_nothing
-    # The log file is opened, flushed and closed for each write.
-    flush = _do_nothing
-    close = _do_nothing
 
     def emit(self, record):
         """Emit the given record, but only after acquiring a lock on the
-        log's lockfile."""
+        log's lockfile. When buffering, the record may only be queued to be
+        written later."""
 
         try:
             msg = self.format(record)
+        except Exception:  # pylint: disable=broad-except
+            self.handleError(record)
+            return
+
+        if self.buffer_size <= 0:
+            self._write_batch([(record, msg)])
+            return
+
+        with self._buffer_lock:
+            self._buffer.append((record, msg))
+            self._buffer_len += len(msg) + 1
+            full = (len(self._buffer) >= self.buffer_size
+                    or self._buffer_len >= self.buffer_bytes
+                    or record.levelno >= self.flush_level)
+
+        if full:
+            self.flush()
+        elif self.flush_interval is not None and self._flush_thread is None:
+            self._start_flush_thread()
+
+    def flush(self):
+        """Write out any buffered records."""
+
+        with self._buffer_lock:
+            batch = self._buffer
+            self._buffer = []
+            self._buffer_len = 0
+
+        if batch:
+            self._write_batch(batch)
+
+    def close(self):
+        """Write out any buffered records, and stop the flush thread."""
+
+        self._stop_flushing.set()
+        self.flush()
+        super().close()
 
-            with self.lock_file:
-                if self._should_rollover(msg):
-                    self._do_rollover()
+    def _write_batch(self, batch):
+        """Write the given (record, message) pairs to the log under a single
+        acquisition of the lock file, rolling the log over as needed.
 
-                with self.file_name.open(self.mode) as file:
-                    file.write(msg)
-                    file.write(self.TERMINATOR)
+        :param list batch: The records and their formatted messages.
+        """
+
+        try:
+            with self._write_lock, self.lock_file:
+                try:
+                    size = self.file_name.stat().st_size
+                except FileNotFoundError:
+                    size = 0
+
+                msgs = []
+                for _, msg in batch:
+                    if 0 < self.max_bytes < size + len(msg) + 1:
+                        if msgs:
+                            self._write(msgs)
+                            msgs = []
+                        self._do_rollover()
+                        size = self.file_name.stat().st_size
+
+                    msgs.append(msg)
+                    size += len(msg) + 1
+
+                if msgs:
+                    self._write(msgs)
 
         except (OSError, IOError, TimeoutError):
-            self.handleError(record)
+            # Report the first record that we failed to log.
+            self.handleError(batch[0][0])
+
+    def _write(self, msgs: List[str]) -> None:
+        """Write the messages to the log file. We must have a lock on the file
+        to do this."""
+
+        with self.file_name.open(self.mode) as file:
+            for msg in msgs:
+                file.write(msg)
+                file.write(self.TERMINATOR)
+
+    def _start_flush_thread(self):
+        """Start the background thread that writes out buffered records every
+        flush_interval seconds."""
+
+        with self._buffer_lock:
+            if self._flush_thread is not None:
+                return
+
+            self._flush_thread = threading.Thread(
+                target=self._flush_loop, name='log-flush', daemon=True)
+            self._flush_thread.start()
+
+    def _flush_loop(self):
+        """Flush the buffer every flush_interval seconds until closed."""
+
+        while not self._stop_flushing.wait(self.flush_interval):
+            self.flush()
+
+    def _reset_after_fork(self):
+        """Drop the records (and flush thread) inherited from the parent
+        process, which will write them itself. The thread primitives are
+        replaced, as they may have been held by threads that don't exist in
+        the child."""
+
+        stopped = self._stop_flushing.is_set()
+
+        self._buffer = []
+        self._buffer_len = 0
+        self._buffer_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._flush_thread = None
+        self._stop_flushing = threading.Event()
+        if stopped:
+            self._stop_flushing.set()
 
     def handleError(self, record: logging.LogRecord) -> None:
         """Print any logging errors to stderr. We want to know about them."""
@@ -97,14 +299,6 @@ class LockFileRotatingFileHandler(logging.Handler):
         except (OSError, IOError):
             pass
 
-    def _should_rollover(self, msg):
-        """Check if the message will exceed our rollover limit."""
-
-        if 0 < self.max_bytes < self.file_name.stat().st_size + len(msg) + 1:
-            return True
-
-        return False
-
     def _do_rollover(self):
         """Roll over our log file. We must have a lock on the file to perform
         this."""
@@ -131,6 +325,53 @@ class LockFileRotatingFileHandler(logging.Handler):
             self.file_name.chmod(0o660)
 
 
+class ResultLogHandler(LockFileRotatingFileHandler):
+    """A LockFileRotatingFileHandler for the result log, which also adds each
+    logged result record to the result log index (see pavilion.result_log).
+    Each log message may contain multiple records, one per line."""
+
+    def _write(self, msgs: List[str]) -> None:
+        """Write the messages' lines to the log, and index them."""
+
+        lines = [line.encode(self.encoding or 'utf8')
+                 for msg in msgs for line in msg.split(self.TERMINATOR)]
+
+        with self.file_name.open('a+b') as file:
+            offset = file.tell()
+            ino = os.fstat(file.fileno()).st_ino
+            if offset == 0:
+                first_line = lines[0]
+            else:
+                file.seek(0)
+                first_line = file.readline()[:-1]
+
+            # In append mode, writes always go to the end of the file.
+            for line in lines:
+                file.write(line)
+                file.write(self.TERMINATOR.encode())
+
+        result_log.append_index(
+            self.file_name,
+            result_log.make_entries(ino, result_log.segment_id(first_line),
+                                    offset, lines))
+
+    def _do_rollover(self):
+        """Roll over the log, and then drop the index entries for the backup
+        that was deleted to make room. We must have a lock on the file to
+        perform this."""
+
+        super()._do_rollover()
+        if self.backup_count <= 0:
+            return
+
+        try:
+            result_log.drop_stale(self.file_name)
+        except OSError as err:
+            self.ERR_OUT.write(
+                "Could not update result log index for '{}' after rollover: "
+                "{}\n".format(self.file_name, err))
+
+
 # We don't want to have to look this up every time we log.
 _OLD_FACTORY = logging.getLogRecordFactory()
 _HOSTNAME = socket.gethostname()
@@ -205,14 +446,19 @@ def setup_loggers(pav_cfg, verbose=False, err_out=sys.stderr):
         return False
 
     result_logger = logging.getLogger('common_results')
-    result_handler = LockFileRotatingFileHandler(
+    result_handler = ResultLogHandler(
         file_name=str(pav_cfg.result_log),
         # 20 MB
         max_bytes=20 * 1024 ** 2,
-        backup_count=3)
+        backup_count=3,
+        buffer_size=RESULT_LOG_BUFFER_SIZE,
+        flush_interval=RESULT_LOG_FLUSH_INTERVAL)
     result_handler.setFormatter(logging.Formatter("{message}", style='{'))
     result_logger.setLevel(logging.INFO)
     result_logger.addHandler(result_handler)
+    # Don't lose buffered results when killed, such as by 'pav _run' hitting
+    # a Slurm job's time limit.
+    flush_on_sigterm()
 
     # Setup the exception logger.
     # Exceptions will be logged to this directory, along with other useful info.
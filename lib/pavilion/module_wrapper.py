@@ -83,6 +83,10 @@ found.
 :rtype: ModuleWrapper
 """
 
+    # Module wrapper plugins are loaded on first use.
+    from pavilion import plugins
+    plugins.load_plugins('module', name)
+
     if name in _WRAPPED_MODULES:
         if version in _WRAPPED_MODULES[name]:
             # Grab the version specific wrapper.
@@ -99,6 +103,10 @@ def list_module_wrappers():
 
 :rtype: list
 """
+
+    from pavilion import plugins
+    plugins.load_plugins('module')
+
     return list(_WRAPPED_MODULES.keys())
 
 
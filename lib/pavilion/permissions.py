@@ -58,6 +58,11 @@ class PermissionsManager:
         if self.umask is None and self.gid is None:
             return
 
+        # Don't change the permissions of (or walk) whatever a symlink
+        # points to, such as a build directory.
+        if self.path.is_symlink():
+            return
+
         try:
             self.set_perms(self.path)
 
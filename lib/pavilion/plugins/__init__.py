@@ -10,12 +10,24 @@ for Pavilion to recognize them.
 - Plugin base *modules* **may** also contain a ``register_core_plugins()``
   to find, initialize, and ``activate()`` all plugins of that type
   that aren't included as separate yapsy plugin modules.
+
+Finding and importing every plugin module is slow, so the plugins can also
+be initialized lazily. A manifest of the plugins found (their info file,
+module path, category, name, and the names they provide) is cached in the
+working directory. With a valid manifest, plugin modules are only imported
+and activated when something asks for a plugin of their category (see
+load_plugins()). The manifest is rebuilt (by loading everything) whenever a
+plugin directory or plugin file changes.
 """
 
+import hashlib
 import inspect
+import json
 import logging
+import os
 import traceback
 from pathlib import Path
+from typing import List, Union
 
 from pavilion.commands import Command
 from pavilion.expression_functions import FunctionPlugin
@@ -23,11 +35,16 @@ from pavilion.module_wrapper import ModuleWrapper
 from pavilion.result.parsers import ResultParser
 from pavilion.schedulers import SchedulerPlugin
 from pavilion.system_variables import SystemPlugin as System
+from pavilion import utils
 from yapsy import PluginManager
 
 LOGGER = logging.getLogger('plugins')
 
 _PLUGIN_MANAGER = None
+# The manifest entries of plugins that haven't been loaded yet, by category.
+_UNLOADED = {}
+# The plugins (as 'category.name') to never activate.
+_DISABLED = set()
 
 PLUGIN_CATEGORIES = {
     'command': Command,
@@ -38,10 +55,14 @@ PLUGIN_CATEGORIES = {
     'sys': System,
 }
 
+MANIFEST_DIR = 'plugin_manifest'
+MANIFEST_VERSION = 1
+
 __all__ = [
     "PluginError",
     "initialize_plugins",
     "list_plugins",
+    "load_plugins",
 ]
 
 
@@ -49,11 +70,27 @@ class PluginError(RuntimeError):
     pass
 
 
-def initialize_plugins(pav_cfg):
+class _PluginManager(PluginManager.PluginManager):
+    """A yapsy plugin manager that can also load a given list of plugin
+    candidates, rather than locating them itself."""
+
+    def loadCandidates(self, candidates):  # pylint: disable=invalid-name
+        """Load the given (info file, module path, plugin info) candidates.
+
+        :returns: The plugin info of each processed candidate.
+        """
+
+        self._candidates = list(candidates)
+        return self.loadPlugins()
+
+
+def initialize_plugins(pav_cfg, lazy=False):
     """Initialize the plugin system, and activate plugins in all known plugin
     directories (except those specifically disabled in the config. Should
     only ever be run once pavilion command.
     :param pav_cfg: The pavilion configuration
+    :param bool lazy: Use (and maintain) the plugin manifest, so that plugins
+        are only imported and activated when first asked for.
     :return: Nothing
     :raises PluginError: When there's an issue with a plugin or the plugin
         system in general.
@@ -72,19 +109,111 @@ def initialize_plugins(pav_cfg):
     for cfg_dir in pav_cfg.config_dirs:
         plugin_dirs.append((cfg_dir/'plugins').as_posix())
 
-    try:
-        pman = PluginManager.PluginManager(directories_list=plugin_dirs,
-                                           categories_filter=PLUGIN_CATEGORIES)
+    _DISABLED.clear()
+    _DISABLED.update(pav_cfg.disable_plugins)
 
-        pman.collectPlugins()
+    try:
+        pman = _PluginManager(directories_list=plugin_dirs,
+                              categories_filter=PLUGIN_CATEGORIES)
     except Exception as err:
         raise PluginError("Error initializing plugin system: {}".format(err))
 
-    # Activate each plugin in turn.
-    for plugin in pman.getAllPlugins():
+    manifest = None
+    dir_stamps = None
+    if lazy:
+        dir_stamps = _dir_stamps(plugin_dirs)
+        manifest = _load_manifest(pav_cfg, plugin_dirs, dir_stamps)
+
+    if manifest is None:
+        try:
+            pman.locatePlugins()
+            candidates = pman.getPluginCandidates()
+            pman.loadPlugins()
+        except Exception as err:
+            raise PluginError("Error initializing plugin system: {}"
+                              .format(err))
+
+        # Activate each plugin in turn.
+        _activate(pman.getAllPlugins())
+
+        if lazy:
+            _save_manifest(pav_cfg, plugin_dirs, dir_stamps, candidates)
+    else:
+        _UNLOADED.clear()
+        for entry in manifest:
+            _UNLOADED.setdefault(entry['category'], []).append(entry)
+
+    # Some plugin types have core plugins that are built-in.
+    for _, cat_obj in PLUGIN_CATEGORIES.items():
+        if hasattr(cat_obj, 'register_core'):
+            cat_obj.register_core()
+
+    _PLUGIN_MANAGER = pman
+
+
+def load_plugins(category: str, name: str = None) -> bool:
+    """Import and activate the plugins of the given category that haven't
+    been loaded yet. This only does anything when the plugins were
+    initialized lazily.
+
+    :param category: The plugin category (a PLUGIN_CATEGORIES key).
+    :param name: Only load the plugins that provide this name (such as a
+        command name or alias).
+    :returns: Whether any plugins were loaded.
+    :raises PluginError: When a plugin can't be activated.
+    """
+
+    entries = _UNLOADED.get(category)
+    if not entries or _PLUGIN_MANAGER is None:
+        return False
+
+    if name is None:
+        to_load = list(entries)
+    else:
+        to_load = [entry for entry in entries if name in entry['provides']]
+
+    if not to_load:
+        return False
+
+    candidates = []
+    locator = _PLUGIN_MANAGER.getPluginLocator()
+    for entry in to_load:
+        # Plugins with several categories get loaded for all of them at once.
+        for cat_entries in _UNLOADED.values():
+            for other in list(cat_entries):
+                if other['info'] == entry['info']:
+                    cat_entries.remove(other)
+
+        info_path = Path(entry['info'])
+        plugin_info, _ = locator.gatherCorePluginInfo(
+            info_path.parent.as_posix(), info_path.name)
+        if plugin_info is None:
+            LOGGER.warning("Could not read plugin info file '%s'.", info_path)
+            continue
+
+        candidate = (entry['info'], entry['module'], plugin_info)
+        if candidate[0] not in [cand[0] for cand in candidates]:
+            candidates.append(candidate)
+
+    try:
+        loaded = _PLUGIN_MANAGER.loadCandidates(candidates)
+    except Exception as err:
+        raise PluginError("Error loading plugins: {}".format(err))
+
+    _activate([plugin for plugin in loaded
+               if plugin.categories and plugin.plugin_object is not None])
+
+    return True
+
+
+def _activate(plugin_infos):
+    """Activate each of the given (yapsy) plugins, except those disabled in
+    the config."""
+
+    for plugin in plugin_infos:
         plugin_dot_name = '{p.category}.{p.name}'.format(p=plugin)
 
-        if plugin_dot_name in pav_cfg.disable_plugins:
+        if plugin_dot_name in _DISABLED:
             # Don't initialize these plugins.
             continue
 
@@ -95,12 +224,133 @@ def initialize_plugins(pav_cfg):
                               .format(name=plugin.name, err=err,
                                       tb=traceback.format_exc()))
 
-    # Some plugin types have core plugins that are built-in.
-    for _, cat_obj in PLUGIN_CATEGORIES.items():
-        if hasattr(cat_obj, 'register_core'):
-            cat_obj.register_core()
 
-    _PLUGIN_MANAGER = pman
+def _mtime(path: str) -> Union[int, None]:
+    """Return the mtime (in ns) of the given path, or None if it doesn't
+    exist."""
+
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _module_file(module_path: str) -> str:
+    """Return the file yapsy imports for the given plugin module path."""
+
+    if os.path.isdir(module_path):
+        return os.path.join(module_path, '__init__.py')
+    return module_path + '.py'
+
+
+def _dir_stamps(plugin_dirs: List[str]) -> list:
+    """Return the mtimes of every directory under the plugin directories.
+    These change whenever plugin files are added, removed or renamed."""
+
+    stamps = []
+    for plugin_dir in plugin_dirs:
+        stamps.append([plugin_dir, _mtime(plugin_dir)])
+        for dirpath, dirnames, _ in os.walk(plugin_dir, followlinks=True):
+            dirnames[:] = sorted(name for name in dirnames
+                                 if name != '__pycache__')
+            for name in dirnames:
+                path = os.path.join(dirpath, name)
+                stamps.append([path, _mtime(path)])
+
+    return stamps
+
+
+def _manifest_path(pav_cfg, plugin_dirs: List[str]) -> Path:
+    """The manifest for a set of plugin directories is named after their
+    hash."""
+
+    digest = hashlib.sha256(json.dumps(plugin_dirs).encode()).hexdigest()[:32]
+    return pav_cfg.working_dir/MANIFEST_DIR/(digest + '.json')
+
+
+def _load_manifest(pav_cfg, plugin_dirs: List[str],
+                   dir_stamps: list) -> Union[List[dict], None]:
+    """Load the plugin manifest for the given plugin dirs, if it's still
+    valid.
+
+    :returns: The manifest entries, or None if there's no valid manifest.
+    """
+
+    path = _manifest_path(pav_cfg, plugin_dirs)
+
+    try:
+        with path.open() as manifest_file:
+            data = json.load(manifest_file)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as err:
+        LOGGER.warning("Could not read plugin manifest '%s': %s", path, err)
+        return None
+
+    if (not isinstance(data, dict)
+            or data.get('version') != MANIFEST_VERSION
+            or data.get('dirs') != plugin_dirs
+            or data.get('dir_stamps') != dir_stamps
+            or not isinstance(data.get('plugins'), list)):
+        return None
+
+    for entry in data['plugins']:
+        if entry.get('mtime') != [_mtime(entry['info']),
+                                  _mtime(_module_file(entry['module']))]:
+            return None
+
+    return data['plugins']
+
+
+def _save_manifest(pav_cfg, plugin_dirs: List[str], dir_stamps: list,
+                   candidates: list) -> None:
+    """Save a manifest of the given, loaded, yapsy plugin candidates. Nothing
+    is saved if any of the plugins failed to load, or any of the files
+    involved were modified too recently to trust. Failures are only logged.
+    """
+
+    racy_after = utils.racy_cutoff()
+
+    entries = []
+    for info_file, module_path, plugin_info in candidates:
+        if plugin_info.error is not None or not plugin_info.categories:
+            return
+
+        mtimes = [_mtime(info_file), _mtime(_module_file(module_path))]
+        if None in mtimes or max(mtimes) >= racy_after:
+            return
+
+        obj = plugin_info.plugin_object
+        provides = list(getattr(obj, 'aliases', None) or [obj.name])
+        for category in plugin_info.categories:
+            entries.append({
+                'category': category,
+                'name': plugin_info.name,
+                'info': info_file,
+                'module': module_path,
+                'provides': provides,
+                'mtime': mtimes,
+            })
+
+    if any(stamp is not None and stamp >= racy_after
+           for _, stamp in dir_stamps):
+        return
+
+    data = {
+        'version': MANIFEST_VERSION,
+        'dirs': plugin_dirs,
+        'dir_stamps': dir_stamps,
+        'plugins': entries,
+    }
+
+    path = _manifest_path(pav_cfg, plugin_dirs)
+
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        utils.atomic_write_json(path, data, pav_cfg['shared_group'],
+                                pav_cfg['umask'])
+    except (OSError, TypeError, ValueError) as err:
+        LOGGER.warning("Could not save plugin manifest '%s': %s", path, err)
 
 
 def list_plugins():
@@ -112,6 +362,9 @@ def list_plugins():
     if _PLUGIN_MANAGER is None:
         raise RuntimeError("Plugin system has not been initialized.")
 
+    for category in list(_UNLOADED):
+        load_plugins(category)
+
     plugins = {}
     for category in _PLUGIN_MANAGER.getCategories():
         plugins[category] = {}
@@ -128,6 +381,7 @@ def _reset_plugins():
     global _PLUGIN_MANAGER  # pylint: disable=W0603
 
     _PLUGIN_MANAGER = None
+    _UNLOADED.clear()
 
     for _, cat_obj in PLUGIN_CATEGORIES.items():
         module = inspect.getmodule(cat_obj)
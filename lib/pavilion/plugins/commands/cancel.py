@@ -2,14 +2,22 @@
 
 import errno
 import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Union
 
 from pavilion import commands
+from pavilion import dir_db
 from pavilion import output
 from pavilion import schedulers
 from pavilion import series
+from pavilion import utils
 from pavilion.plugins.commands.status import print_from_tests
-from pavilion.status_file import STATES
-from pavilion.test_run import TestRun, TestRunError
+from pavilion.status_file import STATES, TestStatusError
+from pavilion.test_run import (
+    TestAttributes, TestRun, TestRunError, TestRunNotFoundError, TestRunState)
+
+# How many threads to read and update tests with.
+CANCEL_THREADS = 16
 
 
 class CancelCommand(commands.Command):
@@ -47,19 +55,11 @@ class CancelCommand(commands.Command):
     def run(self, pav_cfg, args):
         """Cancel the given tests."""
 
-        user_id = os.geteuid()  # gets unique user id
-
         if not args.tests:
             # user wants to cancel all current tests
             if args.all:
-                tests_dir = pav_cfg.working_dir/'test_runs'
-                # iterate through all the tests in the tests directory
-                for test in tests_dir.iterdir():
-                    test_owner_id = test.stat().st_uid
-                    if test_owner_id == user_id:
-                        if not (test/'RUN_COMPLETE').exists():
-                            test_id = test.name
-                            args.tests.append(test_id)
+                args.tests.extend(
+                    str(test_id) for test_id in _user_active_tests(pav_cfg))
             else:
                 # Get the last series ran by this user.
                 series_id = series.TestSeries.load_user_series_id(pav_cfg)
@@ -70,9 +70,9 @@ class CancelCommand(commands.Command):
         for test_id in args.tests:
             if test_id.startswith('s'):
                 try:
-                    test_list.extend(series.TestSeries.from_id(pav_cfg,
-                                                               test_id)
-                                     .tests)
+                    test_list.extend(dir_db.paths_to_ids(
+                        series.TestSeries.list_series_tests(pav_cfg,
+                                                            test_id)))
                 except series.TestSeriesError as err:
                     output.fprint(
                         "Series {} could not be found.\n{}".format(test_id,
@@ -96,38 +96,18 @@ class CancelCommand(commands.Command):
                     )
                     return errno.EINVAL
 
-        cancel_failed = False
-        test_object_list = []
-        for test_id in test_list:
-            try:
-                test = TestRun.load(pav_cfg, test_id)
-                sched = schedulers.get_plugin(test.scheduler)
-                test_object_list.append(test)
-
-                status = test.status.current()
-                # Won't try to cancel a completed job or a job that was
-                # previously cancelled.
-                if status.state not in (STATES.COMPLETE,
-                                        STATES.SCHED_CANCELLED):
-                    # Sets status based on the result of sched.cancel_job.
-                    # Ran into trouble when 'cancelling' jobs that never
-                    # actually started, ie. build errors/created job states.
-                    cancel_status = sched.cancel_job(test)
-                    test.status.set(cancel_status.state, cancel_status.note)
-                    test.set_run_complete()
-                    output.fprint(
-                        "Test {} cancelled."
-                        .format(test_id), file=self.outfile,
-                        color=output.GREEN)
+        records = dir_db.index_load(pav_cfg.working_dir/'test_runs',
+                                    TestAttributes.index_record)
+        workers = max(1, min(CANCEL_THREADS, len(test_list)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            loaded = list(pool.map(
+                lambda tid: _load_test(pav_cfg, tid, records.get(tid)),
+                test_list))
 
-                else:
-                    output.fprint(
-                        "Test {} could not be cancelled has state: {}."
-                        .format(test_id, status.state),
-                        file=self.outfile,
-                        color=output.RED)
-
-            except TestRunError as err:
+        test_object_list = []
+        to_cancel = []
+        for test_id, (test, status, err) in zip(test_list, loaded):
+            if test is None:
                 output.fprint(
                     "Test {} could not be cancelled, cannot be found. \n{}"
                     .format(test_id, err),
@@ -135,6 +115,43 @@ class CancelCommand(commands.Command):
                     color=output.RED)
                 return errno.EINVAL
 
+            test_object_list.append(test)
+
+            # Won't try to cancel a completed job or a job that was
+            # previously cancelled.
+            if status.state not in (STATES.COMPLETE, STATES.SCHED_CANCELLED):
+                to_cancel.append(test)
+            else:
+                output.fprint(
+                    "Test {} could not be cancelled has state: {}."
+                    .format(test_id, status.state),
+                    file=self.outfile,
+                    color=output.RED)
+
+        # Cancel all the jobs for each scheduler at once, then set the
+        # resulting status on each test. Ran into trouble when 'cancelling'
+        # jobs that never actually started, ie. build errors/created job
+        # states, so the schedulers handle those too.
+        cancel_statuses = schedulers.cancel_jobs(to_cancel)
+
+        def set_cancelled(test, cancel_status):
+            """Record the cancellation in the test's status."""
+            test.status.set(cancel_status.state, cancel_status.note)
+            test.set_run_complete()
+
+        if to_cancel:
+            workers = max(1, min(CANCEL_THREADS, len(to_cancel)))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(set_cancelled, to_cancel, cancel_statuses))
+
+        for test in to_cancel:
+            output.fprint(
+                "Test {} cancelled."
+                .format(test.id), file=self.outfile,
+                color=output.GREEN)
+
+        cancel_failed = False
+
         # Only prints statuses of tests if option is selected
         # and test_list is not empty
         if args.status and test_object_list:
@@ -143,3 +160,57 @@ class CancelCommand(commands.Command):
             return cancel_failed
 
         return cancel_failed
+
+
+def _user_active_tests(pav_cfg) -> List[int]:
+    """Return the ids of the incomplete tests owned by the current user.
+    These come from the test run index (rebuilt first if it isn't current),
+    so only tests that haven't saved their attributes yet have to be
+    examined."""
+
+    tests_dir = pav_cfg.working_dir/'test_runs'
+    records = dir_db.index_load(tests_dir, TestAttributes.index_record)
+    login = utils.get_login()
+    user_id = os.geteuid()
+
+    test_ids = []
+    for test_id in sorted(records):
+        record = records[test_id]
+        if record.get('user') is not None:
+            if record['user'] == login and not record.get('complete'):
+                test_ids.append(test_id)
+            continue
+
+        path = dir_db.make_id_path(tests_dir, test_id)
+        try:
+            if (path.stat().st_uid == user_id
+                    and not (path/TestRun.COMPLETE_FN).exists()):
+                test_ids.append(test_id)
+        except OSError:
+            continue
+
+    return test_ids
+
+
+def _load_test(pav_cfg, test_id: int, record: Union[dict, None]):
+    """Get a lightweight handle on the given test (falling back to fully
+    loading it), along with its current status.
+
+    :returns: A (test, status, error) tuple. The test and status are None
+        (and the error is set) if the test couldn't be loaded.
+    """
+
+    try:
+        test = TestRunState(pav_cfg, test_id, attrs=record)
+    except TestRunNotFoundError as err:
+        return None, None, err
+    except TestRunError:
+        try:
+            test = TestRun.load(pav_cfg, test_id)
+        except (TestRunError, TestRunNotFoundError) as err:
+            return None, None, err
+
+    try:
+        return test, test.status.current(), None
+    except TestStatusError as err:
+        return None, None, err
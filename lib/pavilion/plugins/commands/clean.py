@@ -1,9 +1,11 @@
 """Clean old tests/builds/etc from the working directory."""
 
+import time
 from pathlib import Path
 
 from pavilion import clean
 from pavilion import commands
+from pavilion import dir_db
 from pavilion import filters
 from pavilion import output
 
@@ -52,37 +54,86 @@ class CleanCommand(commands.Command):
             )
 
         end = '\n' if args.verbose else '\r'
+        group = pav_cfg['shared_group']
+        umask = pav_cfg['umask']
 
         # Clean Tests
         tests_dir = pav_cfg.working_dir / 'test_runs'     # type: Path
         output.fprint("Removing Tests...", file=self.outfile, end=end)
-        rm_tests_count, msgs = clean.delete_tests(tests_dir, filter_func,
-                                                  args.verbose)
-        if args.verbose:
-            for msg in msgs:
-                output.fprint(msg, color=output.YELLOW)
-        output.fprint("Removed {} test(s).".format(rm_tests_count),
+        start = time.time()
+        rm_tests_count, msgs = clean.delete_tests(
+            tests_dir, filter_func, args.verbose,
+            progress=self._progress("Removing Tests", start),
+            group=group, umask=umask)
+        self._report(msgs, args.verbose)
+        output.fprint("Removed {} test(s){}."
+                      .format(rm_tests_count,
+                              self._rate(rm_tests_count, start)),
                       file=self.outfile, color=output.GREEN, clear=True)
 
         # Clean Series
         series_dir = pav_cfg.working_dir / 'series'       # type: Path
         output.fprint("Removing Series...", file=self.outfile, end=end)
-        rm_series_count, msgs = clean.delete_series(series_dir, args.verbose)
-        if args.verbose:
-            for msg in msgs:
-                output.fprint(msg, color=output.YELLOW)
-        output.fprint("Removed {} series.".format(rm_series_count),
+        start = time.time()
+        rm_series_count, msgs = clean.delete_series(
+            series_dir, args.verbose,
+            progress=self._progress("Removing Series", start),
+            group=group, umask=umask)
+        self._report(msgs, args.verbose)
+        output.fprint("Removed {} series{}."
+                      .format(rm_series_count,
+                              self._rate(rm_series_count, start)),
                       file=self.outfile, color=output.GREEN, clear=True)
 
         # Clean Builds
         builds_dir = pav_cfg.working_dir / 'builds'        # type: Path
         output.fprint("Removing Builds...", file=self.outfile, end=end)
-        rm_builds_count, msgs = clean.delete_builds(builds_dir, tests_dir,
-                                                    args.verbose)
-        if args.verbose:
-            for msg in msgs:
-                output.fprint(msg, color=output.YELLOW)
-        output.fprint("Removed {} build(s).".format(rm_builds_count),
+        start = time.time()
+        rm_builds_count, msgs = clean.delete_builds(
+            builds_dir, tests_dir, args.verbose,
+            progress=self._progress("Removing Builds", start),
+            group=group, umask=umask)
+        self._report(msgs, args.verbose)
+        output.fprint("Removed {} build(s){}."
+                      .format(rm_builds_count,
+                              self._rate(rm_builds_count, start)),
                       file=self.outfile, color=output.GREEN, clear=True)
 
+        # Anything left in the trash is from an interrupted clean.
+        trash_dir = pav_cfg.working_dir / dir_db.TRASH_DIR  # type: Path
+        msgs = dir_db.empty_trash(
+            trash_dir, progress=self._progress("Emptying Trash", time.time()))
+        self._report(msgs, args.verbose)
+
         return 0
+
+    def _progress(self, what: str, start: float):
+        """Return a progress callback (for dir_db.remove_paths) that prints
+        how many items have been removed, and how quickly."""
+
+        def progress(done: int, total: int):
+            """Print the current removal progress."""
+
+            output.fprint("{}: {}/{}{}".format(
+                what, done, total, self._rate(done, start)),
+                file=self.outfile, end='\r', width=None, clear=True)
+
+        return progress
+
+    @staticmethod
+    def _rate(count: int, start: float) -> str:
+        """Describe the time taken and rate of removing count items since
+        start."""
+
+        elapsed = time.time() - start
+        if not count or elapsed <= 0:
+            return ''
+
+        return " in {:.1f}s ({:.1f}/s)".format(elapsed, count/elapsed)
+
+    def _report(self, msgs, verbose: bool):
+        """Print the removal messages, when verbose."""
+
+        if verbose:
+            for msg in msgs:
+                output.fprint(msg, color=output.YELLOW, file=self.outfile)
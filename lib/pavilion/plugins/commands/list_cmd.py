@@ -262,6 +262,8 @@ class ListCommand(commands.Command):
             runs = dir_db.select(
                 id_dir=pav_cfg.working_dir/'test_runs',
                 transform=TestAttributes,
+                from_index=TestAttributes.from_index,
+                index_record=TestAttributes.index_record,
                 filter_func=filter_func,
                 order_func=order_func,
                 order_asc=ascending,
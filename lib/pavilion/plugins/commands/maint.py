@@ -2,9 +2,11 @@
 undefined) bits."""
 import pavilion.result.common
 from pavilion import commands
+from pavilion import dir_db
 from pavilion.commands import sub_cmd
 from pavilion import result
 from pavilion import output
+from pavilion.test_run import TestAttributes
 
 import errno
 
@@ -36,6 +38,9 @@ class MaintCommand(commands.Command):
             aliases=['prune_results', 'prune_result'],
             description=(
                 "Remove results with the given ids/uuids from the result log. "
+                "With --index-only, they're only dropped from the result log "
+                "index, and are removed from the log files themselves once "
+                "enough of a file has been pruned. "
                 "WARNING: This will cause changes to the log file that may "
                 "case log aggregation engines (namely Splunk) to re-index the "
                 "file. This can result in duplicate result log entries in said "
@@ -49,11 +54,31 @@ class MaintCommand(commands.Command):
             '--json', action='store_true', default=False,
             help="Print the pruned results as json rather than as a table."
         )
+        result_prune_p.add_argument(
+            '--index-only', action='store_true', default=False,
+            help="Only drop the pruned results from the result log index, "
+                 "rather than rewriting the log files now."
+        )
         result_prune_p.add_argument(
             'ids', nargs="+",
             help="Test run ids and/or uuids to prune in the results log."
         )
 
+        index_p = subparsers.add_parser(
+            name="index",
+            help="Rebuild or verify the test run index.",
+            description=(
+                "Pavilion keeps an index of test run attributes in the "
+                "working directory, so that test runs can be selected without "
+                "reading every test run directory. This rebuilds that index "
+                "from scratch, or checks it against the test run directories.")
+        )
+        index_p.add_argument(
+            '--verify', action='store_true', default=False,
+            help="Only report discrepancies between the index and the test "
+                 "runs, don't rebuild it."
+        )
+
     def run(self, pav_cfg, args):
         """Find and run the given maint sub-command."""
 
@@ -64,7 +89,8 @@ class MaintCommand(commands.Command):
         """Remove matching results from the results log."""
 
         try:
-            pruned = result.prune_result_log(pav_cfg.result_log, args.ids)
+            pruned = result.prune_result_log(pav_cfg.result_log, args.ids,
+                                             index_only=args.index_only)
         except pavilion.result.common.ResultError as err:
             output.fprint(err.args[0], file=self.errfile, color=output.RED)
             return errno.EACCES
@@ -81,3 +107,33 @@ class MaintCommand(commands.Command):
                 rows=pruned,
                 title="Pruned Results"
             )
+
+    @sub_cmd()
+    def _index_cmd(self, pav_cfg, args):
+        """Rebuild or verify the test run index."""
+
+        runs_dir = pav_cfg.working_dir/'test_runs'
+
+        if args.verify:
+            # The state recorded in the index is as of the last attribute
+            # save, so it's expected to lag behind.
+            msgs = dir_db.index_verify(
+                runs_dir, TestAttributes.index_record,
+                ignore=[TestAttributes.INDEX_STATE_KEY])
+            for msg in msgs:
+                output.fprint(msg, file=self.outfile, color=output.YELLOW)
+            output.fprint("Found {} index discrepancies.".format(len(msgs)),
+                          file=self.outfile)
+            return errno.EINVAL if msgs else 0
+
+        try:
+            count = len(dir_db.index_rebuild(runs_dir,
+                                             TestAttributes.index_record))
+        except (OSError, TimeoutError) as err:
+            output.fprint("Could not rebuild the test run index: {}"
+                          .format(err), file=self.errfile, color=output.RED)
+            return errno.EACCES
+
+        output.fprint("Rebuilt the test run index with {} test runs."
+                      .format(count), file=self.outfile, color=output.GREEN)
+        return 0
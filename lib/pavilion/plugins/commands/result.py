@@ -3,6 +3,9 @@
 import datetime
 import errno
 import io
+import json
+import logging
+import os
 import pprint
 import shutil
 from typing import List, IO
@@ -12,6 +15,8 @@ from pavilion import commands
 from pavilion import filters
 from pavilion import output
 from pavilion import result
+from pavilion import result_log
+from pavilion import system_variables
 from pavilion.test_config import resolver
 from pavilion.test_run import (TestRun, TestRunError, TestRunNotFoundError)
 
@@ -69,12 +74,29 @@ class ResultsCommand(commands.Command):
             help="Save the re-run to the test's results json and log. Will "
                  "not update the general pavilion result log."
         )
+        parser.add_argument(
+            '--jobs', type=int, default=os.cpu_count() or 1,
+            help="The number of processes to use when re-running results. "
+                 "Defaults to the number of cpus ({})."
+                 .format(os.cpu_count() or 1)
+        )
         parser.add_argument(
             '-L', '--show-log', action='store_true', default=False,
             help="Also show the result processing log. This is particularly"
                  "useful when re-parsing results, as the log is not saved."
         )
 
+        parser.add_argument(
+            '--from-log', action='store_true', default=False,
+            help="Get the results from the common result log rather than "
+                 "from each test run. This is much faster for large numbers "
+                 "of tests, and includes tests that have since been cleaned "
+                 "up. Tests may only be given by id or uuid, and only the "
+                 "name, sys-name, newer-than, older-than, passed, failed, "
+                 "result-error and limit filters apply. Can't be used to "
+                 "re-run results or show result logs."
+        )
+
         parser.add_argument(
             "tests",
             nargs="*",
@@ -86,6 +108,9 @@ class ResultsCommand(commands.Command):
     def run(self, pav_cfg, args):
         """Print the test results in a variety of formats."""
 
+        if args.from_log:
+            return self._results_from_log(pav_cfg, args)
+
         test_ids = cmd_utils.arg_filtered_tests(pav_cfg, args)
 
         tests = []
@@ -101,12 +126,9 @@ class ResultsCommand(commands.Command):
         if args.show_log and args.re_run:
             log_file = io.StringIO()
 
-        if args.re_run:
-            if not self.update_results(pav_cfg, tests, log_file):
-                return errno.EINVAL
-
-        if args.save:
-            if not self.update_results(pav_cfg, tests, log_file, save=True):
+        if args.re_run or args.save:
+            if not self.update_results(pav_cfg, tests, log_file,
+                                       save=args.save, jobs=args.jobs):
                 return errno.EINVAL
 
         if args.json or args.full:
@@ -178,8 +200,103 @@ class ResultsCommand(commands.Command):
 
         return 0
 
+    def _results_from_log(self, pav_cfg, args) -> int:
+        """Print the results that match the given arguments from the common
+        result log. Only the matching records are read from the log (via its
+        index), and they're printed as they're found where possible."""
+
+        if args.re_run or args.save or args.show_log:
+            output.fprint("The --from-log option can't be used with --re-run, "
+                          "--save, or --show-log.",
+                          color=output.RED, file=self.errfile)
+            return errno.EINVAL
+
+        ids, uuids = [], []
+        for test in args.tests:
+            if test.isdigit():
+                ids.append(int(test))
+            elif test == 'last' or test.startswith('s'):
+                output.fprint("Series ('{}') can't be given with --from-log."
+                              .format(test),
+                              color=output.RED, file=self.errfile)
+                return errno.EINVAL
+            else:
+                uuids.append(test)
+
+        equal = {}
+        ranges = {}
+        match = None
+
+        if args.tests:
+            def match(keys: dict) -> bool:
+                """Match records by test id or uuid."""
+                return keys.get('id') in ids or keys.get('uuid') in uuids
+
+        if not args.tests or args.force_filter:
+            sys_name = args.sys_name
+            if sys_name == filters.LOCAL_SYS_NAME:
+                sys_vars = system_variables.get_vars(defer=True)
+                sys_name = sys_vars['sys_name']
+            if sys_name:
+                equal['sys_name'] = [sys_name]
+
+            if args.passed:
+                equal['result'] = [TestRun.PASS]
+            elif args.failed:
+                equal['result'] = [TestRun.FAIL]
+            elif args.result_error:
+                equal['result'] = [TestRun.ERROR]
+
+            if args.newer_than is not None or args.older_than is not None:
+                ranges['created'] = tuple(
+                    when.isoformat(" ") if when is not None else None
+                    for when in (args.newer_than, args.older_than))
+
+            if args.name:
+                name_match = result_log.name_matcher(args.name)
+                if match is None:
+                    match = name_match
+                else:
+                    id_match = match
+
+                    def match(keys: dict) -> bool:
+                        """Match records by test id/uuid and name."""
+                        return id_match(keys) and name_match(keys)
+
+        records = result_log.query(pav_cfg.result_log, equal=equal,
+                                   ranges=ranges, match=match,
+                                   limit=args.limit)
+
+        try:
+            if args.json:
+                # Stream the records out as json lines.
+                for record in records:
+                    self.outfile.write(json.dumps(record) + '\n')
+                return 0
+            elif args.full:
+                width = shutil.get_terminal_size().columns
+                for record in records:
+                    pprint.pprint(record,  # ext-print: ignore
+                                  stream=self.outfile, width=width,
+                                  compact=True)
+                return 0
+        except OSError:
+            # It's ok if this fails. Generally means we're piping to
+            # another command.
+            return 0
+
+        output.draw_table(
+            outfile=self.outfile,
+            fields=self.BASE_FIELDS + args.key,
+            rows=list(records),
+            title="Test Results (from the result log)"
+        )
+
+        return 0
+
     def update_results(self, pav_cfg: dict, tests: List[TestRun],
-                       log_file: IO[str], save: bool = False) -> bool:
+                       log_file: IO[str], save: bool = False,
+                       jobs: int = 1) -> bool:
         """Update each of the given tests with the result section from the
         current version of their configs. Then rerun result processing and
         update the results in the test object (but change nothing on disk).
@@ -189,12 +306,15 @@ class ResultsCommand(commands.Command):
         :param log_file: The logfile to log results to. May be None.
         :param save: Whether to save the updated results to the test's result
                      log. It will not update the general result log.
+        :param jobs: The number of processes to gather results with.
         :returns: True if successful, False otherwise. Will handle
             printing of any failure related errors.
         """
 
         reslvr = resolver.TestConfigResolver(pav_cfg)
 
+        updated = []
+
         for test in tests:
 
             # Re-load the raw config using the saved name, host, and modes
@@ -270,12 +390,24 @@ class ResultsCommand(commands.Command):
                     color=output.RED, file=self.errfile)
                 return False
 
-            # The new results will be attached to the test (but not saved).
-            results = test.gather_results(test.results.get('return_value', 1),
-                                          regather=True, log_file=log_file)
+            updated.append(test)
+
+        # The new results will be attached to each test (but not saved).
+        errors = cmd_utils.regather_results(
+            pav_cfg, updated, jobs=jobs, log_file=log_file,
+            outfile=self.errfile)
+
+        success = True
+        log_records = []
+        for test, error in zip(updated, errors):
+            if error is not None:
+                output.fprint(error, color=output.RED, file=self.errfile)
+                success = False
+                continue
 
             if save:
-                test.save_results(results)
+                test.save_results(test.results, log=False)
+                log_records.extend(test.result_log_records(test.results))
                 with test.results_log.open('a') as log_file:
                     log_file.write(
                         "Results were re-ran and saved on {}\n"
@@ -283,5 +415,8 @@ class ResultsCommand(commands.Command):
                                 .strftime('%m-%d-%Y')))
                     log_file.write("See results.json for updated results.\n")
 
-        return True
+        if log_records:
+            # Add all the saved results to the result log at once.
+            logging.getLogger('common_results').info('\n'.join(log_records))
 
+        return success
@@ -121,14 +121,30 @@ class RunCommand(commands.Command):
 
         local_builds_only = getattr(args, 'local_builds_only', False)
 
-        test_list = self._get_tests(
+        # Tests are resolved, created, and built as a stream, so the first
+        # builds start while later tests are still being resolved.
+        all_tests = []
+        self.last_tests = all_tests
+        rp_errors = []
+
+        test_stream = self._get_tests(
             pav_cfg, args, mb_tracker, build_only=self.BUILD_ONLY,
-            local_builds_only=getattr(args, 'local_builds_only', False))
-        if test_list is None:
-            return errno.EINVAL
+            local_builds_only=local_builds_only)
 
-        all_tests = test_list
-        self.last_tests = all_tests
+        try:
+            res = cmd_utils.build_local(
+                tests=self._build_queue(test_stream, all_tests, rp_errors),
+                max_threads=pav_cfg.build_threads,
+                mb_tracker=mb_tracker,
+                build_verbosity=args.build_verbosity,
+                outfile=self.outfile,
+                errfile=self.errfile)
+        except commands.CommandError as err:
+            fprint(err, file=self.errfile, flush=True)
+            self._complete_tests(all_tests)
+            return errno.EINVAL
+        finally:
+            test_stream.close()
 
         if not all_tests:
             fprint("You must specify at least one test.", file=self.errfile)
@@ -137,20 +153,12 @@ class RunCommand(commands.Command):
         series = TestSeries(pav_cfg, all_tests)
         self.last_series = series
 
-        res = self.check_result_format(all_tests)
-        if res != 0:
+        if rp_errors:
             self._complete_tests(all_tests)
-            return res
+            return self.report_result_format_errors(rp_errors)
 
         all_tests = [test for test in all_tests if not test.skipped]
 
-        res = cmd_utils.build_local(
-            tests=all_tests,
-            max_threads=pav_cfg.build_threads,
-            mb_tracker=mb_tracker,
-            build_verbosity=args.build_verbosity,
-            outfile=self.outfile,
-            errfile=self.errfile)
         if res != 0:
             self._complete_tests(all_tests)
             return res
@@ -179,6 +187,26 @@ class RunCommand(commands.Command):
             errfile=self.errfile
         )
 
+    def _build_queue(self, tests, all_tests, rp_errors):
+        """Record each test as it's created, and pass along those that
+        should be built. Result parser configuration errors are added to
+        rp_errors; once there are any, nothing more is passed along to be
+        built.
+
+        :param Iterator[TestRun] tests: The test stream.
+        :param list all_tests: Where to record every test created.
+        :param list rp_errors: Where to record (test, msg) result parser
+            configuration errors.
+        """
+
+        for test in tests:
+            all_tests.append(test)
+
+            errors = self.check_result_format([test])
+            rp_errors.extend(errors)
+            if not rp_errors and not test.skipped:
+                yield test
+
     def _get_tests(self, pav_cfg, args, mb_tracker, build_only=False,
                    local_builds_only=False):
         """Turn the test run arguments into actual TestRun objects.
@@ -189,42 +217,33 @@ class RunCommand(commands.Command):
             these tests.
         :param bool local_builds_only: Only include tests that would be built
             locally.
-        :return:
-        :rtype: []
+        :return: A generator of test runs, created as they're resolved.
+        :rtype: Iterator[TestRun]
+        :raises commands.CommandError: While iterating, when the tests can't
+            be resolved or created.
         """
 
-        try:
-            test_configs = cmd_utils.get_test_configs(pav_cfg=pav_cfg,
-                                                      host=args.host,
-                                                      test_files=args.files,
-                                                      tests=args.tests,
-                                                      modes=args.modes,
-                                                      overrides=args.overrides,
-                                                      outfile=self.outfile)
-
-            # Remove non-local builds when doing only local builds.
-            if build_only and local_builds_only:
-                locally_built_tests = []
-                for ptest in test_configs:
-                    if ptest.config['build']['on_nodes'].lower() != 'true':
-                        locally_built_tests.append(ptest)
-
-                test_configs = locally_built_tests
-
-            test_list = cmd_utils.configs_to_tests(
-                pav_cfg=pav_cfg,
-                proto_tests=test_configs,
-                mb_tracker=mb_tracker,
-                build_only=build_only,
-                rebuild=args.rebuild,
-                outfile=self.outfile,
-            )
-
-        except commands.CommandError as err:
-            fprint(err, file=self.errfile, flush=True)
-            return None
-
-        return test_list
+        test_configs = cmd_utils.iter_test_configs(pav_cfg=pav_cfg,
+                                                   host=args.host,
+                                                   test_files=args.files,
+                                                   tests=args.tests,
+                                                   modes=args.modes,
+                                                   overrides=args.overrides,
+                                                   outfile=self.outfile)
+
+        # Remove non-local builds when doing only local builds.
+        if build_only and local_builds_only:
+            test_configs = (
+                ptest for ptest in test_configs
+                if ptest.config['build']['on_nodes'].lower() != 'true')
+
+        return cmd_utils.iter_configs_to_tests(
+            pav_cfg=pav_cfg,
+            proto_tests=test_configs,
+            mb_tracker=mb_tracker,
+            build_only=build_only,
+            rebuild=args.rebuild,
+        )
 
     @staticmethod
     def _cancel_all(tests_by_sched):
@@ -246,8 +265,12 @@ class RunCommand(commands.Command):
         for test in tests:
             test.set_run_complete()
 
-    def check_result_format(self, tests):
-        """Make sure the result parsers for each test are ok."""
+    @staticmethod
+    def check_result_format(tests):
+        """Make sure the result parsers for each test are ok.
+
+        :returns: A list of (test, error message) tuples.
+        """
 
         rp_errors = []
         for test in tests:
@@ -259,11 +282,16 @@ class RunCommand(commands.Command):
             except result.ResultError as err:
                 rp_errors.append((test, str(err)))
 
-        if rp_errors:
-            fprint("Result Parser configurations had errors:",
-                   file=self.errfile, color=output.RED)
-            for test, msg in rp_errors:
-                fprint(test.name, '-', msg, file=self.errfile)
-            return errno.EINVAL
+        return rp_errors
+
+    def report_result_format_errors(self, rp_errors):
+        """Print the given result parser configuration errors.
+
+        :returns: The error code for the run.
+        """
 
-        return 0
+        fprint("Result Parser configurations had errors:",
+               file=self.errfile, color=output.RED)
+        for test, msg in rp_errors:
+            fprint(test.name, '-', msg, file=self.errfile)
+        return errno.EINVAL
@@ -14,6 +14,7 @@ from pavilion import config
 from pavilion import expression_functions
 from pavilion import module_wrapper
 from pavilion import output
+from pavilion import plugins
 from pavilion import result
 from pavilion import schedulers
 from pavilion import status_file
@@ -793,4 +794,9 @@ class ShowCommand(commands.Command):
     @sub_cmd()
     def _test_config_cmd(self, *_):
         """Show the basic test config format."""
+
+        # These plugins add their own sections to the test config.
+        plugins.load_plugins('sched')
+        plugins.load_plugins('result')
+
         file_format.TestConfigLoader().dump(self.outfile)
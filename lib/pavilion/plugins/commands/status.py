@@ -4,9 +4,11 @@ other commands to print statuses."""
 import errno
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, IO
+from typing import List, IO, Union
 
+from pavilion import builder
 from pavilion import commands
 from pavilion import dir_db
 from pavilion import filters
@@ -15,17 +17,50 @@ from pavilion import schedulers
 from pavilion import series
 from pavilion import cmd_utils
 from pavilion.series import TestSeries, TestSeriesError
-from pavilion.status_file import STATES
+from pavilion.status_file import STATES, StatusFile, TestStatusError
 from pavilion.test_run import (
     TestRun, TestRunError, TestRunNotFoundError, TestAttributes)
 
 
+# The maximum number of threads to use when reading test statuses.
+STATUS_THREADS = 16
+
+
 def get_last_ctime(path):
     """Gets the time path was modified."""
     mtime = os.path.getmtime(str(path))
-    ctime = str(time.ctime(mtime))
-    ctime = ctime[11:19]
-    return ctime
+    return _format_ctime(mtime)
+
+
+def _format_ctime(mtime: float) -> str:
+    """Format a timestamp as just the time of day."""
+
+    return str(time.ctime(mtime))[11:19]
+
+
+def _add_update_note(pav_cfg, test_path, build_name, status_f):
+    """Add a note on when the build or run log was last updated to building
+    and running statuses."""
+
+    if status_f.state == STATES.BUILDING:
+        if build_name is None:
+            last_update = None
+        else:
+            last_update = builder.build_log_updated(
+                pav_cfg.working_dir/'builds'/build_name)
+        if last_update is not None:
+            last_update = _format_ctime(last_update)
+        status_f.note = ' '.join([
+            status_f.note, '\nLast updated: ',
+            last_update if last_update is not None else '<unknown>'])
+    elif status_f.state == STATES.RUNNING:
+        try:
+            last_update = get_last_ctime(test_path/'run.log')
+        except OSError:
+            last_update = None
+        status_f.note = ' '.join([
+            status_f.note, '\nLast updated:',
+            last_update if last_update is not None else '<unknown>'])
 
 
 def status_from_test_obj(pav_cfg: dict, test: TestRun):
@@ -39,25 +74,80 @@ def status_from_test_obj(pav_cfg: dict, test: TestRun):
 :rtype: list(dict)
     """
 
-    status_f = test.status.current()
+    return statuses_from_test_objs(pav_cfg, [test])[0]
+
+
+def statuses_from_test_objs(pav_cfg: dict, tests: List[TestRun]):
+    """As per status_from_test_obj, but for a list of tests. Tests
+    that are still scheduled have their scheduler status checked with one
+    query per scheduler, rather than one per test.
+
+:param pav_cfg: Pavilion base configuration.
+:param tests: A list of Pavilion test objects.
+:return: A list of status dictionaries, in the same order as tests.
+:rtype: list(dict)
+    """
+
+    statuses = [test.status.current() for test in tests]
+
+    scheduled = [i for i, status_f in enumerate(statuses)
+                 if status_f.state == STATES.SCHEDULED]
+    sched_statuses = schedulers.get_job_statuses(
+        pav_cfg, [tests[i] for i in scheduled])
+    for i, status_f in zip(scheduled, sched_statuses):
+        statuses[i] = status_f
+
+    status_list = []
+    for test, status_f in zip(tests, statuses):
+        _add_update_note(pav_cfg, test.path, test.build_name, status_f)
+
+        status_list.append({
+            'test_id': test.id,
+            'name':    test.name,
+            'state':   status_f.state,
+            'time':    status_f.when,
+            'note':    status_f.note,
+        })
+
+    return status_list
+
+
+def _light_status(pav_cfg, test_id: int) -> Union[dict, None]:
+    """Get the status of a test using only its status and attributes files,
+    without loading the test run itself (which means parsing its config,
+    loading variables, creating a builder, and so on).
+
+    :returns: The status dict, or None if the test needs to be fully loaded
+        to get its status (it's scheduled, so the scheduler needs to be
+        asked, or its files are missing or incomplete).
+    """
+
+    path = dir_db.make_id_path(pav_cfg.working_dir/'test_runs', test_id)
+
+    status_path = path/'status'
+    # Leave missing tests to the full load, which will report the error.
+    # Creating a StatusFile object would also create a missing status file.
+    if not status_path.is_file():
+        return None
+
+    try:
+        attrs = TestAttributes(path)
+        status_f = StatusFile(status_path).current()
+    except (TestRunError, TestStatusError, OSError):
+        return None
+
+    # Older test runs may not have this in their attributes.
+    if attrs.name is None:
+        return None
 
     if status_f.state == STATES.SCHEDULED:
-        sched = schedulers.get_plugin(test.scheduler)
-        status_f = sched.job_status(pav_cfg, test)
-    elif status_f.state == STATES.BUILDING:
-        last_update = test.builder.log_updated()
-        status_f.note = ' '.join([
-            status_f.note, '\nLast updated: ',
-            last_update if last_update is not None else '<unknown>'])
-    elif status_f.state == STATES.RUNNING:
-        last_update = get_last_ctime(test.path/'run.log')
-        status_f.note = ' '.join([
-            status_f.note, '\nLast updated:',
-            last_update if last_update is not None else '<unknown>'])
+        return None
+
+    _add_update_note(pav_cfg, path, attrs.build_name, status_f)
 
     return {
-        'test_id': test.id,
-        'name':    test.name,
+        'test_id': test_id,
+        'name':    attrs.name,
         'state':   status_f.state,
         'time':    status_f.when,
         'note':    status_f.note,
@@ -66,24 +156,41 @@ def status_from_test_obj(pav_cfg: dict, test: TestRun):
 
 def get_test_statuses(pav_cfg, test_ids):
     """Return the statuses for all tests, up to the limit in args.limit.
+    Statuses are read directly from each test's status and attributes
+    files (in parallel); only tests that are scheduled (and need their
+    scheduler queried) are fully loaded.
+
     :param List[int] test_ids: A list of test ids to load.
     """
 
-    test_statuses = []
+    test_ids = list(test_ids)
+    workers = max(1, min(STATUS_THREADS, len(test_ids)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        test_statuses = list(pool.map(
+            lambda tid: _light_status(pav_cfg, tid), test_ids))
 
-    for test_id in test_ids:
-        try:
-            test = TestRun.load(pav_cfg, test_id)
-            test_statuses.append(status_from_test_obj(pav_cfg, test))
+    tests = []
+    test_idx = []
 
+    for i, test_id in enumerate(test_ids):
+        if test_statuses[i] is not None:
+            continue
+
+        try:
+            tests.append(TestRun.load(pav_cfg, test_id))
+            test_idx.append(i)
         except (TestRunError, TestRunNotFoundError) as err:
-            test_statuses.append({
+            test_statuses[i] = {
                 'test_id': test_id,
                 'name':    "",
                 'state':   STATES.UNKNOWN,
                 'time':    None,
                 'note':    "Test not found: {}".format(err)
-            })
+            }
+
+    for i, test_status in zip(test_idx,
+                              statuses_from_test_objs(pav_cfg, tests)):
+        test_statuses[i] = test_status
 
     return test_statuses
 
@@ -146,26 +253,7 @@ def get_statuses(pav_cfg, tests: List[int], errfile: IO['str']):
 """
 
     test_list = get_tests(pav_cfg, tests, errfile)
-    test_statuses = []
-    test_obj_list = []
-    for test_id in test_list:
-        try:
-            test = TestRun.load(pav_cfg, test_id)
-            test_obj_list.append(test)
-        except (TestRunError, TestRunNotFoundError) as err:
-            test_statuses.append({
-                'test_id': test_id,
-                'name':    "",
-                'state':   STATES.UNKNOWN,
-                'time':    None,
-                'note':    "Error loading test: {}".format(err),
-            })
-
-    statuses = [status_from_test_obj(pav_cfg, test) for test in test_obj_list]
-
-    if statuses is not None:
-        test_statuses = test_statuses + statuses
-    return test_statuses
+    return get_test_statuses(pav_cfg, test_list)
 
 
 def print_status(statuses, outfile, json=False):
@@ -214,7 +302,7 @@ def print_from_tests(pav_cfg, tests, outfile, json=False):
     :rtype: int
     """
 
-    status_list = [status_from_test_obj(pav_cfg, test) for test in tests]
+    status_list = statuses_from_test_objs(pav_cfg, tests)
     return print_status(status_list, outfile, json)
 
 
@@ -1,12 +1,16 @@
-import copy
 import time
-from typing import List
+from pathlib import Path
+from typing import Dict, List
 
 from pavilion import commands
+from pavilion import dir_db
+from pavilion import inotify
+from pavilion import schedulers
 from pavilion.output import fprint
 from pavilion.plugins.commands import status
-from pavilion.status_file import STATES
-from pavilion.test_run import TestRun
+from pavilion.status_file import STATES, StatusFile, TestStatusError
+from pavilion.test_run import (
+    TestRun, TestAttributes, TestRunError, TestRunNotFoundError)
 
 
 class WaitCommand(commands.Command):
@@ -76,58 +80,222 @@ class WaitCommand(commands.Command):
 
     STATUS_UPDATE_PERIOD = 5  # seconds
 
+    # How long to sleep between checks for completed tests. The interval
+    # backs off from the minimum to the maximum while nothing completes.
+    POLL_MIN = 0.5  # seconds
+    POLL_MAX = 5  # seconds
+    POLL_BACKOFF = 1.5
+
     def wait(self, pav_cfg, tests: List[int], end_time: float,
              out_mode: str) -> None:
         """Wait on each of the given tests to complete, printing a status
-        message """
+        message every STATUS_UPDATE_PERIOD seconds.
+
+        Completion is detected by the existence of each test's RUN_COMPLETE
+        file, so tests are never fully loaded just to check on them. On
+        local filesystems, inotify is used to notice those files as soon as
+        they appear."""
+
+        runs_dir = pav_cfg.working_dir/'test_runs'
+        waiting = {test_id: dir_db.make_id_path(runs_dir, test_id)
+                   for test_id in tests}
+        progress = _WaitProgress(pav_cfg)
+
+        watcher = self._make_watcher(runs_dir, waiting.values())
+
+        # Which tests to check for completion this pass.
+        to_check = list(waiting.keys())
 
+        poll = self.POLL_MIN
         status_time = time.time() + self.STATUS_UPDATE_PERIOD
-        while (len(tests) != 0) and (end_time is None or
-                                     time.time() < end_time):
-
-            # Check which tests have completed or failed and move them to the
-            # final list.
-            temp_tests = copy.deepcopy(tests)
-            for test_id in temp_tests:
-                test_obj = TestRun.load(pav_cfg, test_id)
-                run_complete_file = test_obj.path/'RUN_COMPLETE'
-                if run_complete_file.exists():
-                    tests.remove(test_id)
-
-            # print status every 5 seconds
-            if time.time() > status_time:
-                status_time = time.time() + self.STATUS_UPDATE_PERIOD
-
-                stats = status.get_statuses(pav_cfg, tests, self.errfile)
-                stats_out = []
-
-                if out_mode == self.OUT_SILENT:
-                    pass
-                elif out_mode == self.OUT_SUMMARY:
-                    states = {}
-                    for test in stats:
-                        if test['state'] not in states.keys():
-                            states[test['state']] = 1
-                        else:
-                            states[test['state']] += 1
-                    status_counts = []
-                    for state, count in states.items():
-                        status_counts.append(state + ': ' + str(count))
-                    fprint(' | '.join(status_counts), file=self.outfile,
-                           end='\r', width=None)
+        try:
+            while waiting and (end_time is None or time.time() < end_time):
+
+                # Check which tests have completed or failed and stop waiting
+                # on them.
+                completed = False
+                for test_id in to_check:
+                    path = waiting.get(test_id)
+                    if path is not None and (path/TestRun.COMPLETE_FN).exists():
+                        del waiting[test_id]
+                        completed = True
+
+                if completed:
+                    poll = self.POLL_MIN
                 else:
-                    for test in stats:
-                        stat = [str(time.ctime(time.time())), ':',
-                                'test #',
-                                str(test['test_id']),
-                                test['name'],
-                                test['state'],
-                                test['note'],
-                                "\n"]
-                        stats_out.append(' '.join(stat))
-                    fprint(''.join(map(str, stats_out)),
-                           file=self.outfile, width=None)
+                    poll = min(poll * self.POLL_BACKOFF, self.POLL_MAX)
+
+                # print status every 5 seconds
+                now = time.time()
+                if now > status_time:
+                    status_time = now + self.STATUS_UPDATE_PERIOD
+                    stats = progress.statuses(waiting)
+                    self._print_progress(stats, out_mode)
+
+                if not waiting:
+                    break
+
+                # Sleep until something might have changed, but always
+                # recheck everything at status update time.
+                timeout = max(0, min(poll, status_time - time.time()))
+                if end_time is not None:
+                    timeout = max(0, min(timeout, end_time - time.time()))
+
+                if watcher is None:
+                    time.sleep(timeout)
+                    to_check = list(waiting.keys())
+                else:
+                    events = watcher.wait(timeout)
+                    if time.time() >= status_time:
+                        to_check = list(waiting.keys())
+                    else:
+                        to_check = [int(path.name) for path in events]
+        finally:
+            if watcher is not None:
+                watcher.close()
 
         final_stats = status.get_statuses(pav_cfg, tests, self.errfile)
         fprint('\n', file=self.outfile)
         status.print_status(final_stats, self.outfile)
+
+    @staticmethod
+    def _make_watcher(runs_dir, paths):
+        """Create an inotify watcher for the given test run directories,
+        if the working directory is on a local filesystem. Returns None if
+        we should just poll instead."""
+
+        if not (inotify.available() and inotify.is_local(runs_dir)):
+            return None
+
+        try:
+            watcher = inotify.Watcher()
+        except OSError:
+            return None
+
+        try:
+            for path in paths:
+                if path.is_dir():
+                    watcher.add(path)
+        except OSError:
+            # Probably too many tests to watch. Polling will have to do.
+            watcher.close()
+            return None
+
+        return watcher
+
+    def _print_progress(self, stats, out_mode):
+        """Print a progress update given the latest test statuses."""
+
+        stats_out = []
+
+        if out_mode == self.OUT_SILENT:
+            pass
+        elif out_mode == self.OUT_SUMMARY:
+            states = {}
+            for test in stats:
+                if test['state'] not in states.keys():
+                    states[test['state']] = 1
+                else:
+                    states[test['state']] += 1
+            status_counts = []
+            for state, count in states.items():
+                status_counts.append(state + ': ' + str(count))
+            fprint(' | '.join(status_counts), file=self.outfile,
+                   end='\r', width=None)
+        else:
+            for test in stats:
+                stat = [str(time.ctime(time.time())), ':',
+                        'test #',
+                        str(test['test_id']),
+                        test['name'],
+                        test['state'],
+                        test['note'],
+                        "\n"]
+                stats_out.append(' '.join(stat))
+            fprint(''.join(map(str, stats_out)),
+                   file=self.outfile, width=None)
+
+
+class _WaitProgress:
+    """Gather test statuses for wait progress updates as cheaply as possible.
+    Statuses come straight from the tail of each test's status file. Only
+    tests that are still scheduled are fully loaded (once), as the scheduler
+    needs the test object to check on them."""
+
+    def __init__(self, pav_cfg):
+        self.pav_cfg = pav_cfg
+        self._names = {}
+        self._loaded = {}
+
+    def statuses(self, waiting: Dict[int, Path]) -> List[dict]:
+        """Return a status dict (as per the status command) for each
+        test we're waiting on."""
+
+        stats = []
+        scheduled = []
+        for test_id, path in waiting.items():
+            stat = {
+                'test_id': test_id,
+                'name': self._name(test_id, path),
+                'state': STATES.UNKNOWN,
+                'time': None,
+                'note': '',
+            }
+            stats.append(stat)
+
+            status_path = path/'status'
+            if not status_path.exists():
+                stat['note'] = "Test not found."
+                continue
+
+            try:
+                status_f = StatusFile(status_path).current()
+            except TestStatusError as err:
+                stat['note'] = str(err)
+                continue
+
+            if status_f.state == STATES.SCHEDULED:
+                test = self._load(test_id)
+                if test is not None:
+                    scheduled.append((stat, test))
+
+            stat.update({
+                'state': status_f.state,
+                'time': status_f.when,
+                'note': status_f.note,
+            })
+
+        # Check on the scheduled tests all at once. This may also mark
+        # them as complete.
+        sched_statuses = schedulers.get_job_statuses(
+            self.pav_cfg, [test for _, test in scheduled])
+        for (stat, _), status_f in zip(scheduled, sched_statuses):
+            stat.update({
+                'state': status_f.state,
+                'time': status_f.when,
+                'note': status_f.note,
+            })
+
+        return stats
+
+    def _name(self, test_id, path):
+        """Get the (cached) name of the given test."""
+
+        if test_id not in self._names:
+            try:
+                self._names[test_id] = TestAttributes(path).name or ''
+            except TestRunError:
+                self._names[test_id] = ''
+
+        return self._names[test_id]
+
+    def _load(self, test_id):
+        """Get the (cached) test object for the given test."""
+
+        if test_id not in self._loaded:
+            try:
+                self._loaded[test_id] = TestRun.load(self.pav_cfg, test_id)
+            except (TestRunError, TestRunNotFoundError):
+                self._loaded[test_id] = None
+
+        return self._loaded[test_id]
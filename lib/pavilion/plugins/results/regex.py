@@ -1,11 +1,11 @@
 """Parse regular expressions from file."""
 
-import re
 import sre_constants
 
 from pavilion.result import ResultError
 import yaml_config as yc
 from pavilion.result import parsers
+from pavilion.result.common import compile_regex
 
 
 class Regex(parsers.ResultParser):
@@ -44,16 +44,21 @@ class Regex(parsers.ResultParser):
     def _check_args(self, **kwargs):
 
         try:
-            kwargs['regex'] = re.compile(kwargs['regex'])
+            kwargs['regex'] = compile_regex(kwargs['regex'])
         except (ValueError, sre_constants.error) as err:
             raise ResultError(
                 "Invalid regular expression: {}".format(err))
 
         return kwargs
 
+    def line_filter(self, regex=None):
+        """We only ever match against the first line."""
+
+        return compile_regex(regex)
+
     def __call__(self, file, regex=None):
 
-        cregex = re.compile(regex)
+        cregex = compile_regex(regex)
 
         line = file.readline()
         match = cregex.search(line)
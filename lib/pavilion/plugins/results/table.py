@@ -4,6 +4,7 @@ import re
 
 import yaml_config as yc
 from pavilion.result import parsers, ResultError
+from pavilion.result.common import compile_regex
 
 
 class Table(parsers.ResultParser):
@@ -75,8 +76,8 @@ class Table(parsers.ResultParser):
             validators={
                 'has_header': ('True', 'False'),
                 'by_column':  ('True', 'False'),
-                'delimiter_re': re.compile,
-                'table_end_re': re.compile,
+                'delimiter_re': compile_regex,
+                'table_end_re': compile_regex,
             }
 
         )
@@ -89,9 +90,9 @@ class Table(parsers.ResultParser):
                  row_ignore_re=None):
 
         col_names = [] if col_names is None else col_names
-        row_ignore_re = re.compile(row_ignore_re)
-        table_end_re = re.compile(table_end_re)
-        delimiter_re = re.compile(delimiter_re)
+        row_ignore_re = compile_regex(row_ignore_re)
+        table_end_re = compile_regex(table_end_re)
+        delimiter_re = compile_regex(delimiter_re)
         by_column = by_column == "True"
         has_row_labels = has_row_labels == "True"
 
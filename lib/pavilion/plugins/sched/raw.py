@@ -255,10 +255,13 @@ class Raw(SchedulerPlugin):
 
     CANCEL_TIMEOUT = 1
 
-    def _cancel_job(self, test):
-        """Try to kill the given test's pid (if it is the right pid).
+    def _signal_job(self, test):
+        """Send SIGTERM to the given test's process, if it's (still) the
+        process for that test.
 
         :param pavilion.test_run.TestRun test: The test to cancel.
+        :returns: None if the process was signaled, otherwise a StatusInfo
+            object explaining why it wasn't.
         """
 
         host, pid = test.job_id.rsplit('_', 1)
@@ -287,6 +290,20 @@ class Raw(SchedulerPlugin):
                 .format(pid, str(err))
             )
 
+        return None
+
+    def _cancel_job(self, test):
+        """Try to kill the given test's pid (if it is the right pid).
+
+        :param pavilion.test_run.TestRun test: The test to cancel.
+        """
+
+        status = self._signal_job(test)
+        if status is not None:
+            return status
+
+        _, pid = test.job_id.rsplit('_', 1)
+
         timeout = time.time() + self.CANCEL_TIMEOUT
         while self._verify_pid(pid, test.id) and time.time() < timeout:
             time.sleep(.1)
@@ -304,3 +321,41 @@ class Raw(SchedulerPlugin):
                 STATES.SCHED_ERROR,
                 "PID {} refused to die.".format(pid)
             )
+
+    def _cancel_jobs(self, tests):
+        """Signal the processes of all the given tests, and then wait (up to
+        CANCEL_TIMEOUT in total) for all of them to die.
+
+        :param List[pavilion.test_run.TestRun] tests: The tests to cancel.
+        :returns: A list of StatusInfo objects, in the same order as tests.
+        """
+
+        statuses = [None] * len(tests)
+        signaled = {}
+        for i, test in enumerate(tests):
+            status = self._signal_job(test)
+            if status is None:
+                signaled[i] = test.job_id.rsplit('_', 1)[1]
+            else:
+                statuses[i] = status
+
+        running = signaled
+        timeout = time.time() + self.CANCEL_TIMEOUT
+        while running:
+            running = {i: pid for i, pid in running.items()
+                       if self._verify_pid(pid, tests[i].id)}
+            if not running or time.time() >= timeout:
+                break
+            time.sleep(.1)
+
+        for i, pid in signaled.items():
+            if i in running:
+                statuses[i] = StatusInfo(
+                    STATES.SCHED_ERROR,
+                    "PID {} refused to die.".format(pid))
+            else:
+                statuses[i] = StatusInfo(
+                    STATES.SCHED_CANCELLED,
+                    "PID {} was terminated.".format(pid))
+
+        return statuses
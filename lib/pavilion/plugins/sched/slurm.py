@@ -6,12 +6,15 @@ import math
 import os
 import re
 import subprocess
+import time
+from collections import defaultdict
 from pathlib import Path
 from typing import List
 
 import yaml_config as yc
 from pavilion import scriptcomposer
 from pavilion import schedulers
+from pavilion.permissions import PermissionsManager
 from pavilion.schedulers import SchedulerPluginError
 from pavilion.schedulers import SchedulerVariables
 from pavilion.schedulers import dfr_var_method
@@ -331,6 +334,9 @@ class Slurm(schedulers.SchedulerPlugin):
 
     KICKOFF_SCRIPT_EXT = '.sbatch'
 
+    # Don't flood slurmctld with sbatch calls.
+    SUBMIT_INTERVAL = 0.1
+
     VAR_CLASS = SlurmVars
 
     NUM_NODES_REGEX = re.compile(r'^(\d+|all)(-(\d+|all))?$')
@@ -359,6 +365,7 @@ class Slurm(schedulers.SchedulerPlugin):
             priority=10)
 
         self.node_data = None
+        self._job_info_cache = None
 
     @staticmethod
     def _get_config_elems():
@@ -427,6 +434,18 @@ class Slurm(schedulers.SchedulerPlugin):
             yc.StrElem(
                 'job_name', default="pav",
                 help_text="The job name for this test."),
+            yc.StrElem(
+                'share_allocation', choices=['false', 'serial', 'parallel'],
+                default='false',
+                help_text="Share a single allocation with other tests "
+                          "started at the same time that also share "
+                          "allocations and otherwise have the same slurm "
+                          "config (the time limit excepted). With 'serial', "
+                          "the tests run one after another in the "
+                          "allocation. With 'parallel', they all start at "
+                          "once, so each should only use part of the "
+                          "allocation. Cancelling any of these tests "
+                          "cancels the whole allocation."),
 
         ]
 
@@ -970,6 +989,16 @@ class Slurm(schedulers.SchedulerPlugin):
     def job_status(self, pav_cfg, test):
         """Get the current status of the slurm job for the given test."""
 
+        cached = self._cached_job_info()
+        if cached is not None and test.job_id in cached:
+            return self._job_info_status(test, cached[test.job_id])
+
+        return self._job_status_direct(test)
+
+    def _job_status_direct(self, test):
+        """Get the status of the test's job by asking scontrol about just
+        that job."""
+
         try:
             job_info = self._scontrol_show('job', test.job_id)
         except ValueError as err:
@@ -992,6 +1021,84 @@ class Slurm(schedulers.SchedulerPlugin):
         if job_info:
             self.logger.info("Extra items in show job output: %s", job_info)
 
+        return self._job_info_status(test, job_info)
+
+    # How long (in seconds) to reuse the results of a full 'scontrol show job'.
+    JOB_INFO_CACHE_TIME = 5
+    # Below this many jobs, querying them individually is cheaper than
+    # getting info on every job slurm knows about.
+    JOB_STATUS_BATCH_MIN = 5
+
+    def job_statuses(self, pav_cfg, tests):
+        """Get the status of all the given tests' slurm jobs with a single
+        'scontrol show job' call. The parsed job info is cached briefly, so
+        that repeated callers (such as 'pav wait') share it."""
+
+        if len(tests) < self.JOB_STATUS_BATCH_MIN:
+            return super().job_statuses(pav_cfg, tests)
+
+        job_info = self._cached_job_info()
+        fresh = job_info is None
+        if fresh:
+            try:
+                job_info = self._get_job_info()
+            except ValueError as err:
+                return [StatusInfo(state=STATES.SCHED_ERROR,
+                                   note=str(err),
+                                   when=self._now())
+                        for _ in tests]
+
+        # Jobs submitted since the cache was filled won't be in it, so
+        # refresh it once.
+        if not fresh and any(test.job_id not in job_info for test in tests):
+            try:
+                job_info = self._get_job_info()
+            except ValueError:
+                pass
+
+        statuses = []
+        for test in tests:
+            if test.job_id in job_info:
+                statuses.append(
+                    self._job_info_status(test, job_info[test.job_id]))
+            else:
+                # Ask about the job directly before giving up on it.
+                statuses.append(self._job_status_direct(test))
+
+        return statuses
+
+    def _get_job_info(self):
+        """Get the (parsed) info for every job slurm knows about, and cache it.
+
+        :returns: A dict of job info dicts by job id.
+        :raises ValueError: When scontrol fails.
+        """
+
+        job_info = {}
+        for info in self._scontrol_show('job'):
+            if 'JobId' in info:
+                job_info[info['JobId']] = info
+
+        self._job_info_cache = (time.time(), job_info)
+        return job_info
+
+    def _cached_job_info(self):
+        """Return the cached job info, if it's recent enough. Otherwise
+        return None."""
+
+        if self._job_info_cache is None:
+            return None
+
+        when, job_info = self._job_info_cache
+        if time.time() - when > self.JOB_INFO_CACHE_TIME:
+            return None
+
+        return job_info
+
+    def _job_info_status(self, test, job_info):
+        """Translate the parsed scontrol info for a test's job into a
+        StatusInfo object."""
+
         job_state = job_info.get('JobState', 'UNKNOWN')
         if job_state in self.SCHED_WAITING:
             return StatusInfo(
@@ -1044,6 +1151,121 @@ class Slurm(schedulers.SchedulerPlugin):
             when=self._now()
         )
 
+    # These slurm config keys don't need to match for tests to share an
+    # allocation.
+    SHARE_IGNORE_KEYS = ('time_limit',)
+
+    def pack_tests(self, tests):
+        """Group tests that opted to share an allocation by their slurm
+        config."""
+
+        packed = []
+        shared = defaultdict(list)
+        for test in tests:
+            sched_config = test.config[self.name]
+            if sched_config.get('share_allocation', 'false') == 'false':
+                packed.append([test])
+                continue
+
+            key = (test.group, test.umask) + tuple(
+                (k, str(v)) for k, v in sorted(sched_config.items())
+                if k not in self.SHARE_IGNORE_KEYS)
+            shared[key].append(test)
+
+        packed.extend(shared.values())
+        return packed
+
+    def run_suite(self, pav_cfg, tests):
+        """Submit a single kickoff script that runs all of the given tests
+        in one allocation. Each test still runs via 'pav _run', and so gets
+        its own status, results, and kickoff log."""
+
+        first = tests[0]
+        sched_config = first.config[self.name]
+        parallel = sched_config['share_allocation'] == 'parallel'
+
+        suite_config = dict(sched_config)
+        suite_config['time_limit'] = self._suite_time_limit(tests, parallel)
+
+        nodes = self.get_data()['nodes']
+        header = SbatchHeader(suite_config,
+                              self._get_node_range(sched_config,
+                                                   nodes.values()),
+                              first.id,
+                              self.get_vars(sched_config))
+
+        script = scriptcomposer.ScriptComposer(header=header)
+        self._add_kickoff_env(pav_cfg, script)
+
+        script.comment("Run each test, {}."
+                       .format('all at once' if parallel else 'in order'))
+        for test in tests:
+            script.command('pav _run {t.id} >{log} 2>&1{bg}'.format(
+                t=test, log=test.path/'kickoff.log',
+                bg=' &' if parallel else ''))
+        if parallel:
+            script.command('wait')
+
+        # The suite's kickoff script lives with the first test.
+        path = self._kickoff_script_path(first)
+        try:
+            with PermissionsManager(path, first.group, first.umask):
+                script.write(path)
+
+            job_id = self._schedule(first, path)
+        except Exception:
+            # If this fails, consider these tests done.
+            for test in tests:
+                test.set_run_complete()
+            raise
+
+        for test in tests:
+            test.job_id = job_id
+            test.status.set(
+                STATES.SCHEDULED,
+                "Test {} has job ID {}, shared with {} other test(s)."
+                .format(self.name, job_id, len(tests) - 1))
+
+    @staticmethod
+    def _time_limit_secs(time_limit: str) -> int:
+        """Convert a slurm time limit (in any of the formats allowed by the
+        'time_limit' config key) into seconds."""
+
+        days = 0
+        if '-' in time_limit:
+            days, time_limit = time_limit.split('-', 1)
+            # After a day count, the parts are hours[:minutes[:seconds]]
+            parts = [int(part) for part in time_limit.split(':')]
+            parts.extend([0] * (3 - len(parts)))
+        else:
+            # Otherwise, they're minutes[:seconds] or hours:minutes:seconds
+            parts = [int(part) for part in time_limit.split(':')]
+            if len(parts) < 3:
+                parts = [0] + parts + [0] * (2 - len(parts))
+
+        hours, minutes, seconds = parts
+        return ((int(days) * 24 + hours) * 60 + minutes) * 60 + seconds
+
+    def _suite_time_limit(self, tests, parallel):
+        """Get the time limit for an allocation running all of the given
+        tests. That's the longest of their time limits when they run in
+        parallel, and the total otherwise. If any test has no time limit,
+        neither does the allocation."""
+
+        limits = []
+        for test in tests:
+            time_limit = test.config[self.name].get('time_limit')
+            if time_limit is None:
+                return None
+            limits.append(self._time_limit_secs(time_limit))
+
+        total = max(limits) if parallel else sum(limits)
+
+        minutes, seconds = divmod(total, 60)
+        hours, minutes = divmod(minutes, 60)
+        days, hours = divmod(hours, 24)
+        return '{}-{:02d}:{:02d}:{:02d}'.format(days, hours, minutes, seconds)
+
     def _get_kickoff_script_header(self, test):
         """Get the kickoff header. Most of the work here """
 
@@ -1129,3 +1351,67 @@ class Slurm(schedulers.SchedulerPlugin):
                 STATES.SCHED_CANCELLED,
                 "Tried (but failed) to cancel job: {}".format(stderr))
             # Scancel failed, pass the stderr message
+
+    # The most job ids to give to a single scancel call.
+    CANCEL_BATCH = 1000
+
+    def _cancel_jobs(self, tests):
+        """Scancel the jobs of all the given tests with a single scancel
+        call (per CANCEL_BATCH jobs), rather than one call per job. Tests
+        that share an allocation share a job, which is only cancelled once.
+
+        :param List[pavilion.test_run.TestRun] tests: The tests to cancel.
+        :returns: A list of StatusInfo objects, in the same order as tests.
+        """
+
+        job_ids = list(dict.fromkeys(test.job_id for test in tests))
+
+        failed = {}
+        for start in range(0, len(job_ids), self.CANCEL_BATCH):
+            batch = job_ids[start:start + self.CANCEL_BATCH]
+
+            proc = subprocess.Popen(['scancel'] + batch,
+                                    stdout=subprocess.PIPE,
+                                    stderr=subprocess.PIPE)
+            _, stderr = proc.communicate()
+
+            if proc.poll() != 0:
+                failed.update(self._scancel_failures(
+                    stderr.decode('utf8', errors='replace'), batch))
+
+        statuses = []
+        for test in tests:
+            if test.job_id in failed:
+                statuses.append(StatusInfo(
+                    STATES.SCHED_CANCELLED,
+                    "Tried (but failed) to cancel job: {}"
+                    .format(failed[test.job_id])))
+            else:
+                statuses.append(StatusInfo(
+                    STATES.SCHED_CANCELLED,
+                    "Slurm jobid {} canceled via slurm."
+                    .format(test.job_id)))
+
+        return statuses
+
+    @staticmethod
+    def _scancel_failures(stderr: str, job_ids: List[str]) -> dict:
+        """Figure out which of the given job ids scancel failed to cancel,
+        from its error output. Scancel reports an error line per job.
+
+        :returns: A dict of the error message for each failed job id. If
+            no job ids could be found in the output, they're all considered
+            to have failed.
+        """
+
+        job_ids = set(job_ids)
+        failed = {}
+        for line in stderr.splitlines():
+            for job_id in re.findall(r'\d+(?:_\d+)?', line):
+                if job_id in job_ids:
+                    failed[job_id] = line.strip()
+
+        if not failed:
+            failed = {job_id: stderr.strip() for job_id in job_ids}
+
+        return failed
@@ -85,6 +85,9 @@ class SlurmMPI(slurm.Slurm):
             priority=10
         )
 
+        self.node_data = None
+        self._job_info_cache = None
+
     def get_conf(self):
         """Add necessary MPI attributes to those of Slurm."""
         elems = self._get_config_elems()
@@ -4,11 +4,10 @@ themselves, as well as functions for performing this parsing. Additionally,
 it contains the functions used to get the base result values, as well as
 resolving result evaluations."""
 
-import json
 from pathlib import Path
 from typing import List
 
-from pavilion import lockfile as _lockfile
+from pavilion import result_log
 from pavilion import utils
 from pavilion.test_config import resolver
 from . import parsers
@@ -104,42 +103,30 @@ For evaluations we check for:
     return errors
 
 
-def prune_result_log(log_path: Path, ids: List[str]) -> List[dict]:
+def prune_result_log(log_path: Path, ids: List[str],
+                     index_only: bool = False) -> List[dict]:
     """Remove records corresponding to the given test ids. Ids can be either
-    an test run id or a test run uuid.
+    an test run id or a test run uuid. The records are removed from the log
+    files, unless index_only is given.
 
     :param log_path: The result log path.
     :param ids: A list of test run ids and/or uuids.
+    :param index_only: Only mark the records as removed in the result log
+        index, leaving them in the log files until enough of a file has been
+        pruned to compact it (see result_log.COMPACT_RATIO). This avoids
+        rewriting the log files, at the cost of keeping the pruned records
+        on disk (and visible to anything reading the files directly).
     :returns: A list of the pruned result dictionaries.
-    :raises ResultError: When we can't overwrite the log file.
+    :raises ResultError: When we can't update the log file or its index.
     """
 
-    pruned = []
-    rewrite_log_path = log_path.with_suffix('.rewrite')
-    lockfile_path = log_path.with_suffix(log_path.suffix + '.lock')
-
-    with _lockfile.LockFile(lockfile_path), \
-         log_path.open() as result_log, \
-            rewrite_log_path.open('w') as rewrite_log:
-
-        for line in result_log:
-            try:
-                result = json.loads(line)
-            except json.JSONDecodeError:
-                # If we can't parse the line, just rewrite it as is.
-                rewrite_log.write(line)
-                continue
-
-            if not (str(result.get('id')) in ids
-                    or result.get('uuid') in ids):
-                rewrite_log.write(line)
-            else:
-                pruned.append(result)
-
-        log_path.unlink()
-        rewrite_log_path.rename(log_path)
+    compact_ratio = result_log.COMPACT_RATIO if index_only else 0
 
-    return pruned
+    try:
+        return result_log.prune(log_path, ids, compact_ratio=compact_ratio)
+    except (OSError, TimeoutError) as err:
+        raise ResultError("Could not prune the result log at '{}': {}"
+                          .format(log_path, err))
 
 
 def remove_temp_results(results: dict, log: utils.IndentedLog) -> None:
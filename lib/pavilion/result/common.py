@@ -1,7 +1,9 @@
 """Common constants and bits for all of result handling."""
+import functools
+import re
 from pathlib import Path
 from pavilion import utils
-from typing import Any
+from typing import Any, Pattern, Union
 
 NON_MATCH_VALUES = (None, [], False)
 """Result Parser return values that are not considered to be a match."""
@@ -15,6 +17,29 @@ class ResultError(RuntimeError):
     processing."""
 
 
+REGEX_CACHE_SIZE = 1024
+
+
+@functools.lru_cache(maxsize=REGEX_CACHE_SIZE)
+def _compile_regex(pattern: Union[str, bytes]) -> Pattern:
+    return re.compile(pattern)
+
+
+def compile_regex(pattern: Union[str, bytes, Pattern]) -> Pattern:
+    """Compile the given regex, using a process wide cache of compiled
+    patterns that's shared by all of result parsing. (The 're' module
+    cache is small, and is cleared entirely when it fills.) Already
+    compiled patterns are returned as is.
+
+    :raises re.error: For invalid regular expressions.
+    """
+
+    if isinstance(pattern, (str, bytes)):
+        return _compile_regex(pattern)
+
+    return pattern
+
+
 def normalize_filename(name: Path) -> str:
     """Remove any characters that aren't allowed in Pavilion
     result variable names."""
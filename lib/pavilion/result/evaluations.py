@@ -1,6 +1,7 @@
 """Handles performing evaluations on results."""
 
-from typing import Dict, Callable
+from collections import OrderedDict
+from typing import Dict, Callable, List, Tuple
 
 import lark as _lark
 from pavilion.test_config.parsers import (check_expression, StringParserError,
@@ -64,6 +65,16 @@ def evaluate_results(results: dict, evaluations: Dict[str, str],
         raise ResultError(err.args[0])
 
 
+EVAL_CACHE_SIZE = 1024
+
+# Parse trees and variable references for evaluation expressions, by
+# expression text.
+_EXPR_CACHE = utils.LRUCache(EVAL_CACHE_SIZE)
+# Evaluation plans (keys, trees and expressions in evaluation order) for
+# each result_evaluate section (as a tuple of its items).
+_PLAN_CACHE = utils.LRUCache(EVAL_CACHE_SIZE)
+
+
 def parse_evaluation_dict(eval_dict: Dict[str, str], results: dict,
                           log: Callable[..., None]) -> None:
     """Parse the dictionary of evaluation expressions, given that some of them
@@ -75,62 +86,119 @@ def parse_evaluation_dict(eval_dict: Dict[str, str], results: dict,
     :raises ValueError: When there's a reference loop.
     """
 
-    parser = get_expr_parser()
+    plan = get_evaluation_plan(eval_dict, log)
+
     transformer = EvaluationExprTransformer(results)
-    var_ref_visitor = VarRefVisitor()
 
-    unresolved = {}
+    log.indent = 0
+    log("Resolving evaluations.")
+
+    for key, tree, expr in plan:
+        log.indent = 1
+        log("Resolving evaluation '{}': '{}'".format(key, expr))
+        try:
+            results[key] = transformer.transform(tree)
+        except ParserValueError as err:
+            log("Error resolving evaluation: {}".format(err.args[0]))
+            log(err.get_context(expr))
+
+            # Any value errors should be converted to this error type.
+            raise StringParserError(err.args[0], err.get_context(expr))
+        log.indent = 2
+        log("Value resolved to: '{}'".format(results[key]))
+
+    log.indent = 0
+    log("Finished resolving expressions")
+
+
+def get_evaluation_plan(eval_dict: Dict[str, str],
+                        log: Callable[..., None]) \
+        -> List[Tuple[str, _lark.Tree, str]]:
+    """Parse each of the evaluation expressions, and order them such that
+    each comes after any others it references. Plans are cached by the
+    contents of eval_dict, as many tests share the same evaluations.
 
+    :returns: A list of (key, parse tree, expression) tuples.
+    :raises StringParserError: When an expression can't be parsed.
+    :raises ValueError: When there's a reference loop.
+    """
+
+    plan_key = tuple(eval_dict.items())
+    plan = _PLAN_CACHE.get(plan_key)
+    if plan is not None:
+        log.indent = 1
+        log("Using the cached plan for evaluations {}"
+            .format(tuple(eval_dict.keys())))
+        return plan
+
+    parsed = OrderedDict()
     log.indent = 1
     for key, expr in eval_dict.items():
         log("Parsing the evaluate expression '{}'".format(expr))
         try:
-            tree = parser.parse(expr)
-        except (_lark.UnexpectedCharacters, _lark.UnexpectedToken) as err:
-            # Try to figure out why the error happened based on examples.
-            err_type = match_examples(err, parser.parse, BAD_EXAMPLES, expr)
+            parsed[key] = _parse_expression(expr)
+        except StringParserError as err:
             log("Error parsing expression, failing.")
-            log(err_type)
-            log(err.get_context(expr))
+            log(err.message)
+            log(err.context)
             raise StringParserError(
                 "Error evaluating expression '{}' for key '{}':\n{}"
-                .format(expr, key, err_type), err.get_context(expr))
-
-        var_refs = var_ref_visitor.visit(tree)
-
-        unresolved[key] = (tree, var_refs, expr)
+                .format(expr, key, err.message), err.context)
+
+    # Order the evaluations by depth in the reference graph, and then by
+    # their original order. (References that aren't other evaluation keys
+    # are just results.)
+    dependents = {key: [] for key in parsed}
+    waiting_on = {}
+    for key, (_, var_refs) in parsed.items():
+        deps = set(ref for ref in var_refs if ref in parsed)
+        waiting_on[key] = len(deps)
+        for dep in deps:
+            dependents[dep].append(key)
+
+    plan = []
+    level = [key for key in parsed if not waiting_on[key]]
+    while level:
+        next_level = set()
+        for key in level:
+            plan.append((key, parsed[key][0], eval_dict[key]))
+            for dependent in dependents[key]:
+                waiting_on[dependent] -= 1
+                if not waiting_on[dependent]:
+                    next_level.add(dependent)
+        level = [key for key in parsed if key in next_level]
+
+    if len(plan) < len(parsed):
+        planned = set(key for key, _, _ in plan)
+        raise ValueError("Reference loops found amongst evaluation keys "
+                         "{}.".format(tuple(key for key in parsed
+                                            if key not in planned)))
+
+    _PLAN_CACHE[plan_key] = plan
+    return plan
+
+
+def _parse_expression(expr: str) -> Tuple[_lark.Tree, List[str]]:
+    """Parse the given evaluation expression, returning the parse tree and
+    the variables it references. These are cached by expression text.
+
+    :raises StringParserError: On parse errors. The message will be the
+        error type, and the context where in the expression it occurred.
+    """
 
-    log.indent = 0
-    log("Resolving evaluations.")
-    log.indent = 1
+    parsed = _EXPR_CACHE.get(expr)
+    if parsed is not None:
+        return parsed
 
-    while unresolved:
-        resolved = []
-        for key, (tree, var_refs, expr) in unresolved.items():
-            for var in var_refs:
-                if var in unresolved:
-                    break
-            else:
-                log("Resolving evaluation '{}': '{}'".format(key, expr))
-                try:
-                    results[key] = transformer.transform(tree)
-                except ParserValueError as err:
-                    log("Error resolving evaluation: {}".format(err.args[0]))
-                    log(err.get_context(expr))
-
-                    # Any value errors should be converted to this error type.
-                    raise StringParserError(err.args[0], err.get_context(expr))
-                resolved.append(key)
-                log.indent = 2
-                log("Value resolved to: '{}'".format(results[key]))
-
-        if not resolved:
-            # Pass up the unresolved
-            raise ValueError("Reference loops found amongst evaluation keys "
-                             "{}.".format(tuple(unresolved.keys())))
-
-        for key in resolved:
-            del unresolved[key]
+    parser = get_expr_parser()
 
-    log.indent = 0
-    log("Finished resolving expressions")
+    try:
+        tree = parser.parse(expr)
+    except (_lark.UnexpectedCharacters, _lark.UnexpectedToken) as err:
+        # Try to figure out why the error happened based on examples.
+        err_type = match_examples(err, parser.parse, BAD_EXAMPLES, expr)
+        raise StringParserError(err_type, err.get_context(expr))
+
+    parsed = tree, VarRefVisitor().visit(tree)
+    _EXPR_CACHE[expr] = parsed
+    return parsed
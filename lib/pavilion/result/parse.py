@@ -1,17 +1,21 @@
 """Functions to handle the collection of results using result parsers."""
 
+import codecs
 import glob
 import inspect
+import locale
+import mmap
 import pprint
 import re
 import traceback
 from collections import OrderedDict
 from pathlib import Path
-from typing import List, Union, Dict, Callable, Any, TextIO, Pattern
+from typing import (List, Union, Dict, Callable, Any, TextIO, BinaryIO,
+                    Pattern, Tuple)
 
 from pavilion.utils import IndentedLog
 from .base import RESULT_ERRORS
-from .common import ResultError
+from .common import ResultError, compile_regex
 from .options import (PER_FILES, ACTIONS, MATCH_CHOICES, per_first,
                       ACTION_TRUE, ACTION_FALSE)
 from .parsers import ResultParser, get_plugin
@@ -69,6 +73,10 @@ configured for that test.
 - Combine file results into a single object with the 'per_file' attr
   and add them to the results dict.
 
+Each file is read only once, no matter how many keys parse it; every line
+is checked against the match conditions of each key that's still looking
+for matches in that file.
+
 :param pavilion.test_run.TestRun test: The pavilion test run to gather
     results for.
 :param results: The dictionary of default result values. This will be
@@ -84,6 +92,8 @@ configured for that test.
     log(pprint.pformat(parser_configs))
     log("---------------")
 
+    key_parses = []
+
     # Get the results for each of the parsers specified.
     for parser_name in parser_configs.keys():
         # This is almost guaranteed to work, as the config wouldn't
@@ -94,23 +104,29 @@ configured for that test.
 
         log.indent = 1
         if parser_configs[parser_name]:
-            log("Parsing results for parser '{}'".format(parser_name))
+            log("Setting up parser '{}'".format(parser_name))
 
         # Each parser has a list of configs. Process each of them.
         for key, rconf in parser_configs[parser_name].items():
             log.indent = 2
-            log("Parsing value for key '{}'".format(key))
+            log("Setting up key '{}'".format(key))
 
-            error = parse_result(
-                results=results,
+            key_parses.append(_KeyParse(
                 key=key,
                 parser_cfg=parser.set_parser_defaults(rconf, defaults),
                 parser=parser,
                 test=test,
-                log=log)
+                log=log))
+
+    _parse_files(key_parses, log)
+
+    for kparse in key_parses:
+        log.indent = 1
+        log("Handling results for key '{}'".format(kparse.key))
+        error = kparse.finish(results, log)
 
-            if error is not None:
-                results[RESULT_ERRORS].append(str(error))
+        if error is not None:
+            results[RESULT_ERRORS].append(str(error))
 
 
 def advance_file(file: TextIO, conds: List[Pattern]) -> Union[int, None]:
@@ -185,6 +201,428 @@ def advance_file(file: TextIO, conds: List[Pattern]) -> Union[int, None]:
     return next_pos
 
 
+class _KeyScan:
+    """The state of a search for matches for a single result key in a single
+    file. Lines are fed to it one at a time, and it tracks how far into its
+    sequence of conditions ('preceded_by' and then 'for_lines_matching')
+    the most recent lines have gotten. This finds the same positions as
+    ``advance_file``, without rewinding the file."""
+
+    def __init__(self, parser: ResultParser, parser_args: dict,
+                 conds: List[Pattern], match_idx: Union[int, None],
+                 line_filter: Union[Pattern, None] = None):
+
+        self.parser = parser
+        self.parser_args = parser_args
+        self.match_idx = match_idx
+        self.log_matches = conds[-1].pattern != ''
+
+        if (line_filter is not None
+                and len(conds) == 1 and conds[0].pattern == ''):
+            # Every line is a match position, so the parser's line filter is
+            # the only real condition.
+            conds = [line_filter]
+            line_filter = None
+
+        self.conds = conds
+        self.line_filter = line_filter
+
+        # active[i] is True when the latest lines matched conds[0:i+1].
+        self._active = [False] * len(conds)
+        self._armed = False
+        self.matches = []
+        self.done = False
+        # Any exception raised by the parser.
+        self.error = None
+
+    def reset(self) -> None:
+        """Forget any partially matched sequence of conditions."""
+
+        if self._armed:
+            active = self._active
+            for i in range(len(active)):
+                active[i] = False
+            self._armed = False
+
+    def feed(self, line: str) -> bool:
+        """Check the next line against our conditions.
+
+        :returns: True if a full sequence of conditions has now been matched,
+            ending on this line (and the line passes the parser's filter).
+        """
+
+        conds = self.conds
+        active = self._active
+
+        for i in range(len(conds) - 1, 0, -1):
+            active[i] = active[i-1] and conds[i].search(line) is not None
+        active[0] = conds[0].search(line) is not None
+
+        if active[-1]:
+            # Matches never overlap; start over on the next line.
+            self._armed = True
+            self.reset()
+            return (self.line_filter is None
+                    or self.line_filter.search(line) is not None)
+
+        self._armed = True in active
+        return False
+
+    def add_match(self, res) -> None:
+        """Record the parser result for a matched position."""
+
+        if res is not None:
+            self.matches.append(res)
+
+        if self.match_idx is not None and \
+                0 <= self.match_idx < len(self.matches):
+            self.done = True
+
+    def result(self, log: IndentedLog) -> Any:
+        """Return the selected result (or results) for this file."""
+
+        if self.match_idx is None:
+            return self.matches
+
+        try:
+            return self.matches[self.match_idx]
+        except IndexError:
+            log("Match select index '{}' out of range. There were only {} "
+                "matches.".format(self.match_idx, len(self.matches)))
+            return None
+
+
+# Patterns that can't safely be combined with others into a single regex:
+# those that use group references or named groups.
+_UNFUSABLE_RE = re.compile(r'\\[1-9]|\(\?P[<=]|\(\?\(')
+_DEFAULT_FLAGS = re.compile('').flags
+
+
+def _fusable(regex: Pattern) -> bool:
+    """Whether the given regex can be included in a fused alternation.
+    Regexes with inline flags apply them to the whole pattern, so they
+    can't be."""
+
+    return (regex.flags == _DEFAULT_FLAGS
+            and _UNFUSABLE_RE.search(regex.pattern) is None)
+
+
+def _line_prefilter(scans: List[_KeyScan]) \
+        -> Union[Callable[[str], Any], None]:
+    """Combine the match conditions of all the given scans into a single
+    search function. When it returns None for a line, that line matches
+    none of the conditions. The fusable regexes are joined into one
+    alternation, so most lines are rejected with a single regex search.
+
+    :returns: The search function, or None if it couldn't reject any lines
+        (such as when a condition is empty and matches everything).
+    """
+
+    regexes = OrderedDict()
+    for scan in scans:
+        for cond in scan.conds:
+            if cond.pattern == '':
+                return None
+            regexes[cond.pattern] = cond
+
+    fusable = [pattern for pattern, regex in regexes.items()
+               if _fusable(regex)]
+    searches = [regex.search for regex in regexes.values()
+                if not _fusable(regex)]
+
+    if len(fusable) == 1:
+        searches.append(regexes[fusable[0]].search)
+    elif fusable:
+        try:
+            fused = compile_regex(
+                '|'.join('(?:{})'.format(pattern) for pattern in fusable))
+            searches.append(fused.search)
+        except (re.error, OverflowError, RecursionError):
+            searches.extend(regexes[pattern].search for pattern in fusable)
+
+    if len(searches) == 1:
+        return searches[0]
+
+    def search_all(line):
+        """Return the first match of any of the searches."""
+        for search in searches:
+            match = search(line)
+            if match is not None:
+                return match
+        return None
+
+    return search_all
+
+
+# Translations of (unescaped) line regex assertions for use when searching
+# a whole file at once. Each matches wherever the original would when
+# searching a single line. The end of a line (after its newline) is the
+# start of the next one; that's what the '(?<=\n)' bits are for.
+_BYTES_END = r'(?:(?=\n)|(?<=\n)|\Z)'
+_LINE_END_LOOKBEHIND = r'(?<=\n)'
+_BYTES_ESCAPES = {
+    r'\A': r'^',
+    r'\Z': r'(?:(?<=\n)|\Z)',
+    r'\B': r'(?:\B|(?<=\n))',
+}
+# Any line with non-ascii characters is always checked directly.
+_NON_ASCII = r'[\x80-\xff]'
+
+# Files in these encodings can be scanned as bytes. (They're ascii
+# compatible, and have no decoder state between lines.)
+BYTES_SCAN_ENCODINGS = ('ascii', 'utf-8', 'iso8859-1')
+
+
+def _bytes_pattern(pattern: str) -> Union[str, None]:
+    """Translate a line regex for a multiline search over an entire file,
+    such that it matches (at least) everywhere it would when searching
+    each line on its own. Extra matches are fine; they're only used to
+    find lines to check.
+
+    :returns: The translated pattern, or None if it can't be translated.
+    """
+
+    try:
+        pattern.encode('ascii')
+    except UnicodeEncodeError:
+        return None
+
+    parts = []
+    in_class = False
+    class_start = None
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+
+        if char == '\\':
+            esc = pattern[i:i+2]
+            if not in_class and esc in _BYTES_ESCAPES:
+                esc = _BYTES_ESCAPES[esc]
+            parts.append(esc)
+            i += 2
+            continue
+
+        if in_class:
+            # A ']' at the start of a class is a literal.
+            if char == ']' and i > class_start:
+                in_class = False
+        elif char == '[':
+            in_class = True
+            class_start = i + 1
+            if pattern[class_start:class_start+1] == '^':
+                class_start += 1
+        elif char == '$':
+            char = _BYTES_END
+        elif pattern.startswith(('(?=', '(?!', '(?<'), i):
+            # Lookarounds see past the end of the line.
+            return None
+
+        parts.append(char)
+        i += 1
+
+    return ''.join(parts)
+
+
+def _bytes_prefilter(scans: List[_KeyScan]) \
+        -> Tuple[Union[Pattern, None], bool]:
+    """Combine the match conditions of all the given scans into a single
+    bytes regex for finding (in a whole memory mapped file) the next line
+    that might match any of them.
+
+    :returns: The compiled regex (or None if every line has to be
+        checked), and whether a match at the start of a line may actually
+        belong to the end of the line before it.
+    """
+
+    patterns = OrderedDict()
+    for scan in scans:
+        for cond in scan.conds:
+            if cond.pattern == '' or not _fusable(cond):
+                return None, False
+
+            bytes_pattern = _bytes_pattern(cond.pattern)
+            if bytes_pattern is None:
+                return None, False
+            patterns['(?:{})'.format(bytes_pattern)] = None
+
+    patterns[_NON_ASCII] = None
+    pattern = '|'.join(patterns)
+
+    try:
+        regex = compile_regex('(?m){}'.format(pattern).encode('ascii'))
+    except (re.error, OverflowError, RecursionError):
+        return None, False
+
+    return regex, _LINE_END_LOOKBEHIND in pattern
+
+
+def _map_file(file: BinaryIO) -> Union[mmap.mmap, None]:
+    """Memory map the given file, if it can be scanned as bytes. Files that
+    can't be mapped (empty files, /proc files, etc.), or that contain
+    carriage returns (which text mode treats as line endings) can't be.
+    """
+
+    encoding = codecs.lookup(locale.getpreferredencoding(False)).name
+    if encoding not in BYTES_SCAN_ENCODINGS:
+        return None
+
+    try:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    if mapped.find(b'\r') != -1:
+        mapped.close()
+        return None
+
+    return mapped
+
+
+def _call_parser(scan: _KeyScan, file: TextIO, line_pos: int,
+                 log: IndentedLog) -> None:
+    """Call the scan's parser with the file positioned at line_pos, and
+    record the result."""
+
+    if scan.log_matches:
+        log("Found potential match at pos {} in file.".format(line_pos))
+
+    file.seek(line_pos)
+    try:
+        res = scan.parser(file, **scan.parser_args)
+    except Exception as err:  # pylint: disable=broad-except
+        log("Error calling result parser {}.".format(scan.parser.name))
+        log(traceback.format_exc())
+        scan.error = err
+        scan.done = True
+        return
+
+    if res is not None:
+        log("Parser extracted result '{}'".format(res))
+    scan.add_match(res)
+
+
+def _scan_file(path: Path, scans: List[_KeyScan], log: IndentedLog) -> None:
+    """Read through the given file once, calling each scan's parser at each
+    position where its conditions are met. The parser is given the file
+    (in text mode) positioned at the start of the last matched line.
+
+    Where possible, the file is memory mapped and searched as bytes for
+    lines that might match, and only those lines are decoded and checked.
+    Otherwise it's read line by line in text mode.
+
+    :raises OSError: When the file can't be read.
+    """
+
+    log.indent = 3
+    log("Parsing for file '{}':".format(path.as_posix()))
+
+    pending = [scan for scan in scans if not scan.done]
+    if not pending:
+        return
+
+    with path.open('rb') as file:
+        mapped = _map_file(file)
+
+    if mapped is None:
+        _scan_text(path, pending, log)
+    else:
+        with mapped:
+            _scan_mapped(path, mapped, pending, log)
+
+
+def _scan_mapped(path: Path, mapped: mmap.mmap, pending: List[_KeyScan],
+                 log: IndentedLog) -> None:
+    """Scan the memory mapped file at path. See _scan_file()."""
+
+    encoding = locale.getpreferredencoding(False)
+    prefilter, look_back = _bytes_prefilter(pending)
+    size = len(mapped)
+
+    # Only opened if we need to call a parser.
+    text_file = None
+
+    try:
+        pos = 0
+        while pending and pos < size:
+            line_start = pos
+            if prefilter is not None:
+                match = prefilter.search(mapped, pos)
+                if match is None:
+                    break
+
+                match_pos = match.start()
+                if (look_back and match_pos > pos
+                        and mapped[match_pos-1] == ord('\n')):
+                    # Check the previous line too.
+                    match_pos -= 1
+
+                line_start = mapped.rfind(b'\n', pos, match_pos) + 1
+                if line_start == 0:
+                    line_start = pos
+
+                if line_start != pos:
+                    # We skipped lines that match none of the conditions.
+                    for scan in pending:
+                        scan.reset()
+                    if line_start >= size:
+                        break
+
+            line_end = mapped.find(b'\n', line_start)
+            pos = size if line_end == -1 else line_end + 1
+            line = mapped[line_start:pos].decode(encoding)
+
+            matched = False
+            for scan in pending:
+                if not scan.feed(line):
+                    continue
+
+                matched = True
+                if text_file is None:
+                    text_file = path.open()
+
+                _call_parser(scan, text_file, line_start, log)
+
+            if matched:
+                pending = [scan for scan in pending if not scan.done]
+    finally:
+        if text_file is not None:
+            text_file.close()
+
+
+def _scan_text(path: Path, pending: List[_KeyScan], log: IndentedLog) \
+        -> None:
+    """Scan the file at path line by line, in text mode. See _scan_file()."""
+
+    prefilter = _line_prefilter(pending)
+
+    with path.open() as file:
+        while pending:
+            line_pos = file.tell()
+            line = file.readline()
+            if line == '':
+                break
+
+            # Lines that match none of the conditions just reset every scan.
+            if prefilter is not None and prefilter(line) is None:
+                for scan in pending:
+                    scan.reset()
+                continue
+
+            next_pos = None
+            for scan in pending:
+                if not scan.feed(line):
+                    continue
+
+                if next_pos is None:
+                    next_pos = file.tell()
+
+                _call_parser(scan, file, line_pos, log)
+                file.seek(next_pos)
+
+            if next_pos is not None:
+                pending = [scan for scan in pending if not scan.done]
+
+
 def parse_file(path: Path, parser: ResultParser, parser_args: dict,
                match_idx: Union[int, None],
                pos_regexes: List[Pattern],
@@ -195,179 +633,255 @@ def parse_file(path: Path, parser: ResultParser, parser_args: dict,
         we only need the first result.
     """
 
-    matches = []
+    scan = _KeyScan(parser, parser_args, pos_regexes, match_idx,
+                    parser.line_filter(**parser_args))
+    _scan_file(path, [scan], log)
 
-    log.indent = 3
-    log("Parsing for file '{}':".format(path.as_posix()))
-    with path.open() as file:
-        next_pos = advance_file(file, pos_regexes)
+    if scan.error is not None:
+        raise scan.error
 
-        while next_pos is not None:
-            if pos_regexes[-1].pattern != '':
-                log("Found potential match at pos {} in file."
-                    .format(file.tell()))
-            try:
-                res = parser(file, **parser_args)
-            except Exception as exc:
-                log("Error calling result parser {}.".format(parser.name))
-                log(traceback.format_exc())
-                raise
+    return scan.result(log)
 
-            file.seek(next_pos)
 
-            if res is not None:
+class _KeyParse:
+    """Parsing for a single result key: the setup of its config, the
+    per-file results, and applying the per_file and action settings to
+    get the final result."""
 
-                matches.append(res)
-                log("Parser extracted result '{}'".format(res))
+    def __init__(self, key: str, parser_cfg: Dict, parser: ResultParser,
+                 test, log: IndentedLog):
+        """Set up the parsing for the key, and find the files to parse.
 
-            if match_idx is not None and 0 <= match_idx < len(matches):
-                break
+        :param key: The key we're parsing.
+        :param parser_cfg: The parser config dict.
+        :param parser: The result parser plugin object.
+        :param test: The test object.
+        :param log: The result log callback.
+        """
 
-            next_pos = advance_file(file, pos_regexes)
+        self.key = key
+        self.parser = parser
+        self.parser_cfg = parser_cfg
+        self.test = test
+
+        # A ParseErrorMsg, if something went wrong.
+        self.error = None
+        # Errors to add to the results.
+        self.errors = []
+
+        self.paths = []
+        self.file_results = {}
+        # Results for globs that didn't match anything.
+        self.unmatched = OrderedDict()
+        self.scans = {}
+        self.parser_args = None
+        self.line_filter = None
+
+        # Grab these for local use.
+        self.action_name = parser_cfg['action']
+        globs = parser_cfg['files']
+
+        match_idx = MATCH_CHOICES.get(parser_cfg['match_select'],
+                                      parser_cfg['match_select'])
+        self.match_idx = int(match_idx) if match_idx is not None else None
+
+        # Compile the regexes for finding the appropriate lines on which to
+        # call the result parser.
+        self.conds = [compile_regex(cond)
+                      for cond in parser_cfg['preceded_by']]
+        self.conds.append(compile_regex(parser_cfg['for_lines_matching']))
+
+        # The result key is always true/false. It's ACTION_TRUE by
+        # default.
+        if (key == 'result' and
+                self.action_name not in (ACTION_FALSE, ACTION_TRUE)):
+            self.action_name = ACTION_TRUE
+            log("Forcing action to '{}' for the 'result' key.")
 
-    if match_idx is None:
-        return matches
-    else:
         try:
-            return matches[match_idx]
-        except IndexError:
-            log("Match select index '{}' out of range. There were only {} "
-                "matches.".format(match_idx, len(matches)))
+            self.parser_args = parser.check_args(**parser_cfg.copy())
+            self.line_filter = parser.line_filter(**self.parser_args)
+        except ResultError as err:
+            self.error = ParseErrorMsg(key, parser, err.args[0])
+            return
+
+        log("Looking for files that match file globs: {}".format(globs))
+
+        # Find all the files we'll be parsing.
+        for file_glob in globs:
+            base_glob = file_glob
+            if not file_glob.startswith('/'):
+                file_glob = '{}/build/{}'.format(test.path, file_glob)
+
+            paths_found = glob.glob(file_glob)
+            paths_found.reverse()
+            if paths_found:
+                self.paths.extend(Path(path) for path in sorted(paths_found))
+            else:
+                self.unmatched[
+                    Path('_unmatched_glob_' + base_glob.split('/')[-1])] = None
+                log("Setting a non match result for unmatched glob '{}'"
+                    .format(file_glob))
+                self.errors.append(
+                    "No matches for glob '{}' under key '{}'"
+                    .format(base_glob, key))
+
+        if not self.paths:
+            msg = "File globs {} for key {} found no files.".format(globs, key)
+            log(msg)
+
+        log("Found {} matching files.".format(len(self.paths)))
+        log("Results will be stored with action '{}'".format(self.action_name))
+
+    def scan(self, path: Path) -> Union[_KeyScan, None]:
+        """Get a new scan of the given file for this key, or None if we've
+        already hit an error."""
+
+        if self.error is not None or path in self.scans:
             return None
 
+        scan = _KeyScan(self.parser, self.parser_args, self.conds,
+                        self.match_idx, self.line_filter)
+        self.scans[path] = scan
+        return scan
 
-def parse_result(results: Dict, key: str, parser_cfg: Dict,
-                 parser: ResultParser, test, log: IndentedLog) \
-        -> Union[ParseErrorMsg, None]:
-    """Use a result parser and it's settings to parse a single value.
+    def file_done(self, path: Path, log: IndentedLog,
+                  err: Union[OSError, None] = None) -> None:
+        """Record the result of scanning a file (or the error encountered
+        when reading it)."""
 
-    :param results: The results dictionary.
-    :param key: The key we're parsing.
-    :param parser_cfg: The parser config dict.
-    :param parser: The result parser plugin object.
-    :param test: The test object.
-    :param log: The result log callback.
-    :returns: A ParseErrorMsg object, which standardizes the error message
-        format.
-    """
+        scan = self.scans[path]
 
-    # Grab these for local use.
-    action_name = parser_cfg['action']
-    globs = parser_cfg['files']
-    per_file_name = parser_cfg['per_file']
+        if err is None:
+            err = scan.error
 
-    match_idx = MATCH_CHOICES.get(parser_cfg['match_select'],
-                                  parser_cfg['match_select'])
-    match_idx = int(match_idx) if match_idx is not None else None
+        if err is not None:
+            if isinstance(err, OSError):
+                msg = "Error reading file: {}".format(err)
+            else:
+                msg = "UnexpectedError: {}".format(err)
+            log(msg)
+            self.error = ParseErrorMsg(self.key, self.parser, msg,
+                                       file=path.as_posix())
+            return
 
-    # Compile the regexes for finding the appropriate lines on which to
-    # call the result parser.
-    match_cond_rex = [re.compile(cond) for cond in parser_cfg['preceded_by']]
-    match_cond_rex.append(re.compile(parser_cfg['for_lines_matching']))
+        res = scan.result(log)
+        self.file_results[path] = res
+        log("Stored value '{}' for file '{}' under key '{}'"
+            .format(res, path.name, self.key))
 
-    # The result key is always true/false. It's ACTION_TRUE by
-    # default.
-    if (key == 'result' and
-            action_name not in (ACTION_FALSE, ACTION_TRUE)):
-        action_name = ACTION_TRUE
-        log("Forcing action to '{}' for the 'result' key.")
+    def finish(self, results: Dict, log: IndentedLog) \
+            -> Union[ParseErrorMsg, None]:
+        """Combine the per-file results, and store them in the results.
 
-    try:
-        parser_args = parser.check_args(**parser_cfg.copy())
-    except ResultError as err:
-        return ParseErrorMsg(key, parser, err.args[0])
-
-    # The per-file results for this parser
-    presults = OrderedDict()
-
-    log("Looking for files that match file globs: {}".format(globs))
-
-    # Find all the files we'll be parsing.
-    paths = []
-    for file_glob in globs:
-        base_glob = file_glob
-        if not file_glob.startswith('/'):
-            file_glob = '{}/build/{}'.format(test.path, file_glob)
-
-        paths_found = glob.glob(file_glob)
-        paths_found.reverse()
-        if paths_found:
-            paths.extend(Path(path) for path in sorted(paths_found))
-        else:
-            presults[Path('_unmatched_glob_' + base_glob.split('/')[-1])] = None
-            log("Setting a non match result for unmatched glob '{}'"
-                .format(file_glob))
-            results[RESULT_ERRORS].append(
-                "No matches for glob '{}' under key '{}'"
-                .format(base_glob, key))
-
-    if not paths:
-        msg = "File globs {} for key {} found no files.".format(globs, key)
-        log(msg)
-
-    log("Found {} matching files.".format(len(paths)))
-    log("Results will be stored with action '{}'".format(action_name))
-    log.indent = 3
+        :returns: A ParseErrorMsg object, which standardizes the error
+            message format.
+        """
+
+        results[RESULT_ERRORS].extend(self.errors)
+
+        if self.error is not None:
+            return self.error
+
+        # The per-file results for this parser
+        presults = OrderedDict(self.unmatched)
+        for path in self.paths:
+            presults[path] = self.file_results[path]
+
+        per_file_name = self.parser_cfg['per_file']
+
+        log.indent = 2
+        log("Results for each found files:")
+        for res_path, res_value in presults.items():
+            if res_path.parent == self.test.build_path:
+                res_path = res_path.name
+            else:
+                res_path = res_path.as_posix()
+            log(' - {}: {}'.format(res_path, res_value))
+
+        log("Handling results for key '{}' on a per-file basis with "
+            "per_file setting '{}'".format(self.key, per_file_name))
+
+        per_file_func = PER_FILES[per_file_name]  # type: per_first
 
-    # Apply the result parser to each file we're parsing.
-    # Handle the results according to the 'action' config attribute.
-    for path in paths:
         try:
-            res = parse_file(
-                path=path,
-                parser=parser, parser_args=parser_args,
-                pos_regexes=match_cond_rex,
-                match_idx=match_idx,
-                log=log,
+            errors = per_file_func(
+                results=results,
+                key=self.key,
+                file_vals=presults,
+                action=ACTIONS[self.parser_cfg['action']]
             )
 
-        except OSError as err:
-            msg = "Error reading file: {}".format(err)
-            log(msg)
-            return ParseErrorMsg(key, parser, msg, file=path.as_posix())
-        except Exception as err:  # pylint: disable=W0703
-            msg = "UnexpectedError: {}".format(err)
+            for error in errors:
+                results[RESULT_ERRORS].append(error)
+                log(error)
+
+            log("Processed results from key {} with per_file setting {} "
+                "and action {}.".format(self.key, per_file_name,
+                                        self.action_name))
+
+        except ResultError as err:
+            msg = (
+                "Error handling results with per_file and action options.\n{}"
+                .format(err.args[0]))
+
             log(msg)
-            return ParseErrorMsg(key, parser, msg, file=path.as_posix())
+            return ParseErrorMsg(self.key, self.parser, msg,
+                                 file=self.parser_cfg['files'])
 
-        presults[path] = res
-        log("Stored value '{}' for file '{}'".format(res, path.name))
+        return None
 
-    log.indent = 2
-    log("Results for each found files:")
-    for res_path, res_value in presults.items():
-        if res_path.parent == test.build_path:
-            res_path = res_path.name
-        else:
-            res_path = res_path.as_posix()
-        log(' - {}: {}'.format(res_path, res_value))
 
-    log("Handling results for key '{}' on a per-file basis with "
-        "per_file setting '{}'".format(key, per_file_name))
+def _parse_files(key_parses: List[_KeyParse], log: IndentedLog) -> None:
+    """Parse all of the files needed for the given keys, reading each file
+    just once."""
 
-    per_file_func = PER_FILES[per_file_name]  # type: per_first
+    by_path = OrderedDict()
+    for kparse in key_parses:
+        if kparse.error is None:
+            for path in kparse.paths:
+                by_path.setdefault(path, []).append(kparse)
 
-    try:
-        errors = per_file_func(
-            results=results,
-            key=key,
-            file_vals=presults,
-            action=ACTIONS[parser_cfg['action']]
-        )
+    for path, kparses in by_path.items():
+        scans = []
+        scan_kparses = []
+        for kparse in kparses:
+            scan = kparse.scan(path)
+            if scan is not None:
+                scans.append(scan)
+                scan_kparses.append(kparse)
+
+        if not scans:
+            continue
+
+        try:
+            _scan_file(path, scans, log)
+        except Exception as err:  # pylint: disable=broad-except
+            # Errors reading or decoding the file.
+            for kparse in scan_kparses:
+                kparse.file_done(path, log, err=err)
+            continue
 
-        for error in errors:
-            results[RESULT_ERRORS].append(error)
-            log(error)
+        for kparse in scan_kparses:
+            kparse.file_done(path, log)
 
-        log("Processed results from key {} with per_file setting {} "
-            "and action {}.".format(key, per_file_name, action_name))
 
-    except ResultError as err:
-        msg = (
-            "Error handling results with per_file and action options.\n{}"
-            .format(err.args[0]))
+def parse_result(results: Dict, key: str, parser_cfg: Dict,
+                 parser: ResultParser, test, log: IndentedLog) \
+        -> Union[ParseErrorMsg, None]:
+    """Use a result parser and it's settings to parse a single value.
 
-        log(msg)
-        return ParseErrorMsg(key, parser, msg, file=globs)
+    :param results: The results dictionary.
+    :param key: The key we're parsing.
+    :param parser_cfg: The parser config dict.
+    :param parser: The result parser plugin object.
+    :param test: The test object.
+    :param log: The result log callback.
+    :returns: A ParseErrorMsg object, which standardizes the error message
+        format.
+    """
 
-    return None
+    kparse = _KeyParse(key=key, parser_cfg=parser_cfg, parser=parser,
+                       test=test, log=log)
+    _parse_files([kparse], log)
+    return kparse.finish(results, log)
@@ -5,12 +5,12 @@ import inspect
 import logging
 import re
 import textwrap
-from typing import List
+from typing import List, Pattern, Union
 
 import yaml_config as yc
 from pavilion.test_config import file_format, resolver
 from yapsy import IPlugin
-from .common import ResultError
+from .common import ResultError, compile_regex
 from .options import (PER_FIRST, PER_LAST, PER_NAME, PER_LIST,
                       PER_NAME_LIST, PER_ALL, PER_ANY, PER_FILES,
                       MATCH_FIRST, MATCH_LAST, MATCH_ALL, MATCH_CHOICES,
@@ -31,12 +31,20 @@ def get_plugin(name):
 :rtype: ResultParser
 """
 
+    if name not in _RESULT_PARSERS:
+        # Parser plugins are loaded on first use.
+        from pavilion import plugins
+        plugins.load_plugins('result', name)
+
     return _RESULT_PARSERS[name]
 
 
 def list_plugins():
     """Return a list of result parser plugin names."""
 
+    from pavilion import plugins
+    plugins.load_plugins('result')
+
     return list(_RESULT_PARSERS.keys())
 
 
@@ -67,7 +75,7 @@ def match_select_validator(match_select):
 def match_pos_validator(match_pos):
     """Validate match position arguments."""
     try:
-        re.compile(match_pos)
+        compile_regex(match_pos)
     except re.error as err:
         raise ValueError("Invalid regular expression.\n{}"
                          .format(match_pos, err.args[0]))
@@ -286,6 +294,22 @@ deferred args. On error, should raise a ResultParserError.
 
         return self._check_args(**kwargs)
 
+    def line_filter(self, **kwargs) -> Union[Pattern, None]:
+        """Override this to give a compiled regex that the line at a match
+position must match for this parser to return a result. Positions whose
+line doesn't match are skipped without calling the parser, and result
+parsing can use the regex to quickly skip most lines of large files.
+Only give one if the parser always returns None when that line doesn't
+match.
+
+:param kwargs: The parser arguments, as returned by check_args().
+:returns: A compiled regex, or None if there's no such filter.
+"""
+
+        _ = self
+
+        return None
+
     GLOBAL_CONFIG_ELEMS = [
         yc.StrElem(
             "action",
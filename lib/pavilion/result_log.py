@@ -0,0 +1,557 @@
+"""An index for the common result log, so results can be found without
+parsing the whole log.
+
+The result log itself is unchanged: JSON records, one per line, appended to
+by every Pavilion process and rotated into numbered backups
+(``results.log.1``, etc.) as it grows. Alongside it is an append only index
+file (``results.log.index``) with a line for each log record. Each index
+entry identifies the log segment the record is in by its inode and a
+checksum of its first line (which together survive rotation, and tell a
+new segment apart from a deleted one whose inode it reused). It also gives
+the record's offset and length in that segment, and the values of a few of
+its keys (see INDEXED_KEYS). Lookups only have to read the index, and then
+the matching records.
+
+Pruned records are marked 'dead' in the index, and are dropped from
+lookups immediately. They're removed from the log segment itself when that
+segment is compacted. That normally happens as part of the prune, but may
+be put off until enough of the segment is dead.
+
+Records written without going through the index (such as by older versions
+of Pavilion) are found and indexed when the log is next read.
+"""
+
+import collections
+import fnmatch
+import json
+import logging
+import os
+import re
+import zlib
+from pathlib import Path
+from typing import (Any, Callable, Dict, Iterable, Iterator, List, Tuple,
+                    Union)
+
+from pavilion import lockfile
+from pavilion import utils
+
+LOGGER = logging.getLogger('pav.' + __name__)
+
+INDEX_SUFFIX = '.index'
+LOCK_SUFFIX = '.lock'
+
+# The logger that writes to the result log.
+RESULT_LOGGER = 'common_results'
+
+# The record keys whose values are kept in the index.
+INDEXED_KEYS = ('id', 'uuid', 'name', 'sys_name', 'created', 'result')
+
+# Compact a log segment once this fraction of it is dead (pruned) records.
+COMPACT_RATIO = 0.5
+# Rewrite the index once it has this many entries for log segments that
+# have since been rotated out of existence.
+INDEX_COMPACT_SLACK = 10000
+# How long to wait on the log lock when indexing records that were found
+# unindexed. If we can't get it, they're only indexed in memory.
+INDEX_LOCK_TIMEOUT = 3
+
+
+def index_path(log_path: Path) -> Path:
+    """Return the path to the index for the given result log."""
+
+    return log_path.with_name(log_path.name + INDEX_SUFFIX)
+
+
+def lock_path(log_path: Path) -> Path:
+    """Return the path to the lock file shared by everything that writes to
+    the given result log (or its index)."""
+
+    return log_path.with_name(log_path.name + LOCK_SUFFIX)
+
+
+def segments(log_path: Path) -> List[Path]:
+    """Return the existing segments of the given result log (the log and its
+    rotated backups), oldest first."""
+
+    backup_re = re.compile(r'^{}\.(\d+)$'.format(re.escape(log_path.name)))
+
+    backups = []
+    try:
+        for name in os.listdir(str(log_path.parent)):
+            match = backup_re.match(name)
+            if match is not None:
+                backups.append((int(match.group(1)), name))
+    except OSError:
+        pass
+
+    paths = [log_path.parent/name for _, name in sorted(backups, reverse=True)]
+    if log_path.exists():
+        paths.append(log_path)
+    return paths
+
+
+def flush_logger() -> None:
+    """Write out any result records this process has buffered (see
+    log_setup.LockFileRotatingFileHandler), so lookups will find them."""
+
+    for handler in logging.getLogger(RESULT_LOGGER).handlers:
+        handler.flush()
+
+
+def segment_id(first_line: bytes) -> int:
+    """Return the id of the log segment that starts with the given line
+    (without its trailing newline). Along with the segment's inode, this
+    identifies the segment."""
+
+    return zlib.crc32(first_line)
+
+
+def _segment_key(seg_path: Path) -> Union[Tuple[int, int, int], None]:
+    """Return the inode, id and size of the given log segment. Segments
+    without a complete first line don't have an id yet, and get None.
+
+    :raises OSError: When the segment can't be read.
+    """
+
+    with seg_path.open('rb') as seg_file:
+        stat = os.fstat(seg_file.fileno())
+        first_line = seg_file.readline()
+
+    if not first_line.endswith(b'\n'):
+        return None
+
+    return stat.st_ino, segment_id(first_line[:-1]), stat.st_size
+
+
+def make_entries(ino: int, seg_id: int, offset: int,
+                 lines: Iterable[bytes]) -> List[dict]:
+    """Return the index entries for the given log lines (without their
+    trailing newlines), as written to the segment with the given inode and
+    segment id at the given offset."""
+
+    entries = []
+    for line in lines:
+        entry = {'ino': ino, 'seg': seg_id, 'off': offset, 'len': len(line)}
+        try:
+            record = json.loads(line.decode('utf8'))
+        except ValueError:
+            record = None
+
+        if isinstance(record, dict):
+            entry['keys'] = {key: record[key] for key in INDEXED_KEYS
+                             if key in record}
+        else:
+            # Not a result record, but it still needs an entry so we know
+            # it's been indexed.
+            entry['keys'] = None
+
+        entries.append(entry)
+        offset += len(line) + 1
+
+    return entries
+
+
+def append_index(log_path: Path, entries: List[dict]) -> bool:
+    """Append the given entries to the log's index. The log lock must be
+    held.
+
+    :returns: False if the index couldn't be updated. The failure is logged.
+    """
+
+    if not entries:
+        return True
+
+    lines = ''.join(json.dumps(entry) + '\n' for entry in entries)
+
+    try:
+        with index_path(log_path).open('a') as index_file:
+            index_file.write(lines)
+    except OSError as err:
+        LOGGER.warning("Could not update result log index for '%s': %s",
+                       log_path, err)
+        return False
+
+    return True
+
+
+class _Segment:
+    """The index entries for one log segment."""
+
+    def __init__(self, path: Path, size: int):
+        self.path = path
+        self.size = size
+        # Index entries by offset.
+        self.entries = {}  # type: Dict[int, dict]
+
+    def live(self) -> List[dict]:
+        """The entries for result records that haven't been pruned, in log
+        order."""
+
+        return [self.entries[off] for off in sorted(self.entries)
+                if not self.entries[off].get('dead')
+                and self.entries[off].get('keys') is not None]
+
+    def dead_bytes(self) -> int:
+        """The number of bytes of pruned records in this segment."""
+
+        return sum(entry['len'] + 1 for entry in self.entries.values()
+                   if entry.get('dead'))
+
+
+def _read_index(log_path: Path) -> Dict[Tuple[int, int, int], dict]:
+    """Read the index, returning the entries by (inode, segment id, offset).
+    Later entries replace earlier ones."""
+
+    entries = {}
+    try:
+        with index_path(log_path).open() as index_file:
+            for line in index_file:
+                try:
+                    entry = json.loads(line)
+                    key = (int(entry['ino']), int(entry['seg']),
+                           int(entry['off']))
+                    int(entry['len'])
+                except (ValueError, KeyError, TypeError):
+                    # Ignore partially written or otherwise mangled lines.
+                    continue
+
+                entries[key] = entry
+    except FileNotFoundError:
+        pass
+    except OSError as err:
+        LOGGER.warning("Could not read result log index for '%s': %s",
+                       log_path, err)
+
+    return entries
+
+
+def _scan(seg_path: Path, ino: int, seg_id: int, start: int,
+          end: int) -> List[dict]:
+    """Make index entries for every (complete) line in the given byte range
+    of a log segment."""
+
+    with seg_path.open('rb') as seg_file:
+        seg_file.seek(start)
+        data = seg_file.read(end - start)
+
+    lines = data.split(b'\n')
+    # The last piece is either empty, or a partially written line.
+    return make_entries(ino, seg_id, start, lines[:-1])
+
+
+def _load(log_path: Path,
+          persist: bool = True) -> Dict[Tuple[int, int], _Segment]:
+    """Load the index for the given log, by segment (inode, id), oldest
+    segment first. Any records in the log that aren't in the index are
+    indexed along the way.
+
+    :param persist: Save newly indexed entries to the index (if we can get
+        the lock quickly).
+    """
+
+    entries = _read_index(log_path)
+
+    # Kept in log order, oldest first.
+    segs = collections.OrderedDict()
+    for seg_path in segments(log_path):
+        try:
+            seg_key = _segment_key(seg_path)
+        except OSError:
+            continue
+        # Segments without a complete line have nothing to index.
+        if seg_key is not None:
+            ino, seg_id, size = seg_key
+            segs[(ino, seg_id)] = _Segment(seg_path, size)
+
+    # Entries for segments that no longer exist (or that reach past the end
+    # of their segment) are dropped.
+    stale = 0
+    for (ino, seg_id, off), entry in entries.items():
+        seg = segs.get((ino, seg_id))
+        if seg is not None and off + entry['len'] < seg.size:
+            seg.entries[off] = entry
+        else:
+            stale += 1
+
+    # Index any records between or after the indexed ones.
+    new_entries = []
+    for (ino, seg_id), seg in segs.items():
+        pos = 0
+        for off in sorted(seg.entries) + [seg.size]:
+            if off > pos:
+                try:
+                    found = _scan(seg.path, ino, seg_id, pos,
+                                  min(off, seg.size))
+                except OSError as err:
+                    LOGGER.warning("Could not read result log '%s': %s",
+                                   seg.path, err)
+                    break
+                for entry in found:
+                    seg.entries[entry['off']] = entry
+                new_entries.extend(found)
+            if off < seg.size:
+                pos = max(pos, off + seg.entries[off]['len'] + 1)
+
+    if persist and (new_entries or stale > INDEX_COMPACT_SLACK):
+        try:
+            with lockfile.LockFile(lock_path(log_path),
+                                   timeout=INDEX_LOCK_TIMEOUT):
+                if stale > INDEX_COMPACT_SLACK:
+                    _write_index(log_path, segs)
+                else:
+                    append_index(log_path, new_entries)
+        except (OSError, TimeoutError):
+            pass
+
+    return segs
+
+
+def _read_records(segs: List[Tuple[_Segment, List[dict]]]) \
+        -> Iterator[Tuple[dict, dict]]:
+    """Read and yield the (entry, record) for each of the given entries, in
+    the given order. Entries that don't match the record found at their
+    offset (or can't be read) are skipped."""
+
+    for seg, entries in segs:
+        if not entries:
+            continue
+
+        try:
+            seg_file = seg.path.open('rb')
+        except OSError as err:
+            LOGGER.warning("Could not read result log '%s': %s",
+                           seg.path, err)
+            continue
+
+        with seg_file:
+            for entry in entries:
+                try:
+                    seg_file.seek(entry['off'])
+                    record = json.loads(
+                        seg_file.read(entry['len']).decode('utf8'))
+                except (OSError, ValueError) as err:
+                    LOGGER.warning(
+                        "Bad result log record in '%s' at offset %s: %s",
+                        seg.path, entry['off'], err)
+                    continue
+
+                # Guard against stale entries (such as from a deleted log
+                # segment whose inode was reused).
+                if not isinstance(record, dict) or any(
+                        record.get(key) != val
+                        for key, val in entry['keys'].items()):
+                    continue
+
+                yield entry, record
+
+
+def query(log_path: Path,
+          equal: Dict[str, Iterable[Any]] = None,
+          ranges: Dict[str, Tuple[Any, Any]] = None,
+          match: Callable[[dict], bool] = None,
+          limit: int = None) -> Iterator[dict]:
+    """Yield the records from the result log that match all of the given
+    conditions, in the order they were logged. Conditions are checked
+    against the index; only the matching records are read and parsed.
+
+    :param log_path: The result log path.
+    :param equal: A dict of indexed keys and the values to accept for each.
+    :param ranges: A dict of indexed keys and the (low, high) range of
+        values to accept for each. The range is inclusive, and either end
+        may be None. Records without a value for the key are excluded.
+    :param match: A function that takes the indexed keys of a record, and
+        returns whether to include it.
+    :param limit: Only yield the last (most recent) 'limit' matches.
+    """
+
+    flush_logger()
+
+    equal = {key: set(vals) for key, vals in (equal or {}).items()}
+    ranges = ranges or {}
+
+    def matches(keys: dict) -> bool:
+        """Check the conditions against the indexed keys."""
+
+        for key, vals in equal.items():
+            if keys.get(key) not in vals:
+                return False
+
+        for key, (low, high) in ranges.items():
+            val = keys.get(key)
+            if val is None:
+                return False
+            try:
+                if ((low is not None and val < low)
+                        or (high is not None and val > high)):
+                    return False
+            except TypeError:
+                return False
+
+        return match is None or match(keys)
+
+    segs = _load(log_path)
+
+    selected = [(seg, [entry for entry in seg.live()
+                       if matches(entry['keys'])])
+                for seg in segs.values()]
+
+    if limit is not None:
+        remaining = limit
+        for i in range(len(selected) - 1, -1, -1):
+            seg, entries = selected[i]
+            selected[i] = (seg, entries[max(0, len(entries) - remaining):])
+            remaining -= len(selected[i][1])
+
+    for _, record in _read_records(selected):
+        yield record
+
+
+def name_matcher(name_glob: str) -> Callable[[dict], bool]:
+    """Return a match function (for query) that matches records by name
+    with the given glob."""
+
+    def match(keys: dict) -> bool:
+        """Match the record name against the glob."""
+        return fnmatch.fnmatch(str(keys.get('name', '')), name_glob)
+
+    return match
+
+
+def prune(log_path: Path, ids: List[str], compact_ratio: float = 0,
+          lock_timeout: int = None) -> List[dict]:
+    """Prune the records for the given test ids from the result log. Ids can
+    be either a test run id or a test run uuid. The records are marked dead
+    in the index (so they won't be found by query), and log segments that
+    are then at least compact_ratio dead are compacted.
+
+    :param log_path: The result log path.
+    :param ids: A list of test run ids and/or uuids.
+    :param compact_ratio: Compact segments that are at least this fraction
+        dead. Zero (the default) compacts every segment with pruned records,
+        removing them from the log files right away.
+    :param lock_timeout: How long to wait for the log lock.
+    :returns: A list of the pruned result dictionaries.
+    :raises OSError: When the log or index can't be updated.
+    :raises TimeoutError: When the log lock can't be acquired.
+    """
+
+    ids = set(str(id_) for id_ in ids)
+
+    def match(keys: dict) -> bool:
+        """Match the record's id or uuid."""
+        return str(keys.get('id')) in ids or keys.get('uuid') in ids
+
+    flush_logger()
+
+    with lockfile.LockFile(lock_path(log_path), timeout=lock_timeout):
+        segs = _load(log_path, persist=False)
+        selected = [(seg, [entry for entry in seg.live()
+                           if match(entry['keys'])])
+                    for seg in segs.values()]
+
+        pruned = []
+        for entry, record in _read_records(selected):
+            pruned.append(record)
+            entry['dead'] = True
+
+        # This also saves the dead entries to the index.
+        _compact(log_path, segs, compact_ratio)
+
+    return pruned
+
+
+def compact(log_path: Path, compact_ratio: float = 0,
+            lock_timeout: int = None) -> int:
+    """Remove the pruned records from the log segments that are at least
+    compact_ratio dead, and rewrite the index without any superseded
+    entries. Zero compacts every segment with pruned records.
+
+    :returns: The number of segments compacted.
+    :raises OSError: When the log or index can't be rewritten.
+    :raises TimeoutError: When the log lock can't be acquired.
+    """
+
+    flush_logger()
+
+    with lockfile.LockFile(lock_path(log_path), timeout=lock_timeout):
+        segs = _load(log_path, persist=False)
+        return _compact(log_path, segs, compact_ratio)
+
+
+def _compact(log_path: Path, segs: Dict[Tuple[int, int], _Segment],
+             compact_ratio: float) -> int:
+    """Compact the given segments as needed, and then rewrite the index.
+    The log lock must be held."""
+
+    count = 0
+    for seg_key in list(segs):
+        seg = segs[seg_key]
+        dead_bytes = seg.dead_bytes()
+        if not dead_bytes or dead_bytes < compact_ratio * seg.size:
+            continue
+
+        del segs[seg_key]
+        new_key, new_seg = _compact_segment(seg)
+        if new_key is not None:
+            segs[new_key] = new_seg
+        count += 1
+
+    _write_index(log_path, segs)
+    return count
+
+
+def _compact_segment(seg: _Segment) \
+        -> Tuple[Union[Tuple[int, int], None], _Segment]:
+    """Rewrite the given log segment without its dead records.
+
+    :returns: The (inode, id) of the new segment (None if it has no
+        complete lines), and the new segment.
+    """
+
+    dead = set(off for off, entry in seg.entries.items() if entry.get('dead'))
+
+    kept = []
+    with seg.path.open('rb') as seg_file, \
+            utils.atomic_write(seg.path, 'wb', keep_perms=True) as tmp_file:
+        offset = 0
+        for line in seg_file:
+            if offset not in dead:
+                tmp_file.write(line)
+                # Keep any partially written last line as is, but don't
+                # index it.
+                if line.endswith(b'\n'):
+                    kept.append(line[:-1])
+            offset += len(line)
+
+    stat = seg.path.stat()
+    new_seg = _Segment(seg.path, stat.st_size)
+    if not kept:
+        return None, new_seg
+
+    seg_id = segment_id(kept[0])
+    for entry in make_entries(stat.st_ino, seg_id, 0, kept):
+        new_seg.entries[entry['off']] = entry
+    return (stat.st_ino, seg_id), new_seg
+
+
+def drop_stale(log_path: Path) -> None:
+    """Rewrite the index without the entries for log segments that no
+    longer exist, such as the backup deleted when the log rolls over. The
+    log lock must be held.
+
+    :raises OSError: When the index can't be rewritten.
+    """
+
+    _write_index(log_path, _load(log_path, persist=False))
+
+
+def _write_index(log_path: Path,
+                 segs: Dict[Tuple[int, int], _Segment]) -> None:
+    """Atomically rewrite the index with the entries of the given segments.
+    The log lock must be held."""
+
+    with utils.atomic_write(index_path(log_path), keep_perms=True) \
+            as tmp_file:
+        for seg in segs.values():
+            for off in sorted(seg.entries):
+                tmp_file.write(json.dumps(seg.entries[off]) + '\n')
@@ -9,8 +9,13 @@ import inspect
 import logging
 import os
 import subprocess
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from functools import wraps
 from pathlib import Path
+from typing import Callable, List, Union
 
 from pavilion import scriptcomposer
 from pavilion.permissions import PermissionsManager
@@ -250,6 +255,164 @@ def __reset():
             plugin.deactivate()
 
 
+def get_job_statuses(pav_cfg, tests) -> List[StatusInfo]:
+    """Get the scheduler job status for each of the given tests, querying each
+    scheduler once for all of its tests via SchedulerPlugin.job_statuses.
+
+    :param pav_cfg: The pavilion configuration.
+    :param List[pavilion.test_run.TestRun] tests: The tests to check on.
+    :return: A list of StatusInfo objects, in the same order as tests.
+    """
+
+    by_sched = defaultdict(list)
+    for i, test in enumerate(tests):
+        by_sched[test.scheduler].append(i)
+
+    statuses = [None] * len(tests)
+    for sched_name, indices in by_sched.items():
+        sched = get_plugin(sched_name)
+        sched_statuses = sched.job_statuses(
+            pav_cfg, [tests[i] for i in indices])
+        for i, status in zip(indices, sched_statuses):
+            statuses[i] = status
+
+    return statuses
+
+
+def cancel_jobs(tests) -> List[StatusInfo]:
+    """Cancel the given tests, calling each scheduler's cancel_jobs once
+    for all of its tests.
+
+    :param List[pavilion.test_run.TestRun] tests: The tests to cancel.
+    :return: A list of StatusInfo objects, in the same order as tests.
+    """
+
+    by_sched = defaultdict(list)
+    for i, test in enumerate(tests):
+        by_sched[test.scheduler].append(i)
+
+    statuses = [None] * len(tests)
+    for sched_name, indices in by_sched.items():
+        sched = get_plugin(sched_name)
+        sched_statuses = sched.cancel_jobs([tests[i] for i in indices])
+        for i, status in zip(indices, sched_statuses):
+            statuses[i] = status
+
+    return statuses
+
+
+class _RateLimiter:
+    """Space out calls to wait() (across threads) so that they return at
+    most once every interval seconds."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Wait until our next time slot."""
+
+        if not self.interval:
+            return
+
+        with self._lock:
+            now = time.time()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+
+        if delay > 0:
+            time.sleep(delay)
+
+
+def schedule_tests(pav_cfg, tests, max_threads: int = 1,
+                   progress: Union[Callable, None] = None) -> None:
+    """Schedule each of the given tests (via SchedulerPlugin.schedule_test),
+    with up to max_threads submissions in progress at once. Submissions to
+    each scheduler are spaced out according to its SUBMIT_INTERVAL. Tests
+    that the scheduler packs together (see SchedulerPlugin.pack_tests) are
+    submitted as a single allocation via SchedulerPlugin.run_suite.
+
+    If any test fails to schedule, no further tests are submitted, and all
+    the tests that were scheduled (or failed) are cancelled.
+
+    :param pav_cfg: The pavilion configuration.
+    :param List[pavilion.test_run.TestRun] tests: The tests to schedule.
+    :param max_threads: The maximum number of simultaneous submissions.
+    :param progress: Called with each test after it is scheduled.
+    :raises SchedulerPluginError: (or whatever else the scheduler raised)
+        for the first test that failed to schedule.
+    """
+
+    if not tests:
+        return
+
+    by_sched = defaultdict(list)
+    for test in tests:
+        by_sched[test.scheduler].append(test)
+
+    limiters = {}
+    groups = []
+    for sched_name, sched_tests in by_sched.items():
+        sched = get_plugin(sched_name)
+        limiters[sched_name] = _RateLimiter(sched.SUBMIT_INTERVAL)
+        groups.extend(sched.pack_tests(sched_tests))
+
+    failed = threading.Event()
+
+    def submit(group):
+        """Schedule a group of tests, unless another has already failed."""
+
+        if failed.is_set():
+            return False
+
+        sched_name = group[0].scheduler
+        limiters[sched_name].wait()
+        if failed.is_set():
+            return False
+
+        sched = get_plugin(sched_name)
+        try:
+            if len(group) == 1:
+                sched.schedule_test(pav_cfg, group[0])
+            else:
+                sched.run_suite(pav_cfg, group)
+        except Exception:
+            failed.set()
+            raise
+
+        return True
+
+    started = []
+    errors = []
+    max_threads = max(1, min(max_threads, len(groups)))
+    with ThreadPoolExecutor(max_workers=max_threads) as pool:
+        futures = {pool.submit(submit, group): group for group in groups}
+        for future in as_completed(futures):
+            group = futures[future]
+            try:
+                if not future.result():
+                    continue
+            except Exception as err:  # pylint: disable=broad-except
+                started.extend(group)
+                errors.append(err)
+                continue
+
+            started.extend(group)
+            if progress is not None:
+                for test in group:
+                    progress(test)
+
+    if errors:
+        # Tests packed into a shared allocation share a job, so cancel them
+        # together rather than one job (and scancel) per test.
+        for test, status in zip(started, cancel_jobs(started)):
+            test.status.set(status.state, status.note)
+            test.set_run_complete()
+
+        raise errors[0]
+
+
 def get_plugin(name):
     """Return a scheduler plugin
 
@@ -260,6 +423,11 @@ def get_plugin(name):
     if _SCHEDULER_PLUGINS is None:
         raise SchedulerPluginError("No scheduler plugins loaded.")
 
+    if name not in _SCHEDULER_PLUGINS:
+        # Plugins are loaded on first use.
+        from pavilion import plugins
+        plugins.load_plugins('sched', name)
+
     if name not in _SCHEDULER_PLUGINS:
         raise SchedulerPluginError(
             "Scheduler plugin not found: '{}'".format(name))
@@ -275,6 +443,9 @@ def list_plugins():
     if _SCHEDULER_PLUGINS is None:
         raise SchedulerPluginError("Scheduler Plugins aren't loaded.")
 
+    from pavilion import plugins
+    plugins.load_plugins('sched')
+
     return list(_SCHEDULER_PLUGINS.keys())
 
 
@@ -293,6 +464,12 @@ class SchedulerPlugin(IPlugin.IPlugin):
     VAR_CLASS = SchedulerVariables
     """The scheduler's variable class."""
 
+    SUBMIT_INTERVAL = 0
+    """The minimum time (in seconds) between job submissions to this
+    scheduler when scheduling tests in parallel."""
+
+    _data_lock = threading.Lock()
+
     def __init__(self, name, description, priority=PRIO_CORE):
         """Scheduler plugin that is expected to be overriden by subclasses.
         The plugin will populate a set of expected 'sched' variables."""
@@ -346,8 +523,10 @@ class SchedulerPlugin(IPlugin.IPlugin):
         :rtype: dict
         """
 
-        if self._data is None or refresh:
-            self._data = self._get_data()
+        # Tests may be scheduled from multiple threads.
+        with self._data_lock:
+            if self._data is None or refresh:
+                self._data = self._get_data()
 
         return self._data
 
@@ -381,9 +560,28 @@ class SchedulerPlugin(IPlugin.IPlugin):
         for test in tests:
             self.schedule_test(pav_cfg, test)
 
-    def run_suite(self, tests):
-        """Run each of the given tests using a single allocation. This
-        is effectively a placeholder."""
+    def pack_tests(self, tests) -> List[List[TestRun]]:
+        """Group the given tests into sets that should each share a single
+        allocation (via run_suite). By default every test gets its own
+        allocation.
+
+        :param [pavilion.test_run.TestRun] tests: The tests to group.
+        """
+
+        return [[test] for test in tests]
+
+    def run_suite(self, pav_cfg, tests):
+        """Schedule each of the given tests (as grouped by pack_tests) to run
+        in a single allocation. Schedulers that can share allocations should
+        override this along with pack_tests; by default each test is simply
+        scheduled on its own.
+
+        :param pav_cfg: The pavilion config
+        :param [pavilion.test_run.TestRun] tests: The tests to schedule.
+        """
+
+        for test in tests:
+            self.schedule_test(pav_cfg, test)
 
     def lock_concurrency(self, pav_cfg, test):
         """Acquire the concurrency lock for this scheduler, if necessary.
@@ -471,6 +669,18 @@ class SchedulerPlugin(IPlugin.IPlugin):
 
         raise NotImplementedError
 
+    def job_statuses(self, pav_cfg, tests) -> List[StatusInfo]:
+        """Get the job states of all the given tests, as per job_status. By
+        default this simply calls job_status for each test; schedulers that
+        can query many jobs at once should override it.
+
+        :param pav_cfg: The pavilion configuration.
+        :param List[pavilion.test_run.TestRun] tests: The tests to check on.
+        :return: A list of StatusInfo objects, in the same order as tests.
+        """
+
+        return [self.job_status(pav_cfg, test) for test in tests]
+
     def schedule_test(self, pav_cfg, test_obj):
         """Create the test script and schedule the job.
 
@@ -520,6 +730,22 @@ class SchedulerPlugin(IPlugin.IPlugin):
         script.command("exec >{} 2>&1"
                        .format(test_obj.path/'kickoff.log'))
 
+        self._add_kickoff_env(pav_cfg, script)
+
+        # Run the test via pavilion
+        script.command('pav _run {t.id}'.format(t=test_obj))
+
+        path = self._kickoff_script_path(test_obj)
+        with PermissionsManager(path, test_obj.group, test_obj.umask):
+            script.write(path)
+
+        return path
+
+    @staticmethod
+    def _add_kickoff_env(pav_cfg, script):
+        """Add the environment changes and setup commands that every kickoff
+        script needs to the given script object."""
+
         # Make sure the pavilion spawned
         env_changes = {
             'PATH': '{}:${{PATH}}'.format(pav_cfg.pav_root/'bin'),
@@ -534,15 +760,6 @@ class SchedulerPlugin(IPlugin.IPlugin):
         for command in pav_cfg.env_setup:
             script.command(command)
 
-        # Run the test via pavilion
-        script.command('pav _run {t.id}'.format(t=test_obj))
-
-        path = self._kickoff_script_path(test_obj)
-        with PermissionsManager(path, test_obj.group, test_obj.umask):
-            script.write(path)
-
-        return path
-
     def _get_kickoff_script_header(self, test):
         # Unused in the base class
         del test
@@ -578,6 +795,42 @@ class SchedulerPlugin(IPlugin.IPlugin):
 
         return self._cancel_job(test)
 
+    def cancel_jobs(self, tests) -> List[StatusInfo]:
+        """Cancel all of the given tests, as per cancel_job. Unlike
+        cancel_job, this leaves setting each test's status (to the returned
+        state) and marking it complete to the caller, so that can be done
+        in parallel.
+
+        :param List[pavilion.test_run.TestRun] tests: The tests to cancel.
+        :returns: A list of StatusInfo objects, in the same order as tests.
+        """
+
+        statuses = [None] * len(tests)
+        started = []
+        for i, test in enumerate(tests):
+            if test.job_id is None:
+                statuses[i] = StatusInfo(STATES.SCHED_CANCELLED,
+                                         "Job was never started.")
+            else:
+                started.append(i)
+
+        sched_statuses = self._cancel_jobs([tests[i] for i in started])
+        for i, status in zip(started, sched_statuses):
+            statuses[i] = status
+
+        return statuses
+
+    def _cancel_jobs(self, tests) -> List[StatusInfo]:
+        """Cancel the jobs for all the given (started) tests. By default this
+        simply calls _cancel_job for each test; schedulers that can cancel
+        many jobs at once should override it.
+
+        :param List[pavilion.test_run.TestRun] tests: The tests to cancel.
+        :returns: A list of StatusInfo objects, in the same order as tests.
+        """
+
+        return [self._cancel_job(test) for test in tests]
+
     def _cancel_job(self, test):
         """Override in scheduler plugins to handle cancelling a job.
 
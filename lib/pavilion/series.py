@@ -4,6 +4,7 @@ import datetime as dt
 import json
 import logging
 import errno
+import os
 import time
 from pathlib import Path
 
@@ -11,6 +12,7 @@ from pavilion import dir_db
 from pavilion import system_variables
 from pavilion import utils
 from pavilion import schedulers
+from pavilion import series_summary
 from pavilion import output
 from pavilion.permissions import PermissionsManager
 from pavilion.output import fprint
@@ -96,6 +98,8 @@ class TestSeries:
                         "Could not link test '{}' in series at '{}': {}"
                         .format(test.path, link_path, err))
 
+            self._save_summary(tests)
+
             # Update user.json to record last series run per sys_name
             self._save_series_id()
 
@@ -131,27 +135,37 @@ class TestSeries:
                        file=errfile, color=output.RED)
                 return errno.EINVAL
 
-        for test in self.tests.values():
+        # Don't run tests that were meant to be skipped, or tests that are
+        # build-only or build-local (which should already be complete).
+        to_schedule = [test for test in self.tests.values()
+                       if not (test.skipped or test.complete)]
 
-            # don't run this test if it was meant to be skipped
-            if test.skipped:
-                continue
+        scheduled = 0
 
-            # tests that are build-only or build-local should already be completed, therefore don't run these
-            if test.complete:
-                continue
+        def progress(_):
+            """Print how many tests have been scheduled so far."""
 
-            sched = schedulers.get_plugin(test.scheduler)
-            try:
-                sched.schedule_tests(pav_cfg, [test])
-            except schedulers.SchedulerPluginError as err:
-                fprint('Error scheduling test: ', file=errfile,
-                       color=output.RED)
-                fprint(err, bullet='  ', file=errfile)
-                fprint('Cancelling already kicked off tests.',
-                       file=errfile)
-                sched.cancel_job(test)
-                return errno.EINVAL
+            nonlocal scheduled
+            scheduled += 1
+            fprint("Scheduled {}/{} tests."
+                   .format(scheduled, len(to_schedule)),
+                   file=outfile, end='\r', width=None)
+
+        try:
+            schedulers.schedule_tests(
+                pav_cfg, to_schedule,
+                max_threads=pav_cfg.schedule_threads,
+                progress=progress if len(to_schedule) > 1 else None)
+        except schedulers.SchedulerPluginError as err:
+            fprint('Error scheduling test: ', file=errfile,
+                   color=output.RED)
+            fprint(err, bullet='  ', file=errfile)
+            fprint('Cancelled already kicked off tests.',
+                   file=errfile)
+            return errno.EINVAL
+
+        if len(to_schedule) > 1:
+            fprint('', file=outfile, width=None)
 
         # Tests should all be scheduled now, and have the SCHEDULED state
         # (at some point, at least). Wait until something isn't scheduled
@@ -161,21 +175,31 @@ class TestSeries:
             end_time = time.time() + wait
             while time.time() < end_time and wait_result is None:
                 last_time = time.time()
+                scheduled = []
                 for test in self.tests.values():
-                    sched = schedulers.get_plugin(test.scheduler)
-                    status = test.status.current()
-                    if status == STATES.SCHEDULED:
-                        status = sched.job_status(pav_cfg, test)
+                    if test.skipped:
+                        continue
 
-                    if status != STATES.SCHEDULED:
+                    status = test.status.current()
+                    if status.state == STATES.SCHEDULED:
+                        scheduled.append(test)
+                    else:
                         # The test has moved past the scheduled state
-                        wait_result = None
+                        wait_result = status
                         break
+                else:
+                    # Check on all the scheduled tests in one go.
+                    for status in schedulers.get_job_statuses(pav_cfg,
+                                                              scheduled):
+                        if status.state != STATES.SCHEDULED:
+                            wait_result = status
+                            break
 
                 if wait_result is None:
                     # Sleep at most SLEEP INTERVAL seconds, minus the time
                     # we spent checking our jobs.
-                    time.sleep(SLEEP_INTERVAL - (time.time() - last_time))
+                    time.sleep(max(0, SLEEP_INTERVAL -
+                                   (time.time() - last_time)))
 
         fprint("{} test{} started as test series {}."
                .format(len(all_tests),
@@ -301,6 +325,31 @@ differentiate it from test ids."""
 
         return cls(pav_cfg, tests, _id=sid)
 
+    def _save_summary(self, tests):
+        """Mark each test as belonging to this series, and write the series
+        summary from the test's current state. The tests keep the summary
+        up to date from here on."""
+
+        for test in tests:
+            test.series = self.sid
+            try:
+                test.save_attributes()
+            except OSError as err:
+                raise TestSeriesError(
+                    "Could not save series id to test '{}': {}"
+                    .format(test.id, err))
+
+        series_summary.write(
+            self.path,
+            sys_name=tests[0].sys_name if tests else None,
+            user=utils.get_login(),
+            created=utils.serialize_datetime(dt.datetime.now()),
+            tests={test.id: series_summary.run_record(test.complete,
+                                                      test.result)
+                   for test in tests},
+            group=self.pav_cfg['shared_group'],
+            umask=self.pav_cfg['umask'])
+
     def _save_series_id(self):
         """Save the series id to json file that tracks last series ran by user
         on a per system basis."""
@@ -370,14 +419,101 @@ class SeriesInfo:
     """This class is a stop-gap. It's not meant to provide the same
     functionality as test_run.TestAttributes, but a lazily evaluated set
     of properties for a given series path. It should be replaced with
-    something like TestAttributes in the future."""
+    something like TestAttributes in the future.
+
+    Values come from the series summary file when there is one. Older series
+    without a summary are examined test by test."""
 
     def __init__(self, path: Path):
 
         self.path = path
 
-        self._complete = None
-        self._tests = [tpath for tpath in dir_db.select(self.path)[0]]
+        self._summary = None
+        self._summary_loaded = False
+        self._tests = None
+        self._test_attrs = None
+
+    def _get_summary(self):
+        """Load the series summary, if there is one."""
+
+        if not self._summary_loaded:
+            self._summary = series_summary.load(self.path)
+            if self._summary is not None:
+                self._check_summary(self._summary)
+            self._summary_loaded = True
+
+        return self._summary
+
+    def _check_summary(self, summary: dict):
+        """Check the test runs the summary lists as incomplete, as the
+        update that marked them complete may have failed. Those that are now
+        complete or that no longer exist are fixed in the summary (both
+        the one given and the file, if we're allowed to write it)."""
+
+        fixes = {}
+        for test_id, record in summary['tests'].items():
+            if record.get('complete'):
+                continue
+
+            try:
+                test_path = dir_db.make_id_path(self.path, int(test_id))
+            except ValueError:
+                continue
+
+            if not test_path.exists():
+                fixes[test_id] = None
+            elif (test_path/TestRun.COMPLETE_FN).exists():
+                try:
+                    attrs = TestAttributes(test_path)
+                except TestRunError:
+                    continue
+                fixes[test_id] = series_summary.run_record(True, attrs.result)
+
+        if not fixes:
+            return
+
+        for test_id, record in fixes.items():
+            if record is None:
+                del summary['tests'][test_id]
+            else:
+                summary['tests'][test_id] = record
+
+        series_summary.tally(summary)
+
+        # Listing other users' series shouldn't warn about every one of them.
+        if os.access(str(self.path), os.W_OK):
+            series_summary.update_tests(self.path, fixes)
+
+    def _get_tests(self):
+        """The paths to the tests in this series."""
+
+        if self._tests is None:
+            self._tests = [tpath for tpath in dir_db.select(self.path)[0]]
+
+        return self._tests
+
+    def _get_test_attrs(self):
+        """The attributes of each test in the series."""
+
+        if self._test_attrs is None:
+            self._test_attrs = []
+            for test_path in self._get_tests():
+                try:
+                    self._test_attrs.append(TestAttributes(test_path))
+                except TestRunError:
+                    continue
+
+        return self._test_attrs
+
+    def _count_results(self, result):
+        """Count the tests with the given result."""
+
+        summary = self._get_summary()
+        if summary is not None:
+            return summary.get(series_summary.RESULT_COUNTS[result], 0)
+
+        return sum(1 for attrs in self._get_test_attrs()
+                   if attrs.result == result)
 
     @classmethod
     def list_attrs(cls):
@@ -417,14 +553,33 @@ class SeriesInfo:
     @property
     def complete(self):
         """True if all tests are complete."""
-        if self._complete is None:
-            self._complete = all([(test_path / TestRun.COMPLETE_FN).exists()
-                                  for test_path in self._tests])
-        return self._complete
+
+        summary = self._get_summary()
+        if summary is not None:
+            return summary.get('complete') == summary.get('num_tests')
+
+        return all([(test_path / TestRun.COMPLETE_FN).exists()
+                    for test_path in self._get_tests()])
+
+    @property
+    def num_complete(self):
+        """The number of tests in this series that are complete."""
+
+        summary = self._get_summary()
+        if summary is not None:
+            return summary.get('complete')
+
+        return sum(1 for test_path in self._get_tests()
+                   if (test_path / TestRun.COMPLETE_FN).exists())
 
     @property
     def user(self):
         """The user who created the suite."""
+
+        summary = self._get_summary()
+        if summary is not None and summary.get('user') is not None:
+            return summary['user']
+
         try:
             return self.path.owner()
         except KeyError:
@@ -434,19 +589,50 @@ class SeriesInfo:
     def created(self) -> dt.datetime:
         """When the test was created."""
 
+        summary = self._get_summary()
+        if summary is not None and summary.get('created') is not None:
+            try:
+                return utils.deserialize_datetime(summary['created'])
+            except (TypeError, ValueError):
+                pass
+
         return dt.datetime.fromtimestamp(self.path.stat().st_mtime)
 
     @property
     def num_tests(self):
         """The number of tests belonging to this series."""
-        return len(self._tests)
+
+        summary = self._get_summary()
+        if summary is not None:
+            return summary.get('num_tests')
+
+        return len(self._get_tests())
+
+    @property
+    def passed(self):
+        """The number of tests in this series that passed."""
+        return self._count_results(TestRun.PASS)
+
+    @property
+    def failed(self):
+        """The number of tests in this series that failed."""
+        return self._count_results(TestRun.FAIL)
+
+    @property
+    def errors(self):
+        """The number of tests in this series with an ERROR result."""
+        return self._count_results(TestRun.ERROR)
 
     @property
     def sys_name(self):
         """The sys_name the series ran on."""
 
-        if not self._tests:
-            return None
+        summary = self._get_summary()
+        if summary is not None:
+            return summary.get('sys_name')
 
-        return TestAttributes(self._tests[0]).sys_name
+        tests = self._get_tests()
+        if not tests:
+            return None
 
+        return TestAttributes(tests[0]).sys_name
@@ -0,0 +1,195 @@
+"""A small summary file kept in each series directory, so series can be
+listed and filtered without visiting every test run in them.
+
+The summary records who created the series, when, and on what system,
+along with the completion state and result of each of its test runs. Test
+runs update it (through ``TestAttributes.save_attributes``) whenever their
+state changes. Series without a summary (such as those created by older
+versions of Pavilion) have to be examined the slow way.
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Union
+
+from pavilion import dir_db
+from pavilion import lockfile
+from pavilion import utils
+
+LOGGER = logging.getLogger('pav.' + __name__)
+
+SUMMARY_FN = 'summary'
+SUMMARY_LOCK_FN = '.summary.lockfile'
+SUMMARY_VERSION = 1
+# How long to wait on the summary lock before giving up on an update.
+SUMMARY_LOCK_TIMEOUT = 3
+
+# The test run results that are counted in the summary.
+RESULT_COUNTS = {
+    'PASS': 'passed',
+    'FAIL': 'failed',
+    'ERROR': 'errors',
+}
+
+
+def series_path(working_dir: Path, sid: str) -> Path:
+    """Return the path to the series with the given sid (ie 's123').
+
+    :raises ValueError: For an invalid sid.
+    """
+
+    if not sid.startswith('s'):
+        raise ValueError("Invalid series id '{}'".format(sid))
+
+    return dir_db.make_id_path(working_dir/'series', int(sid[1:]))
+
+
+def run_record(complete: bool, result: Union[str, None]) -> dict:
+    """Return the summary record for a test run with the given state."""
+
+    return {'complete': bool(complete), 'result': result}
+
+
+def load(path: Path) -> Union[dict, None]:
+    """Load the summary for the series at the given path.
+
+    :returns: The summary, or None if the series doesn't have a (usable)
+        one.
+    """
+
+    sum_path = path/SUMMARY_FN
+
+    try:
+        with sum_path.open() as sum_file:
+            data = json.load(sum_file)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as err:
+        LOGGER.warning("Could not read series summary '%s': %s", sum_path, err)
+        return None
+
+    if (not isinstance(data, dict)
+            or data.get('version') != SUMMARY_VERSION
+            or not isinstance(data.get('tests'), dict)):
+        return None
+
+    return data
+
+
+def write(path: Path, sys_name: str, user: str, created: str,
+          tests: Dict[int, dict], group: str = None,
+          umask: int = None) -> bool:
+    """Write a new summary for the series at the given path.
+
+    :param path: The series path.
+    :param sys_name: The sys_name the series ran on.
+    :param user: The user who created the series.
+    :param created: When the series was created (serialized).
+    :param tests: The test record (from run_record()) of each test run in
+        the series, by test id.
+    :param group: The group to give the summary file.
+    :param umask: The umask to apply to the summary file.
+    :returns: False if the summary couldn't be written. The failure is logged.
+    """
+
+    data = {
+        'version': SUMMARY_VERSION,
+        'sys_name': sys_name,
+        'user': user,
+        'created': created,
+        'tests': {str(test_id): rec for test_id, rec in tests.items()},
+    }
+
+    try:
+        with lockfile.LockFile(path/SUMMARY_LOCK_FN,
+                               timeout=SUMMARY_LOCK_TIMEOUT):
+            _save(path, data, group, umask)
+    except (OSError, TimeoutError) as err:
+        LOGGER.warning("Could not write series summary for '%s': %s",
+                       path, err)
+        return False
+
+    return True
+
+
+def update_test(path: Path, test_id: int, complete: bool,
+                result: Union[str, None], group: str = None,
+                umask: int = None) -> bool:
+    """Update the record for the given test run in the summary of the series
+    at the given path. Nothing is written if the record hasn't changed, or
+    if the series has no summary (yet).
+
+    :returns: False if the summary couldn't be updated. The failure is logged.
+    """
+
+    return update_tests(path, {test_id: run_record(complete, result)},
+                        group, umask)
+
+
+def update_tests(path: Path, records: Dict[int, Union[dict, None]],
+                 group: str = None, umask: int = None) -> bool:
+    """Update the records for the given test runs in the summary of the
+    series at the given path, as per update_test. A record of None removes
+    that test run from the summary.
+
+    :param path: The series path.
+    :param records: The new test records (from run_record()) by test id.
+    :param group: The group to give the summary file. If neither this nor
+        umask are given, the summary keeps its current group and mode.
+    :param umask: The umask to apply to the summary file.
+    :returns: False if the summary couldn't be updated. The failure is logged.
+    """
+
+    if not records or not (path/SUMMARY_FN).exists():
+        return True
+
+    try:
+        with lockfile.LockFile(path/SUMMARY_LOCK_FN,
+                               timeout=SUMMARY_LOCK_TIMEOUT):
+            data = load(path)
+            if data is None:
+                return True
+
+            changed = False
+            for test_id, record in records.items():
+                key = str(test_id)
+                if record is None:
+                    if key in data['tests']:
+                        del data['tests'][key]
+                        changed = True
+                elif data['tests'].get(key) != record:
+                    data['tests'][key] = record
+                    changed = True
+
+            if changed:
+                _save(path, data, group, umask)
+    except (OSError, TimeoutError) as err:
+        LOGGER.warning("Could not update series summary for '%s': %s",
+                       path, err)
+        return False
+
+    return True
+
+
+def tally(data: dict):
+    """(Re)count the complete test runs and results in the summary data from
+    its test records."""
+
+    tests = data['tests'].values()
+    data['num_tests'] = len(tests)
+    data['complete'] = sum(1 for rec in tests if rec.get('complete'))
+    for result, key in RESULT_COUNTS.items():
+        data[key] = sum(1 for rec in tests if rec.get('result') == result)
+
+
+def _save(path: Path, data: dict, group: str, umask: int):
+    """Atomically save the summary data, along with the counts derived from
+    the test records. The summary lock should be held."""
+
+    tally(data)
+
+    # Without a group or umask, keep the permissions of the summary we're
+    # replacing.
+    utils.atomic_write_json(path/SUMMARY_FN, data, group, umask,
+                            keep_perms=group is None and umask is None)
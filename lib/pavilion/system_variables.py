@@ -39,6 +39,8 @@ for a given run of the pavilion command."""
 
         super().__init__({})
 
+        _load_plugins()
+
         if not unique:
             global _SYS_VAR_DICT
             if _SYS_VAR_DICT is not None:
@@ -69,6 +71,8 @@ for a given run of the pavilion command."""
 
         global _LOADED_PLUGINS
 
+        _load_plugins()
+
         if name not in _LOADED_PLUGINS:
             raise KeyError("No system plugin named '{}'.".format(name))
 
@@ -99,6 +103,8 @@ plugins.)"""
 
         global _LOADED_PLUGINS
 
+        _load_plugins()
+
         return _LOADED_PLUGINS[key].help_text
 
 
@@ -110,6 +116,14 @@ def __reset():
     _SYS_VAR_DICT = None
 
 
+def _load_plugins():
+    """Make sure all the system variable plugins are loaded. They're loaded
+    lazily when the plugin system is initialized that way."""
+
+    from pavilion import plugins
+    plugins.load_plugins('sys')
+
+
 def get_vars(defer):
     """Get the dictionary of system plugins.
 
@@ -309,6 +309,22 @@ expected to be added to by various plugins.
                     sub_elem=yc.ListElem(sub_elem=yc.StrElem()),
                     help_text="File(s) to create at path relative to the test's"
                               "test source directory"),
+                yc.StrElem(
+                    'deploy_mode',
+                    choices=['symlink', 'hardlink', 'reflink', 'link_dir'],
+                    default='symlink',
+                    help_text="How to give each test run its copy of the "
+                              "build.\n"
+                              "  symlink - (default) Symlink each build file.\n"
+                              "  hardlink - Hardlink each build file (falling "
+                              "back to symlinks across filesystems).\n"
+                              "  reflink - Make copy-on-write clones of each "
+                              "build file, where the filesystem supports it "
+                              "(falling back to symlinks).\n"
+                              "  link_dir - Symlink the whole build directory. "
+                              "Only for tests that never write to their build "
+                              "directory, and can't be used with "
+                              "'copy_files'."),
                 EnvCatElem(
                     'env', sub_elem=yc.StrElem(), key_case=EnvCatElem.KC_MIXED,
                     help_text="Environment variables to set in the build "
@@ -20,6 +20,7 @@ import re
 from typing import List
 
 import lark as _lark
+from pavilion import utils
 from .common import ParserValueError
 from .expressions import (get_expr_parser, EvaluationExprTransformer,
                           VarRefVisitor)
@@ -86,7 +87,45 @@ class StringParserError(ValueError):
         return "\n".join([self.message, self.context])
 
 
-_TREE_CACHE = {}
+TREE_CACHE_SIZE = 4096
+_TREE_CACHE = utils.LRUCache(TREE_CACHE_SIZE)
+
+# Strings that contain none of these are just literal strings; they parse to
+# themselves.
+_SPECIAL_SEQUENCES = ('{{', '}}', '[~', '~', '\\')
+
+
+def is_literal(text: str) -> bool:
+    """Return whether the given text has no Pavilion string syntax
+    (expressions, iterations or escapes), and will parse to itself."""
+
+    for seq in _SPECIAL_SEQUENCES:
+        if seq in text:
+            return False
+
+    return True
+
+
+def tree_cache_info() -> utils.CacheInfo:
+    """Return the hit, miss and size information for the string parse tree
+    cache."""
+
+    return _TREE_CACHE.cache_info()
+
+
+def parse_tree(text: str):
+    """Return the (cached) string parse tree for the given text. The tree
+    is shared, and must not be modified.
+
+    :raises lark.LarkError: On parse errors.
+    """
+
+    tree = _TREE_CACHE.get(text)
+    if tree is None:
+        tree = get_string_parser().parse(text)
+        _TREE_CACHE[text] = tree
+
+    return tree
 
 
 def parse_text(text, var_man) -> str:
@@ -100,18 +139,15 @@ def parse_text(text, var_man) -> str:
     :raises StringParserError: For syntax and other errors.
     """
 
-    parser = get_string_parser()
+    if is_literal(text):
+        return text
+
     transformer = StringTransformer(var_man)
 
     def parse_fn(txt):
         """Shorthand for parsing text."""
 
-        tree = _TREE_CACHE.get(txt)
-        if tree is None:
-            tree = parser.parse(txt)
-            _TREE_CACHE[txt] = tree
-
-        return transformer.transform(tree)
+        return transformer.transform(parse_tree(txt))
 
     try:
         # On the surface it may seem that parsing and transforming should be
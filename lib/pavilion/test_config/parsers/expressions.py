@@ -435,8 +435,7 @@ class BaseExprTransformer(PavTransformer):
         """
 
         # Ints are a series of digits, so this can't fail
-        tok.value = int(tok.value)
-        return tok
+        return lark.Token.new_borrow_pos(tok.type, int(tok.value), tok)
 
     def FLOAT(self, tok: lark.Token) -> lark.Token:
         """Convert to a float.
@@ -445,22 +444,19 @@ class BaseExprTransformer(PavTransformer):
         """
 
         # Similar to ints, this can't fail either.
-        tok.value = float(tok.value)
-        return tok
+        return lark.Token.new_borrow_pos(tok.type, float(tok.value), tok)
 
     def BOOL(self, tok: lark.Token) -> lark.Token:
         """Convert to a boolean."""
 
         # Assumes BOOL only matches 'True' or 'False'
-        tok.value = tok.value == 'True'
-
-        return tok
+        return lark.Token.new_borrow_pos(tok.type, tok.value == 'True', tok)
 
     def ESCAPED_STRING(self, tok: lark.Token) -> lark.Token:
         """Remove quotes from the given string."""
 
-        tok.value = ast.literal_eval('r' + tok.value)
-        return tok
+        return lark.Token.new_borrow_pos(
+            tok.type, ast.literal_eval('r' + tok.value), tok)
 
 
 class ExprTransformer(BaseExprTransformer):
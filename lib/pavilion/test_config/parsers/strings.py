@@ -155,9 +155,13 @@ class StringTransformer(PavTransformer):
             elif isinstance(item.value, dict):
                 token_list.append(item)
             else:
-                item.value = self._unescape(
-                    item.value, {'\\{{': '{{', '\\~': '~',
-                                 '\\\\{{': '\\{{', '\\\\~': '\\~'})
+                # Don't modify the original token, as parse trees are cached.
+                item = lark.Token.new_borrow_pos(
+                    item.type,
+                    self._unescape(
+                        item.value, {'\\{{': '{{', '\\~': '~',
+                                     '\\\\{{': '\\{{', '\\\\~': '\\~'}),
+                    item)
 
                 token_list.append(item)
 
@@ -251,7 +255,7 @@ class StringTransformer(PavTransformer):
                 )
 
         # Get a variable manager for each permutation.
-        var_men = self.var_man.get_permutations(filtered_vars)
+        var_men = self.var_man.iter_permutations(filtered_vars)
 
         # Resolve iteration string and expression for each permutation.
         iterations = []
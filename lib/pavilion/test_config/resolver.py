@@ -13,7 +13,7 @@ import logging
 import os
 import re
 from collections import defaultdict, namedtuple
-from typing import List, IO, Dict
+from typing import List, IO, Dict, Iterator
 
 import yc_yaml
 from pavilion import output
@@ -22,6 +22,7 @@ from pavilion import schedulers
 from pavilion import system_variables
 from pavilion.pavilion_variables import PavVars
 from pavilion.test_config import parsers
+from pavilion.test_config import suite_cache
 from pavilion.test_config import variables
 from pavilion.test_config.file_format import (TestConfigError, TEST_NAME_RE,
                                               KEY_NAME_RE)
@@ -50,6 +51,13 @@ class TestConfigResolver:
     def __init__(self, pav_cfg):
         self.pav_cfg = pav_cfg
 
+        # Scheduler and result parser plugins add their own sections to the
+        # test config format, so they must all be loaded before any configs
+        # are.
+        from pavilion import plugins
+        plugins.load_plugins('sched')
+        plugins.load_plugins('result')
+
         self.base_var_man = variables.VariableSetManager()
 
         try:
@@ -169,29 +177,11 @@ class TestConfigResolver:
                     else:
                         suites[suite_name]['supersedes'].append(file)
 
-                    # It's ok if the tests aren't completely validated. They
-                    # may have been written to require a real host/mode file.
-                    with file.open('r') as suite_file:
-                        try:
-                            suite_cfg = TestSuiteLoader().load(suite_file,
-                                                               partial=True)
-                        except (
-                                TypeError,
-                                KeyError,
-                                ValueError,
-                                yc_yaml.YAMLError,
-                        ) as err:
-                            suites[suite_name]['err'] = err
-                            continue
-
-                    base = TestConfigLoader().load_empty()
-
                     try:
-                        suite_cfgs = self.resolve_inheritance(
-                            base_config=base,
-                            suite_cfg=suite_cfg,
-                            suite_path=file
-                        )
+                        base = TestConfigLoader().load_empty()
+                        suite_cfgs = self._cached_suite(
+                            file, None, 'partial', base,
+                            lambda: self._load_partial_suite(file, base))
                     except Exception as err:  # pylint: disable=W0703
                         suites[suite_name]['err'] = err
                         continue
@@ -228,6 +218,20 @@ class TestConfigResolver:
         :param output_file: Where to write status output.
         """
 
+        return list(self.iter_load(tests, host, modes, overrides,
+                                   output_file))
+
+    def iter_load(self, tests: List[str], host: str = None,
+                  modes: List[str] = None, overrides: Dict[str, str] = None,
+                  output_file: IO[str] = None) -> Iterator[ProtoTest]:
+        """As per 'load', but generate each ProtoTest as soon as it's
+        resolved. Only the permutation currently being resolved is held in
+        memory, so consumers can create (and build) tests while later
+        permutations are still resolving.
+
+        :raises TestConfigError: While iterating, on any resolution errors.
+        """
+
         if modes is None:
             modes = []
 
@@ -241,8 +245,6 @@ class TestConfigResolver:
 
         progress = 0
 
-        resolved_tests = []
-
         # Apply config overrides.
         for test_cfg in raw_tests:
             # Apply the overrides to each of the config values.
@@ -258,19 +260,12 @@ class TestConfigResolver:
 
             base_var_man = self.build_variable_manager(test_cfg)
 
-            # A list of tuples of test configs and their permuted var_man
-            permuted_tests = []  # type: (dict, variables.VariableSetManager)
-
             # Resolve all configuration permutations.
             try:
-                p_cfg, permutes = self.resolve_permutations(
+                p_cfg, permutes = self.iter_permutations(
                     test_cfg,
                     base_var_man=base_var_man
                 )
-                for p_var_man in permutes:
-                    # Get the scheduler from the config.
-                    permuted_tests.append((p_cfg, p_var_man))
-
             except TestConfigError as err:
                 msg = 'Error resolving permutations for test {} from {}: {}' \
                     .format(test_cfg['name'], test_cfg['suite_path'], err)
@@ -280,11 +275,11 @@ class TestConfigResolver:
                 raise TestConfigError(msg)
 
             # Set the scheduler variables for each test.
-            for ptest_cfg, pvar_man in permuted_tests:
+            for pvar_man in permutes:
                 # Resolve all variables for the test (that aren't deferred).
                 try:
                     resolved_config = self.resolve_test_vars(
-                        ptest_cfg, pvar_man)
+                        p_cfg, pvar_man)
                 except TestConfigError as err:
                     msg = ('In test {} from {}:\n{}'
                            .format(test_cfg['name'], test_cfg['suite_path'],
@@ -295,7 +290,7 @@ class TestConfigResolver:
 
                     raise TestConfigError(msg)
 
-                resolved_tests.append(ProtoTest(resolved_config, pvar_man))
+                yield ProtoTest(resolved_config, pvar_man)
 
             if output_file is not None:
                 progress += 1.0/len(raw_tests)
@@ -305,8 +300,6 @@ class TestConfigResolver:
         if output_file:
             output.fprint('', file=output_file)
 
-        return resolved_tests
-
     def load_raw_configs(self, tests, host, modes):
         """Get a list of raw test configs given a host, list of modes,
         and a list of tests. Each of these configs will be lightly modified with
@@ -334,7 +327,6 @@ class TestConfigResolver:
         # suite.
         all_tests = defaultdict(dict)
         picked_tests = []
-        test_suite_loader = TestSuiteLoader()
 
         # Find and load all of the requested tests.
         for test_name in tests:
@@ -383,43 +375,9 @@ class TestConfigResolver:
                         "locations: {}"
                         .format(test_suite, cdirs))
 
-                try:
-                    with test_suite_path.open() as test_suite_file:
-                        # We're loading this in raw mode, because the defaults
-                        # will have already been provided.
-                        # Each test config will be individually validated later.
-                        test_suite_cfg = test_suite_loader.load_raw(
-                            test_suite_file)
-
-                except (IOError, OSError, ) as err:
-                    raise TestConfigError(
-                        "Could not open test suite config {}: {}"
-                        .format(test_suite_path, err))
-                except ValueError as err:
-                    raise TestConfigError(
-                        "Test suite '{}' has invalid value. {}"
-                        .format(test_suite_path, err))
-                except KeyError as err:
-                    raise TestConfigError(
-                        "Test suite '{}' has an invalid key. {}"
-                        .format(test_suite_path, err))
-                except yc_yaml.YAMLError as err:
-                    raise TestConfigError(
-                        "Test suite '{}' has a YAML Error: {}"
-                        .format(test_suite_path, err)
-                    )
-                except TypeError as err:
-                    # All config elements in test configs must be strings,
-                    # and just about everything converts cleanly to a string.
-                    raise RuntimeError(
-                        "Test suite '{}' raised a type error, but that "
-                        "should never happen. {}".format(test_suite_path, err))
-
-                suite_tests = self.resolve_inheritance(
-                    base_config,
-                    test_suite_cfg,
-                    test_suite_path
-                )
+                suite_tests = self._cached_suite(
+                    test_suite_path, host, 'raw', base_config,
+                    lambda: self._load_suite(base_config, test_suite_path))
 
                 # Add some basic information to each test config.
                 for test_cfg_name, test_cfg in suite_tests.items():
@@ -465,6 +423,127 @@ class TestConfigResolver:
 
         return picked_tests
 
+    def _load_suite(self, base_config, test_suite_path):
+        """Load the given test suite file in raw mode, and resolve the
+        inheritance of its tests.
+
+        :param dict base_config: The base config for every test (with the
+            host config applied).
+        :param Path test_suite_path: The suite file to load.
+        :rtype: dict(str,dict)
+        :raises TestConfigError: For any problems with the suite.
+        """
+
+        test_suite_loader = TestSuiteLoader()
+
+        try:
+            with test_suite_path.open() as test_suite_file:
+                # We're loading this in raw mode, because the defaults
+                # will have already been provided.
+                # Each test config will be individually validated later.
+                test_suite_cfg = test_suite_loader.load_raw(
+                    test_suite_file)
+
+        except (IOError, OSError, ) as err:
+            raise TestConfigError(
+                "Could not open test suite config {}: {}"
+                .format(test_suite_path, err))
+        except ValueError as err:
+            raise TestConfigError(
+                "Test suite '{}' has invalid value. {}"
+                .format(test_suite_path, err))
+        except KeyError as err:
+            raise TestConfigError(
+                "Test suite '{}' has an invalid key. {}"
+                .format(test_suite_path, err))
+        except yc_yaml.YAMLError as err:
+            raise TestConfigError(
+                "Test suite '{}' has a YAML Error: {}"
+                .format(test_suite_path, err)
+            )
+        except TypeError as err:
+            # All config elements in test configs must be strings,
+            # and just about everything converts cleanly to a string.
+            raise RuntimeError(
+                "Test suite '{}' raised a type error, but that "
+                "should never happen. {}".format(test_suite_path, err))
+
+        suite_tests = self.resolve_inheritance(
+            base_config,
+            test_suite_cfg,
+            test_suite_path
+        )
+
+        return suite_tests
+
+    def _load_partial_suite(self, suite_path, base):
+        """Load the given test suite file with partial validation, and
+        resolve the inheritance of its tests against an empty base config.
+
+        :param Path suite_path: The suite file to load.
+        :param dict base: The (empty) base config to resolve against.
+        :rtype: dict(str,dict)
+        """
+
+        # It's ok if the tests aren't completely validated. They
+        # may have been written to require a real host/mode file.
+        with suite_path.open('r') as suite_file:
+            suite_cfg = TestSuiteLoader().load(suite_file, partial=True)
+
+        return self.resolve_inheritance(
+            base_config=base,
+            suite_cfg=suite_cfg,
+            suite_path=suite_path
+        )
+
+    def _cached_suite(self, suite_path, host, load_type, base_config,
+                      resolve):
+        """Get the resolved tests for the given suite from the suite cache,
+        or by calling resolve (and then caching the results).
+
+        The cache entry is specific to the suite file, host, and load type,
+        and is only used if neither the suite file nor the host config file
+        (if any) have changed since the entry was saved. The base config
+        the suite is resolved against must also be the same. Its defaults
+        depend on the loaded plugins (such as the scheduler config sections),
+        which the file stamps can't account for.
+
+        :param Path suite_path: The suite file.
+        :param Union[str, None] host: The host whose config was applied.
+        :param str load_type: How the suite is being loaded. Entries with
+            different load types are cached separately.
+        :param dict base_config: The base config the suite is resolved
+            against.
+        :param resolve: A function that returns the resolved suite tests.
+        :rtype: dict(str,dict)
+        """
+
+        cache_dir = self.pav_cfg.working_dir/suite_cache.CACHE_DIR
+
+        host_path = None
+        if host is not None:
+            host_path = self._find_config(CONF_HOST, host)
+
+        name = [str(suite_path), host, load_type]
+        try:
+            key = [suite_cache.file_stamp(suite_path),
+                   suite_cache.file_stamp(host_path),
+                   suite_cache.code_stamp(),
+                   suite_cache.config_hash(base_config)]
+        except OSError:
+            # Let the actual load report the problem.
+            return resolve()
+
+        suite_tests = suite_cache.load(cache_dir, name, key)
+        if suite_tests is None:
+            suite_tests = resolve()
+            if not suite_cache.is_racy(key):
+                suite_cache.save(cache_dir, name, key, suite_tests,
+                                 self.pav_cfg['shared_group'],
+                                 self.pav_cfg['umask'])
+
+        return suite_tests
+
     def verify_version_range(self, comp_versions):
         """Validate a version range value."""
 
@@ -757,6 +836,19 @@ class TestConfigResolver:
             permutations.
         """
 
+        test_cfg, var_men = self.iter_permutations(test_cfg, base_var_man)
+        return test_cfg, list(var_men)
+
+    def iter_permutations(self, test_cfg, base_var_man):
+        """As per resolve_permutations, except that the permuted variable
+        managers are generated (and have their references resolved) lazily.
+        Problems with the permutation variables are still raised immediately.
+
+        :rtype: (dict, Iterator[variables.VariableSetManager])
+        :raises TestConfigError: When there are problems with variables or the
+            permutations.
+        """
+
         permute_on = test_cfg['permute_on']
 
         used_per_vars = set()
@@ -793,11 +885,18 @@ class TestConfigResolver:
 
             test_cfg['subtitle'] = subtitle
 
-        # var_men is a list of variable managers, one for each permutation
-        var_men = base_var_man.get_permutations(list(used_per_vars))
+        # var_men generates a variable manager for each permutation
+        var_men = base_var_man.iter_permutations(list(used_per_vars))
+        return test_cfg, self._resolve_references(var_men)
+
+    @staticmethod
+    def _resolve_references(var_men):
+        """Resolve the variable references in each of the given variable
+        managers as they're generated."""
+
         for var_man in var_men:
             var_man.resolve_references()
-        return test_cfg, var_men
+            yield var_man
 
     NOT_OVERRIDABLE = ['name', 'suite', 'suite_path', 'scheduler',
                        'base_name', 'host', 'modes']
@@ -0,0 +1,147 @@
+"""An on-disk cache of loaded, inheritance resolved, and validated test suites.
+
+Loading a test suite means parsing and validating its YAML, and then
+resolving the inheritance between its tests. That's slow enough to matter
+when there are hundreds of suites. The results are cached as JSON under
+``<working_dir>/suite_cache``, one file per suite file and load context
+(such as the host config applied to it). Each cache entry records a 'key'
+that describes everything it was built from (the stat info of the suite file
+and of any host file, and a hash of the base config the suite was resolved
+against), and is only used if that key still matches.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Union
+
+from pavilion import utils
+
+LOGGER = logging.getLogger(__name__)
+
+CACHE_DIR = 'suite_cache'
+CACHE_VERSION = 1
+
+# The source files whose code determines what a resolved suite looks like.
+# A change to any of them invalidates the cache.
+_CODE_FILES = (
+    'resolver.py',
+    'file_format.py',
+)
+
+
+def file_stamp(path: Union[Path, None]) -> Union[list, None]:
+    """Return the identifying stat info for the given file, or None if there
+    is no path. The resolved path is included, so the stamp also changes if
+    a different file is found.
+
+    :raises OSError: When the file can't be stat'ed.
+    """
+
+    if path is None:
+        return None
+
+    path = os.path.realpath(str(path))
+    stat = os.stat(path)
+    return [path, stat.st_size, stat.st_mtime_ns, stat.st_ino]
+
+
+def is_racy(key: list) -> bool:
+    """Return whether any of the file stamps in the given key are too recent
+    to trust (see utils.racy_cutoff)."""
+
+    racy_after = utils.racy_cutoff()
+
+    for stamp in key:
+        if not isinstance(stamp, list) or not stamp:
+            continue
+        if isinstance(stamp[0], list):
+            if is_racy(stamp):
+                return True
+        elif stamp[2] >= racy_after:
+            return True
+
+    return False
+
+
+def code_stamp() -> list:
+    """Return the stamps of the code files that suites are resolved with."""
+
+    mod_dir = Path(__file__).parent
+    return [file_stamp(mod_dir/name) for name in _CODE_FILES]
+
+
+def config_hash(config: dict) -> str:
+    """Return a hash of the given config, for use in a cache key."""
+
+    data = json.dumps(config, sort_keys=True, default=str)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def load(cache_dir: Path, name: list, key: list) -> Union[dict, None]:
+    """Load the cached suite with the given name, as long as it was cached
+    with the given key.
+
+    :param cache_dir: The cache directory.
+    :param name: A JSON-able list that names the cache entry.
+    :param key: A JSON-able list describing what the entry depends on.
+    :returns: The cached suite tests, or None if there's no usable entry.
+    """
+
+    path = _cache_path(cache_dir, name)
+
+    try:
+        with path.open() as cache_file:
+            data = json.load(cache_file)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as err:
+        LOGGER.warning("Could not read suite cache file '%s': %s", path, err)
+        return None
+
+    if (not isinstance(data, dict)
+            or data.get('version') != CACHE_VERSION
+            or data.get('name') != name
+            or data.get('key') != key
+            or not isinstance(data.get('tests'), dict)):
+        return None
+
+    return data['tests']
+
+
+def save(cache_dir: Path, name: list, key: list, tests: dict,
+         group: str = None, umask: int = None):
+    """Atomically save the given suite tests to the cache. Failures are only
+    logged; this is just a cache.
+
+    :param cache_dir: The cache directory.
+    :param name: A JSON-able list that names the cache entry.
+    :param key: A JSON-able list describing what the entry depends on.
+    :param tests: The resolved suite tests.
+    :param group: The group to give cache files.
+    :param umask: The umask to apply to cache files.
+    """
+
+    path = _cache_path(cache_dir, name)
+
+    data = {
+        'version': CACHE_VERSION,
+        'name': name,
+        'key': key,
+        'tests': tests,
+    }
+
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        utils.atomic_write_json(path, data, group, umask)
+    except (OSError, TypeError, ValueError) as err:
+        LOGGER.warning("Could not save suite cache file '%s': %s", path, err)
+
+
+def _cache_path(cache_dir: Path, name: list) -> Path:
+    """Each cache entry's file is named after the hash of its name."""
+
+    digest = hashlib.sha256(json.dumps(name).encode()).hexdigest()[:32]
+    return cache_dir/(digest + '.json')
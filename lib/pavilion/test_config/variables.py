@@ -21,6 +21,7 @@ provided (sched).
 """
 
 import copy
+import itertools
 import json
 from typing import Union
 
@@ -162,39 +163,64 @@ permutation.
 :rtype: VariableSetManager
 """
 
-        # Get every a dictionary of var:idx for every combination of used
-        # permutation variables.
-        permutations = [{}]
-        for var_set, var in used_per_vars:
-            new_perms = []
+        return list(self.iter_permutations(used_per_vars))
 
-            for old_perm in permutations:
-                for i in range(self.len(var_set, var)):
-                    new_perm = old_perm.copy()
-                    new_perm[(var_set, var)] = i
-                    new_perms.append(new_perm)
+    def iter_permutations(self, used_per_vars):
+        """As per get_permutations, but lazily generate the permuted variable
+managers. Each permuted manager shares its variable values with this one
+(copy-on-write), and only owns the single value selected for each
+permutation variable.
 
-            permutations = new_perms
+:param list[(str, str)] used_per_vars: A set of permutation variable names that
+    were used, as a tuple of (var_set, var_name).
+:raises KeyError: When a permutation variable can't be found.
+:raises DeferredError: When a permutation variable is deferred.
+:rtype: Iterator[VariableSetManager]
+"""
+
+        used_per_vars = list(used_per_vars)
+
+        # Look up the lengths now, so bad variables are reported
+        # immediately rather than on iteration.
+        ranges = [range(self.len(var_set, var))
+                  for var_set, var in used_per_vars]
+
+        count = 1
+        for rng in ranges:
+            count *= len(rng)
 
-        permuted_var_mans = []
+        if count == 1:
+            return iter([self])
 
-        if len(permutations) == 1:
-            return [self]
+        return self._gen_permutations(used_per_vars, ranges)
 
-        # Create a new var set manager for each permutation.
-        for perm in permutations:
-            var_man = copy.deepcopy(self)
+    def _gen_permutations(self, used_per_vars, ranges):
+        """Yield a copy-on-write variable manager for every combination of
+        indexes into the permutation variables."""
 
-            for (var_set, var), idx in perm.items():
-                new_list = [self.variable_sets[var_set][var][idx]]
+        for indexes in itertools.product(*ranges):
+            var_man = self._cow_copy()
+
+            for (var_set, var), idx in zip(used_per_vars, indexes):
+                value = self.variable_sets[var_set][var][idx]
                 vlist = VariableList()
-                vlist.data = copy.deepcopy(new_list)
+                vlist.data = [copy.deepcopy(value)]
+                var_man.variable_sets[var_set].override(var, vlist)
+
+            yield var_man
 
-                var_man.variable_sets[var_set].data[var] = vlist
+    def _cow_copy(self):
+        """Return a copy of this variable set manager whose variable sets share
+        their values with ours until they're modified."""
 
-            permuted_var_mans.append(var_man)
+        var_man = VariableSetManager()
 
-        return permuted_var_mans
+        var_man.variable_sets = {
+            name: var_set.cow_copy()
+            for name, var_set in self.variable_sets.items()}
+        var_man.deferred = self.deferred.copy()
+
+        return var_man
 
     @classmethod
     def parse_key(cls, key):
@@ -325,7 +351,6 @@ index, sub_var) tuple.
         # We only want to resolve variable references in the variable section
         var_vars = self.variable_sets['var']
         unresolved_vars = {}
-        parser = parsers.strings.get_string_parser()
         var_visitor = parsers.strings.StringVarRefVisitor()
         transformer = parsers.StringTransformer(self)
 
@@ -336,7 +361,11 @@ index, sub_var) tuple.
             for idx in range(len(var_list.data)):
                 sub_var = var_list.data[idx]
                 for key, val in sub_var.data.items():
-                    tree = parser.parse(val)
+                    if parsers.is_literal(val):
+                        # Plain strings can't reference anything.
+                        continue
+
+                    tree = parsers.parse_tree(val)
                     variables = var_visitor.visit(tree)
 
                     if variables:
@@ -719,6 +748,9 @@ method.
 
         self.data = {}
         self.name = name
+        # The variables whose values may be shared with other var sets, and
+        # must be copied before they're modified.
+        self._shared = set()
 
         if value_dict is not None:
             self._init_from_config(value_dict)
@@ -749,7 +781,34 @@ name."""
     def set_value(self, var, index, sub_var, value):
         """Set the value at the given location to value."""
 
-        self[var].set_value(index, sub_var, value)
+        var_list = self[var]
+        if var in self._shared:
+            var_list = self.data[var] = copy.deepcopy(var_list)
+            self._shared.discard(var)
+
+        var_list.set_value(index, sub_var, value)
+
+    def override(self, var, var_list):
+        """Replace the values of the given variable with the given
+        VariableList, which this var set will then own."""
+
+        self.data[var] = var_list
+        self._shared.discard(var)
+
+    def cow_copy(self):
+        """Return a copy of this var set that shares the variable values
+        with this one. Either var set copies a value before modifying it.
+
+        :rtype: VariableSet
+        """
+
+        var_set = VariableSet(name=self.name)
+        var_set.data = self.data.copy()
+
+        self._shared.update(self.data.keys())
+        var_set._shared = set(self.data.keys())
+
+        return var_set
 
     def __contains__(self, item):
         return item in self.data
@@ -13,7 +13,7 @@ import threading
 import time
 import uuid
 from pathlib import Path
-from typing import Callable, Any
+from typing import Callable, Any, List, Union
 
 import pavilion.result.common
 from pavilion import builder
@@ -22,9 +22,10 @@ from pavilion import lockfile
 from pavilion import output
 from pavilion import result
 from pavilion import scriptcomposer
+from pavilion import series_summary
 from pavilion import utils
 from pavilion.permissions import PermissionsManager
-from pavilion.status_file import StatusFile, STATES
+from pavilion.status_file import StatusFile, STATES, TestStatusError
 from pavilion.test_config import variables, resolver
 from pavilion.test_config.file_format import TestConfigError
 
@@ -53,6 +54,20 @@ def get_latest_tests(pav_cfg, limit):
     return [test_id for _, test_id in test_dir_list[-limit:]]
 
 
+def _current_state(path: Path) -> Union[str, None]:
+    """Return the current state of the test run at path, or None if it
+    doesn't have a (readable) status file yet."""
+
+    status_path = path/'status'
+    if not status_path.is_file():
+        return None
+
+    try:
+        return StatusFile(status_path).current().state
+    except TestStatusError:
+        return None
+
+
 class TestRunError(RuntimeError):
     """For general test errors. Whatever was being attempted has failed in a
     non-recoverable way."""
@@ -111,21 +126,30 @@ class TestAttributes:
         'suite_path': Path,
     }
 
-    def __init__(self, path: Path, group: str = None, umask: int = None):
+    def __init__(self, path: Path, group: str = None, umask: int = None,
+                 attrs: dict = None):
         """
         :param path:
+        :param attrs: Serialized attributes (as saved to the attributes file
+            or the test run index) to use instead of loading them from file.
         """
 
         self.path = path
         self.group = group
         self.umask = umask
 
-        self._attrs = {}
-        self.load_attributes()
-
         # Set a logger more specific to this test.
         self.logger = logging.getLogger('pav.TestRun.{}'.format(path.name))
 
+        self._attrs = {}
+        # The (complete, result) state last loaded or saved to the series
+        # summary.
+        self._summary_state = None
+        if attrs is None:
+            self.load_attributes()
+        else:
+            self._set_attrs(attrs)
+
     ATTR_FILE_NAME = 'attributes'
 
     def save_attributes(self):
@@ -154,6 +178,33 @@ class TestAttributes:
                 json.dump(attrs, attr_file)
             tmp_path.rename(attr_path)
 
+        # Keep the test run index in sync, so test run selection doesn't
+        # have to load every attributes file. Should this fail, the index
+        # is marked as out of date, and rebuilt when next used.
+        if self.id is not None:
+            record = dict(attrs)
+            record[self.INDEX_STATE_KEY] = _current_state(self.path)
+            dir_db.index_update(self.path.parent, self.id, record)
+
+        # Likewise for the summary of the series this test belongs to. Only
+        # changes to the test's state need to go there, which saves taking
+        # the summary lock on every save.
+        summary_state = (bool(self.complete), self.result)
+        if (self.series is not None and self.id is not None
+                and summary_state != self._summary_state):
+            try:
+                series_path = series_summary.series_path(
+                    self.path.parents[1], self.series)
+            except ValueError:
+                self.logger.warning(
+                    "Test run '%s' has an invalid series id '%s'.",
+                    self.id, self.series)
+            else:
+                if series_summary.update_test(
+                        series_path, self.id, self.complete, self.result,
+                        self.group, self.umask):
+                    self._summary_state = summary_state
+
     def load_attributes(self):
         """Load the attributes from file."""
 
@@ -170,16 +221,57 @@ class TestAttributes:
                     "Could not load attributes file: \n{}"
                     .format(err.args))
 
+        self._set_attrs(attrs)
+
+    def _set_attrs(self, attrs: dict):
+        """Deserialize and set the given attributes."""
+
         for key, val in attrs.items():
             deserializer = self.deserializers.get(key, lambda v: v)
             try:
                 self._attrs[key] = deserializer(val)
-            except ValueError:
+            except ValueError as err:
                 self.logger.warning(
                     "Error deserializing attribute '%s' value '%s' for test "
                     "run '%s': %s",
                     key, val, self.id, err.args[0])
 
+        self._summary_state = (bool(self.complete), self.result)
+
+    @classmethod
+    def from_index(cls, path: Path, record: dict) -> 'TestAttributes':
+        """Create a test attributes object from a test run index record, for
+        use as the 'from_index' argument to dir_db.select."""
+
+        return cls(path, attrs=record)
+
+    # The index record key for the test run's state (from its status file)
+    # as of when its attributes were last saved.
+    INDEX_STATE_KEY = 'state'
+
+    @classmethod
+    def index_record(cls, path: Path) -> dict:
+        """Return the test run index record for the test run at path (its
+        serialized attributes and current state), for rebuilding the test
+        run index. Test runs that haven't saved their attributes yet get a
+        record with just their state.
+
+        :raises ValueError: When the attributes can't be read.
+        """
+
+        try:
+            with (path/cls.ATTR_FILE_NAME).open() as attr_file:
+                record = json.load(attr_file)
+        except FileNotFoundError:
+            record = {}
+        except (OSError, json.JSONDecodeError) as err:
+            raise ValueError(
+                "Could not read attributes for test run at '{}': {}"
+                .format(path, err))
+
+        record[cls.INDEX_STATE_KEY] = _current_state(path)
+        return record
+
     @staticmethod
     def list_attrs():
         """List the available attributes. This always operates on the
@@ -241,6 +333,9 @@ class TestAttributes:
     build_name = basic_attr(
         name='build_name',
         doc="The name of the test run's build.")
+    build_origin = basic_attr(
+        name='build_origin',
+        doc="The name of the build this test run's build was deployed from.")
     complete = basic_attr(
         name='complete',
         doc='Whether the test run considers itself done (regardless of '
@@ -264,6 +359,9 @@ class TestAttributes:
         name='result',
         doc="The PASS/FAIL/ERROR result for this test. This is kept here for"
             "fast retrieval.")
+    series = basic_attr(
+        name='series',
+        doc="The sid of the series this test run belongs to, if any.")
     skipped = basic_attr(
         name='skipped',
         doc="Did this test's skip conditions evaluate as 'skipped'?")
@@ -328,7 +426,7 @@ class TestRun(TestAttributes):
 
     def __init__(self, pav_cfg, config,
                  build_tracker=None, var_man=None, _id=None,
-                 rebuild=False, build_only=False):
+                 rebuild=False, build_only=False, reserved_dir=None):
         """Create an new TestRun object. If loading an existing test
     instance, use the ``TestRun.from_id()`` method.
 
@@ -343,6 +441,9 @@ class TestRun(TestAttributes):
     a new, non-deprecated build.
 :param int _id: The test id of an existing test. (You should be using
     TestRun.load).
+:param Tuple[int,Path] reserved_dir: An (id, path) tuple of an empty test
+    run directory reserved via ``dir_db.create_id_dirs()``, to use instead of
+    creating a new one.
 """
 
         # Just about every method needs this
@@ -358,7 +459,11 @@ class TestRun(TestAttributes):
 
         # Get an id for the test, if we weren't given one.
         if _id is None:
-            id_tmp, run_path = dir_db.create_id_dir(tests_path, group, umask)
+            if reserved_dir is None:
+                id_tmp, run_path = dir_db.create_id_dir(
+                    tests_path, group, umask, index=True)
+            else:
+                id_tmp, run_path = reserved_dir
             super().__init__(
                 path=run_path,
                 group=group, umask=umask)
@@ -693,6 +798,10 @@ class TestRun(TestAttributes):
             with PermissionsManager(self.build_origin_path, self.group,
                                     self.umask):
                 self.build_origin_path.symlink_to(self.builder.path)
+            # Record the build in our attributes too, so the builds in use
+            # can be found from the test run index.
+            self.build_origin = self.builder.name
+            self.save_attributes()
 
             with PermissionsManager(self.build_path, self.group, self.umask):
                 if not self.builder.copy_build(self.build_path):
@@ -938,11 +1047,14 @@ of result keys.
 
         return results
 
-    def save_results(self, results):
+    def save_results(self, results, log=True):
         """Save the results to the test specific results file and the general
         pavilion results file.
 
         :param dict results: The results dictionary.
+        :param bool log: Whether to add the results to the general pavilion
+            result log. Callers saving many tests can instead log the
+            records from result_log_records() for all of them at once.
         """
 
         results_tmp_path = self.results_path.with_suffix('.tmp')
@@ -958,20 +1070,33 @@ of result keys.
         self.result = results.get('result')
         self.save_attributes()
 
-        result_logger = logging.getLogger('common_results')
+        if log:
+            result_logger = logging.getLogger('common_results')
+            for record in self.result_log_records(results):
+                result_logger.info(record)
+
+    def result_log_records(self, results) -> List[str]:
+        """Return the records (json strings) to add to the general pavilion
+        result log for the given results.
+
+        :param dict results: The results dictionary.
+        """
+
         if self._pav_cfg.get('flatten_results') and results.get('per_file'):
             # Flatten 'per_file' results into separate result records.
             base = results.copy()
             del base['per_file']
 
+            records = []
             for per_file, values in results['per_file'].items():
                 per_result = base.copy()
                 per_result['file'] = per_file
                 per_result.update(values)
 
-                result_logger.info(output.json_dumps(per_result))
+                records.append(output.json_dumps(per_result))
+            return records
         else:
-            result_logger.info(output.json_dumps(results))
+            return [output.json_dumps(results)]
 
     def load_results(self):
         """Load results from the results file.
@@ -1010,6 +1135,13 @@ of result keys.
         else:
             return self._results
 
+    @results.setter
+    def results(self, results):
+        """Attach the given results to this test object (without saving
+        them)."""
+
+        self._results = results
+
     @property
     def is_built(self):
         """Whether the build for this test exists.
@@ -1223,3 +1355,67 @@ be set by the scheduler plugin as soon as it's known."""
             "Invalid value for {} timeout. Must be a positive int."
             .format(section)
         )
+
+
+class TestRunState(TestAttributes):
+    """A lightweight handle on an existing test run, for checking and
+    changing its status and scheduler job. Unlike ``TestRun.load()``, this
+    only reads the test's attributes and config; it doesn't load the test's
+    variables or create a builder.
+
+    :ivar str scheduler: The name of the test's scheduler.
+    :ivar StatusFile status: The status object for this test.
+    """
+
+    JOB_ID_FN = TestRun.JOB_ID_FN
+    COMPLETE_FN = TestRun.COMPLETE_FN
+
+    def __init__(self, pav_cfg, test_id: int, attrs: dict = None):
+        """
+        :param pav_cfg: The pavilion configuration.
+        :param test_id: The id of the test run.
+        :param attrs: As per TestAttributes.
+        :raises TestRunNotFoundError: When the test run doesn't exist.
+        :raises TestRunError: When its config can't be read.
+        """
+
+        path = dir_db.make_id_path(pav_cfg.working_dir/'test_runs', test_id)
+
+        # Creating a StatusFile object would create a missing status file.
+        if not (path/'status').is_file():
+            raise TestRunNotFoundError(
+                "No test with id '{}' could be found.".format(test_id))
+
+        # The config is only rewritten before the test runs, so we skip
+        # the config lock.
+        try:
+            with (path/'config').open() as config_file:
+                config = json.load(config_file)
+            group, umask = TestRun.get_permissions(pav_cfg, config)
+        except (OSError, ValueError, TestConfigError) as err:
+            raise TestRunError(
+                "Could not read config for test run at '{}': {}"
+                .format(path, err))
+
+        super().__init__(path, group=group, umask=umask, attrs=attrs)
+        if self.id is None:
+            self.id = test_id
+
+        self.scheduler = config.get('scheduler')
+        self.status = StatusFile(path/'status')
+        self._job_id = None
+
+    job_id = TestRun.job_id
+
+    def set_run_complete(self):
+        """As per TestRun.set_run_complete, except that the attributes are
+        re-read from file first. Ours may have come from the test run index,
+        and saving a stale copy would clobber the real attributes."""
+
+        test_id = self.id
+        self._attrs = {}
+        self.load_attributes()
+        if self.id is None:
+            self.id = test_id
+
+        TestRun.set_run_complete(self)
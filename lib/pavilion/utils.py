@@ -4,16 +4,25 @@ generally be used to help make Pavilion consistent across its code and
 plugins.
 """
 
+import collections
+import contextlib
 import datetime as dt
 import errno
+import fcntl
+import json
 import os
 import re
+import shutil
 import subprocess
 import textwrap
+import threading
+import time
 import zipfile
 from pathlib import Path
 from typing import Iterator, Union, TextIO
 
+from pavilion.permissions import PermissionsManager
+
 
 # Python 3.5 issue. Python 3.6 Path.resolve() handles this correctly.
 # pylint: disable=protected-access
@@ -105,6 +114,111 @@ def flat_walk(path, *args, **kwargs) -> Iterator[Path]:
             yield directory / filename
 
 
+# The FICLONE ioctl request number (from linux/fs.h).
+FICLONE = 0x40049409
+
+# Errors that mean reflinks aren't supported (by this OS, filesystem, or
+# across these filesystems).
+REFLINK_UNSUPPORTED = (errno.EOPNOTSUPP, errno.ENOTTY, errno.EXDEV,
+                       errno.EINVAL, errno.ENOSYS)
+
+
+def reflink(src, dst) -> None:
+    """Create dst as a copy-on-write clone (reflink) of the file at src, with
+    the same permissions. Only some filesystems (btrfs, xfs, etc.) support
+    this.
+
+    :raises OSError: On failure. When reflinks aren't supported, the errno
+        will be one of REFLINK_UNSUPPORTED.
+    """
+
+    with open(str(src), 'rb') as src_file:
+        dst_fd = os.open(str(dst), os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        try:
+            fcntl.ioctl(dst_fd, FICLONE, src_file.fileno())
+        except OSError:
+            os.close(dst_fd)
+            os.unlink(str(dst))
+            raise
+        os.close(dst_fd)
+
+    shutil.copymode(str(src), str(dst))
+
+
+# Files modified this recently (in seconds) can't be trusted to be unchanged
+# just because their stat info is, as they could change again without their
+# mtime changing.
+RACY_TIME = 2
+
+
+def racy_cutoff() -> float:
+    """Return the mtime (in ns) at or after which a file was modified too
+    recently for its stat info to be trusted (see RACY_TIME). Things keyed
+    on a file's stat info, like the on disk caches, shouldn't be saved for
+    such files."""
+
+    return (time.time() - RACY_TIME) * 1e9
+
+
+@contextlib.contextmanager
+def atomic_write(path: Path, mode: str = 'w', group: str = None,
+                 umask: int = None, keep_perms: bool = False):
+    """Open a temporary file beside path for writing, and rename it over
+    path once the context exits, so readers never see a partial file. On
+    error, the temporary file is removed and the error re-raised.
+
+    :param path: The file to write.
+    :param mode: The mode to open the temporary file with ('w' or 'wb').
+    :param group: The group to give the file.
+    :param umask: The umask to apply to the file's permissions.
+    :param keep_perms: Give the file the mode and group of the file it
+        replaces (if any).
+    :raises OSError: When the file can't be written.
+    """
+
+    tmp_path = path.with_name('.{}.{}.{}'.format(
+        path.name, os.getpid(), threading.get_ident()))
+
+    try:
+        with PermissionsManager(tmp_path, group, umask), \
+                tmp_path.open(mode) as tmp_file:
+            yield tmp_file
+
+        if keep_perms:
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                pass
+            else:
+                os.chmod(str(tmp_path), stat.st_mode & 0o7777)
+                try:
+                    os.chown(str(tmp_path), -1, stat.st_gid)
+                except OSError:
+                    pass
+
+        tmp_path.rename(path)
+    except BaseException:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        raise
+
+
+def atomic_write_json(path: Path, data, group: str = None,
+                      umask: int = None, keep_perms: bool = False) -> None:
+    """Atomically write the given data to path as JSON, as per atomic_write.
+
+    :raises OSError: When the file can't be written.
+    :raises TypeError: When the data isn't JSON serializable.
+    :raises ValueError: When the data isn't JSON serializable.
+    """
+
+    with atomic_write(path, group=group, umask=umask,
+                      keep_perms=keep_perms) as file:
+        json.dump(data, file)
+
+
 def get_mime_type(path):
     """Use the filemagic command to get the mime type of a file. Returned as a
     tuple of category and subtype.
@@ -382,3 +496,68 @@ class IndentedLog:
 
         self._file.write(textwrap.indent(msg, "  " * self._indent))
         self._file.write('\n')
+
+
+CacheInfo = collections.namedtuple(
+    'CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+class LRUCache:
+    """A thread safe, size limited mapping that discards the least recently
+    used items first. Like functools.lru_cache, but for when the cached
+    values aren't simply the result of calling a function (or the call can
+    raise errors that shouldn't be cached)."""
+
+    def __init__(self, max_size: int):
+
+        self.max_size = max_size
+
+        self._items = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key, default=None):
+        """Return the item for the given key, or default if there isn't
+        one."""
+
+        with self._lock:
+            try:
+                value = self._items[key]
+            except KeyError:
+                self._misses += 1
+                return default
+
+            self._items.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def __setitem__(self, key, value):
+
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def clear(self):
+        """Remove all items and reset the hit/miss counts."""
+
+        with self._lock:
+            self._items.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def cache_info(self) -> CacheInfo:
+        """Return the hits, misses, maximum size and current size of the
+        cache."""
+
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self.max_size,
+                             len(self._items))
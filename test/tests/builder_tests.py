@@ -8,6 +8,7 @@ import threading
 import time
 import unittest
 
+from pavilion import builder
 from pavilion import plugins
 from pavilion import wget
 from pavilion.status_file import STATES
@@ -228,6 +229,70 @@ class BuilderTests(PavTestCase):
             self.assertTrue(sym.is_symlink(),
                             msg="{} is not a symlink".format(sym))
 
+    def test_deploy_modes(self):
+        """Check the alternate build deploy modes."""
+
+        config = self._quick_test_cfg()
+        config['build']['source_path'] = 'file_tests.tgz'
+        config['build']['deploy_mode'] = 'hardlink'
+
+        test = self._quick_test(config)
+        real = test.path/'build'/'real.txt'
+        self.assertTrue(real.is_file())
+        self.assertFalse(real.is_symlink())
+        self.assertEqual(real.stat().st_ino,
+                         (test.builder.path/'real.txt').stat().st_ino)
+        # Symlinks in the build are still symlinks.
+        self.assertTrue((test.path/'build'/'pav_build_log').exists())
+
+        config['build']['deploy_mode'] = 'reflink'
+        test = self._quick_test(config)
+        # This falls back to symlinks when reflinks aren't supported.
+        self.assertTrue((test.path/'build'/'real.txt').exists())
+        self.assertEqual((test.path/'build'/'real.txt').read_bytes(),
+                         (test.builder.path/'real.txt').read_bytes())
+
+        config['build']['deploy_mode'] = 'link_dir'
+        test = self._quick_test(config)
+        self.assertTrue((test.path/'build').is_symlink())
+        self.assertTrue((test.path/'build'/'real.txt').exists())
+
+        config['build']['copy_files'] = ['real.*']
+        test = self._quick_test(config, build=False, finalize=False)
+        self.assertTrue(test.build())
+        self.assertFalse(test.builder.copy_build(test.path/'build2'))
+
+    def test_shared_build_hash(self):
+        """Check that tests with identical builds share a single build hash
+        computation."""
+
+        config = self._quick_test_cfg()
+        config['build']['source_path'] = 'file_tests.tgz'
+
+        tracker = builder.MultiBuildTracker()
+        computed = []
+
+        def compute():
+            computed.append(True)
+            time.sleep(0.1)
+            return 'hash'
+
+        threads = [threading.Thread(target=tracker.cached,
+                                    args=('key', compute))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(computed), 1)
+        self.assertEqual(tracker.cached('key', compute), 'hash')
+
+        tests = [TestRun(self.pav_cfg, config, build_tracker=tracker)
+                 for _ in range(3)]
+        self.assertEqual(len(set(test.build_name for test in tests)), 1)
+        hash_keys = [key for key in tracker._cache if key[0] == 'build_hash']
+        self.assertEqual(len(hash_keys), 1)
+
     @unittest.skipIf(wget.missing_libs(),
                      "The wget module is missing required libs.")
     def test_src_urls(self):
@@ -7,6 +7,8 @@ from pavilion import commands
 from pavilion import plugins
 from pavilion import series
 from pavilion.plugins.commands.status import get_statuses
+from pavilion.status_file import STATES
+from pavilion.test_run import TestRun, TestRunState
 from pavilion.unittest import PavTestCase
 
 
@@ -115,3 +117,44 @@ class CancelCmdTests(PavTestCase):
 
         self.assertEqual(cancel_cmd.run(self.pav_cfg, args), 0)
 
+    def test_cancel_batch(self):
+        """Check that tests are all cancelled together through their
+        lightweight handles."""
+
+        arg_parser = arguments.get_parser()
+
+        args = arg_parser.parse_args([
+            'run',
+            '-H', 'this',
+            'cancel_test.test1',
+            'cancel_test.test2'
+        ])
+
+        run_cmd = commands.get_command(args.command_name)
+        run_cmd.outfile = run_cmd.errfile = StringIO()
+        run_cmd.run(self.pav_cfg, args)
+        tests = run_cmd.last_tests
+
+        handle = TestRunState(self.pav_cfg, tests[0].id)
+        self.assertEqual(handle.scheduler, tests[0].scheduler)
+        self.assertEqual(handle.name, tests[0].name)
+
+        args = arg_parser.parse_args(['cancel', '--all'])
+        cancel_cmd = commands.get_command(args.command_name)
+        cancel_cmd.outfile = cancel_cmd.errfile = StringIO()
+        self.assertEqual(cancel_cmd.run(self.pav_cfg, args), 0)
+
+        for test in tests:
+            test = TestRun.load(self.pav_cfg, test.id)
+            states = [status.state for status in test.status.history()]
+            self.assertIn(STATES.SCHED_CANCELLED, states)
+            self.assertTrue((test.path/TestRun.COMPLETE_FN).exists())
+            self.assertTrue(test.complete)
+
+        # Completing a handle made from a stale record shouldn't write that
+        # record over the attributes file.
+        stale = TestRunState(self.pav_cfg, tests[1].id,
+                             attrs={'id': tests[1].id, 'name': 'stale'})
+        stale.set_run_complete()
+        self.assertEqual(TestRun.load(self.pav_cfg, tests[1].id).name,
+                         tests[1].name)
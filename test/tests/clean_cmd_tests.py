@@ -4,7 +4,9 @@ import time
 from io import StringIO
 
 from pavilion import arguments
+from pavilion import builder
 from pavilion import commands
+from pavilion import dir_db
 from pavilion import plugins
 from pavilion.unittest import PavTestCase
 
@@ -98,3 +100,44 @@ class CancelCmdTests(PavTestCase):
         run_cmd.silence()
         run_cmd.run(self.pav_cfg, args)
 
+    def test_clean_builds(self):
+        """Check that builds in use are found from the test run index, and
+        that unused builds are removed by way of the trash."""
+
+        arg_parser = arguments.get_parser()
+
+        args = arg_parser.parse_args([
+            'run',
+            '-H', 'this',
+            'clean_test'
+        ])
+        run_cmd = commands.get_command(args.command_name)
+        run_cmd.silence()
+        run_cmd.run(self.pav_cfg, args)
+        self.wait_tests(self.pav_cfg.working_dir)
+
+        tests_dir = self.pav_cfg.working_dir/'test_runs'
+        builds_dir = self.pav_cfg.working_dir/'builds'
+        refcounts = builder.build_refcounts(tests_dir)
+        self.assertEqual(sum(refcounts.values()), len(run_cmd.last_tests))
+        for test in run_cmd.last_tests:
+            self.assertIn(test.build_origin, refcounts)
+            self.assertEqual(test.build_origin,
+                             test.build_origin_path.resolve().name)
+
+        unused = builds_dir/'0123456789abcdef'
+        (unused/'subdir').mkdir(parents=True)
+        (unused/'subdir'/'file').touch()
+
+        trash_dir = self.pav_cfg.working_dir/dir_db.TRASH_DIR
+        (trash_dir/'leftover').mkdir(parents=True)
+
+        args = arg_parser.parse_args(['clean', '--older-than', '5 weeks'])
+        clean_cmd = commands.get_command(args.command_name)
+        clean_cmd.silence()
+        self.assertEqual(clean_cmd.run(self.pav_cfg, args), 0)
+
+        self.assertFalse(unused.exists())
+        for build_name in refcounts:
+            self.assertTrue((builds_dir/build_name).exists())
+        self.assertEqual(list(trash_dir.iterdir()), [])
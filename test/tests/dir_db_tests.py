@@ -0,0 +1,75 @@
+import shutil
+from pathlib import Path
+
+from pavilion import dir_db
+from pavilion.unittest import PavTestCase
+
+
+class DirDBTests(PavTestCase):
+
+    def test_create_id_dirs(self):
+        """Check id allocation, both individually and in batches."""
+
+        id_dir = Path(self.tmp_dir.name)/'ids'
+        id_dir.mkdir()
+
+        reserved = dir_db.create_id_dirs(id_dir, None, 0o002, count=5)
+        self.assertEqual([id_ for id_, _ in reserved], [1, 2, 3, 4, 5])
+        for id_, path in reserved:
+            self.assertEqual(path, dir_db.make_id_path(id_dir, id_))
+            self.assertTrue(path.is_dir())
+
+        self.assertEqual(dir_db.create_id_dir(id_dir, None, 0o002)[0], 6)
+
+        # After a reset, the gaps should be filled first.
+        for id_ in 2, 3, 5:
+            shutil.rmtree(str(dir_db.make_id_path(id_dir, id_)))
+        dir_db.reset_pkey(id_dir)
+
+        reserved = dir_db.create_id_dirs(id_dir, None, 0o002, count=4)
+        self.assertEqual([id_ for id_, _ in reserved], [2, 3, 5, 7])
+        # The pkey file should point at the next free id, rather than
+        # needing a rescan.
+        self.assertEqual((id_dir/dir_db.PKEY_FN).open().read(), '8')
+
+        # Directories created outside the lock are skipped.
+        dir_db.make_id_path(id_dir, 8).mkdir()
+        self.assertEqual(dir_db.create_id_dir(id_dir, None, 0o002)[0], 9)
+
+    def test_index(self):
+        """Check that the index is trusted only while it's current."""
+
+        id_dir = Path(self.tmp_dir.name)/'indexed'
+        id_dir.mkdir()
+        dir_db.index_init(id_dir)
+
+        def record(path):
+            """Make a record from the directory contents."""
+            return {'files': sorted(p.name for p in path.iterdir())}
+
+        def select():
+            """Select the records via the index."""
+            return dir_db.select(id_dir, from_index=lambda p, rec: rec,
+                                 index_record=record)[0]
+
+        # New directories get (empty) records right away.
+        reserved = dir_db.create_id_dirs(id_dir, None, 0o002, count=3,
+                                         index=True)
+        self.assertEqual(select(), [{}, {}, {}])
+
+        for id_, path in reserved:
+            (path/'data').touch()
+            dir_db.index_update(id_dir, id_, record(path))
+        self.assertEqual(select(), [{'files': ['data']}] * 3)
+
+        # A missed update marks the index dirty, which gets it rebuilt.
+        (reserved[0][1]/'more').touch()
+        dir_db._index_mark_dirty(id_dir)
+        self.assertEqual(select()[0], {'files': ['data', 'more']})
+        self.assertEqual(list((id_dir/dir_db.INDEX_DIRTY_DIR).iterdir()), [])
+
+        # Deleted directories leave the index.
+        dir_db.delete(id_dir, lambda rec: rec.get('files') == ['data'],
+                      from_index=lambda p, rec: rec, index_record=record)
+        self.assertEqual(select(), [{'files': ['data', 'more']}])
+        self.assertEqual(dir_db.index_verify(id_dir, record), [])
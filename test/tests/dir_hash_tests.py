@@ -0,0 +1,61 @@
+import os
+import time
+from pathlib import Path
+
+from pavilion import dir_hash
+from pavilion.unittest import PavTestCase
+
+
+class DirHashTests(PavTestCase):
+
+    def setUp(self):
+        dir_hash.clear_cache()
+
+    def test_hash_dir(self):
+        """Check that directory hashes follow content, and that unchanged
+        files aren't rehashed."""
+
+        tree = Path(self.tmp_dir.name)/'tree'
+        manifest_dir = Path(self.tmp_dir.name)/'manifests'
+        (tree/'sub').mkdir(parents=True)
+        (tree/'sub'/'file1').write_text('hello')
+        (tree/'file2').write_text('world')
+
+        # Files modified very recently aren't cached.
+        past = time.time() - 60
+        for path in tree/'sub'/'file1', tree/'file2':
+            os.utime(str(path), (past, past))
+
+        orig_hash = dir_hash.hash_dir(tree, manifest_dir)
+        self.assertEqual(len(list(manifest_dir.iterdir())), 1)
+
+        # Touching a file shouldn't change the hash.
+        os.utime(str(tree/'file2'), (past + 1, past + 1))
+        self.assertEqual(dir_hash.hash_dir(tree, manifest_dir), orig_hash)
+
+        # Only changed files should be rehashed, even when loading the
+        # manifest from disk.
+        dir_hash.clear_cache()
+        hashed = []
+        orig_hash_file = dir_hash._hash_file
+
+        def hash_file(path):
+            hashed.append(path)
+            return orig_hash_file(path)
+
+        dir_hash._hash_file = hash_file
+        try:
+            self.assertEqual(dir_hash.hash_dir(tree, manifest_dir),
+                             orig_hash)
+            self.assertEqual(hashed, [])
+
+            (tree/'sub'/'file1').write_text('goodbye')
+            new_hash = dir_hash.hash_dir(tree, manifest_dir)
+            self.assertNotEqual(new_hash, orig_hash)
+            self.assertEqual(hashed, [str(tree/'sub'/'file1')])
+        finally:
+            dir_hash._hash_file = orig_hash_file
+
+        # Renaming a file changes the hash too.
+        (tree/'file2').rename(tree/'file3')
+        self.assertNotEqual(dir_hash.hash_dir(tree, manifest_dir), new_hash)
@@ -8,6 +8,7 @@ from pavilion.unittest import PavTestCase
 from pavilion.test_run import TestAttributes, TestRun
 from pathlib import Path
 from pavilion import dir_db
+from pavilion import lockfile
 
 
 class FiltersTest(PavTestCase):
@@ -274,3 +275,67 @@ class FiltersTest(PavTestCase):
             paths=paths,
             transform=TestAttributes, order_func=sort, order_asc=ascending)[0]
         self.assertEqual([t.id for t in sorted_tests], list(reversed(ids)))
+
+    def test_select_from_index(self):
+        """Check that selecting tests via the test run index matches
+        selecting them from the test run directories."""
+
+        start = dt.datetime.now()
+        tests = [self._quick_test() for _ in range(10)]
+        for test in tests[:5]:
+            test.result = TestRun.PASS
+            test.save_attributes()
+
+        runs_dir = self.pav_cfg.working_dir/'test_runs'
+        sort, ascending = filters.get_sort_opts('id', filters.TEST_SORT_FUNCS)
+        filter_func = filters.make_test_run_filter(
+            passed=True, newer_than=start)
+
+        def select_indexed():
+            """Select the tests via the index."""
+            return dir_db.select(
+                id_dir=runs_dir, transform=TestAttributes,
+                from_index=TestAttributes.from_index,
+                index_record=TestAttributes.index_record,
+                filter_func=filter_func, order_func=sort,
+                order_asc=ascending)[0]
+
+        scanned = dir_db.select(
+            id_dir=runs_dir, transform=TestAttributes,
+            filter_func=filter_func, order_func=sort, order_asc=ascending)[0]
+        # The index wasn't complete (it's only been appended to), so this
+        # rebuilds it.
+        indexed = select_indexed()
+
+        self.assertEqual([t.id for t in scanned], [t.id for t in indexed])
+        self.assertEqual([t.id for t in indexed],
+                         sorted(test.id for test in tests[:5]))
+        self.assertEqual(indexed[0].created, tests[0].created)
+        self.assertEqual(
+            dir_db.index_load(runs_dir)[tests[0].id]['state'],
+            tests[0].status.current().state)
+
+        # From here on, the index is trusted without looking at the test
+        # run directories.
+        dir_db.index_remove(runs_dir, [tests[0].id])
+        self.assertNotIn(tests[0].id, [t.id for t in select_indexed()])
+        dir_db.index_update(runs_dir, tests[0].id,
+                            TestAttributes.index_record(tests[0].path))
+
+        # Updates that the index misses (say, because the index update timed
+        # out) get it rebuilt.
+        orig_timeout = dir_db.INDEX_LOCK_TIMEOUT
+        dir_db.INDEX_LOCK_TIMEOUT = 0
+        try:
+            with lockfile.LockFile(runs_dir/dir_db.INDEX_LOCK_FN):
+                tests[1].result = TestRun.FAIL
+                tests[1].save_attributes()
+        finally:
+            dir_db.INDEX_LOCK_TIMEOUT = orig_timeout
+
+        indexed = select_indexed()
+        self.assertEqual([t.id for t in indexed],
+                         [test.id for test in tests[:5] if test is not tests[1]])
+        self.assertEqual(dir_db.index_verify(
+            runs_dir, TestAttributes.index_record,
+            ignore=[TestAttributes.INDEX_STATE_KEY]), [])
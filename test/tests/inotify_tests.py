@@ -0,0 +1,41 @@
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from pavilion import inotify
+from pavilion.unittest import PavTestCase
+
+
+class InotifyTests(PavTestCase):
+
+    @unittest.skipIf(not inotify.available(), "Requires inotify.")
+    def test_watcher(self):
+        """Check that we see files created and moved into watched dirs."""
+
+        watch_dir = Path(self.tmp_dir.name)/'watched'
+        watch_dir.mkdir()
+
+        def make_files():
+            time.sleep(0.2)
+            tmp_path = watch_dir/'RUN_COMPLETE.tmp'
+            tmp_path.open('w').close()
+            tmp_path.rename(watch_dir/'RUN_COMPLETE')
+
+        with inotify.Watcher() as watcher:
+            watcher.add(watch_dir)
+
+            # Nothing should have happened yet.
+            self.assertEqual(watcher.wait(0), {})
+
+            thread = threading.Thread(target=make_files)
+            thread.start()
+
+            names = []
+            end = time.time() + 5
+            while 'RUN_COMPLETE' not in names and time.time() < end:
+                names.extend(watcher.wait(1).get(watch_dir, []))
+            thread.join()
+
+        self.assertIn('RUN_COMPLETE.tmp', names)
+        self.assertIn('RUN_COMPLETE', names)
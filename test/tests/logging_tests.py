@@ -2,11 +2,15 @@
 
 import io
 import logging
+import os
+import signal
+import time
 import uuid
 import json
 from pathlib import Path
 import threading
 
+from pavilion import log_setup
 from pavilion.log_setup import LockFileRotatingFileHandler, setup_loggers
 from pavilion.unittest import PavTestCase
 
@@ -130,3 +134,122 @@ class LoggingTests(PavTestCase):
 
         self.assertIn(ident, handler.ERR_OUT.getvalue())
         self.assertNotIn(ident, logfile_path.open().read())
+
+    def test_lockfile_handler_buffered(self):
+        """Check that the LockFileRotatingFileHandler writes buffered records
+        in batches, under a single lock acquisition each."""
+
+        logfile_path = self.pav_cfg.working_dir/'lockfile_handler_buf_test'
+
+        for path in logfile_path.parent.glob(logfile_path.name + '*'):
+            path.unlink()
+
+        handler = LockFileRotatingFileHandler(
+            file_name=logfile_path,
+            max_bytes=1024,
+            backup_count=2,
+            lock_timeout=1,
+            buffer_size=10,
+            flush_interval=0.5,
+        )
+        handler.ERR_OUT = io.StringIO()
+
+        locks = []
+        orig_lock = handler.lock_file.lock
+
+        def count_lock():
+            locks.append(threading.get_ident())
+            orig_lock()
+
+        handler.lock_file.lock = count_lock
+
+        idents = []
+        for i in range(9):
+            rec, ident = self._make_record(str(i))
+            handler.handle(rec)
+            idents.append(ident)
+
+        # Nothing is written until the buffer is full.
+        self.assertEqual(logfile_path.open().read(), '')
+        self.assertEqual(locks, [])
+
+        rec, ident = self._make_record('9')
+        handler.handle(rec)
+        idents.append(ident)
+        log_data = logfile_path.open().read()
+        for ident in idents:
+            self.assertIn(ident, log_data)
+        self.assertEqual(len(locks), 1)
+
+        # Errors are written right away.
+        rec, ident = self._make_record('error')
+        rec.levelno = logging.ERROR
+        handler.handle(rec)
+        self.assertIn(ident, logfile_path.open().read())
+
+        # Buffered records are written by the flush thread after a while.
+        rec, ident = self._make_record('late')
+        handler.handle(rec)
+        for _ in range(50):
+            if ident in logfile_path.open().read():
+                break
+            threading.Event().wait(0.1)
+        self.assertIn(ident, logfile_path.open().read())
+
+        # Big batches still roll over properly.
+        locks.clear()
+        for i in range(100):
+            rec, ident = self._make_record(str(i)*100)
+            handler.handle(rec)
+        handler.close()
+        self.assertLessEqual(len(locks), 12)
+        self.assertIn(ident, logfile_path.open().read())
+        backup2 = logfile_path.with_suffix(logfile_path.suffix + '.2')
+        backup3 = logfile_path.with_suffix(logfile_path.suffix + '.3')
+        self.assertTrue(backup2.exists())
+        self.assertFalse(backup3.exists())
+
+        self.assertEqual(handler.ERR_OUT.getvalue(), '')
+
+    def test_lockfile_handler_sigterm(self):
+        """Check that buffered records are written out when the process is
+        killed by a SIGTERM, and that forked children don't write out the
+        records their parent buffered."""
+
+        logfile_path = self.pav_cfg.working_dir/'lockfile_handler_term_test'
+
+        for path in logfile_path.parent.glob(logfile_path.name + '*'):
+            path.unlink()
+
+        handler = LockFileRotatingFileHandler(
+            file_name=logfile_path,
+            lock_timeout=1,
+            buffer_size=100,
+            flush_interval=30,
+        )
+
+        parent_rec, parent_ident = self._make_record('parent')
+        child_rec, child_ident = self._make_record('child')
+        handler.handle(parent_rec)
+
+        pid = os.fork()
+        if pid == 0:
+            try:
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                log_setup.flush_on_sigterm()
+                handler.handle(child_rec)
+                os.kill(os.getpid(), signal.SIGTERM)
+                time.sleep(5)
+            finally:
+                os._exit(1)
+
+        _, status = os.waitpid(pid, 0)
+        self.assertTrue(os.WIFSIGNALED(status))
+        self.assertEqual(os.WTERMSIG(status), signal.SIGTERM)
+
+        log_data = logfile_path.open().read()
+        self.assertIn(child_ident, log_data)
+        self.assertNotIn(parent_ident, log_data)
+
+        handler.close()
+        self.assertIn(parent_ident, logfile_path.open().read())
@@ -5,6 +5,7 @@ from pathlib import Path
 
 from pavilion import arguments
 from pavilion import commands
+from pavilion import dir_db
 from pavilion import plugins
 from pavilion.unittest import PavTestCase
 
@@ -64,3 +65,25 @@ class MaintCmdTest(PavTestCase):
         self.assertEqual(err, '')
 
         self._cmp_files(tmp_path, self.pav_cfg.result_log)
+
+    def test_index(self):
+        """Check rebuilding and verifying the test run index."""
+
+        tests = [self._quick_test() for _ in range(5)]
+        runs_dir = self.pav_cfg.working_dir/'test_runs'
+
+        maint_cmd = commands.get_command('maint')
+        maint_cmd.silence()
+        parser = arguments.get_parser()
+
+        verify_args = parser.parse_args(['maint', 'index', '--verify'])
+        self.assertEqual(maint_cmd.run(self.pav_cfg, verify_args), 0)
+
+        # Knock the index out of sync with the test runs.
+        dir_db.index_remove(runs_dir, [tests[0].id])
+        self.assertNotEqual(maint_cmd.run(self.pav_cfg, verify_args), 0)
+
+        args = parser.parse_args(['maint', 'index'])
+        self.assertEqual(maint_cmd.run(self.pav_cfg, args), 0)
+        self.assertEqual(maint_cmd.run(self.pav_cfg, verify_args), 0)
+        self.assertIn(tests[0].id, dir_db.index_load(runs_dir))
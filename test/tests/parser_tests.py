@@ -4,6 +4,7 @@ import lark
 import pavilion.test_config.parsers.expressions
 from pavilion import plugins
 from pavilion import unittest
+from pavilion import utils
 from pavilion.test_config import parsers
 from pavilion.test_config import variables
 from pavilion import system_variables
@@ -283,6 +284,39 @@ class ParserTests(unittest.PavTestCase):
                              msg="For string {}, expected '{}' but got '{}'"
                                  .format(string, expected, result))
 
+    def test_parse_text_cache(self):
+        """Literal strings should skip the parser, and other strings should
+        give the same results from the tree cache."""
+
+        for literal in '', 'hello world', 'also{', '[0-9]', '${hello}\n':
+            self.assertTrue(parsers.is_literal(literal))
+            self.assertEqual(parsers.parse_text(literal, self.var_man),
+                             literal)
+
+        for not_literal in 'a{{b}}', 'c}}', '[~d', 'e~', 'f\\{{':
+            self.assertFalse(parsers.is_literal(not_literal))
+
+        string = r'\{{ [~{{more_ints}}-{{floats}}~_] {{ints.0 + 1}}'
+        expected = '{{ 0-0.1_0-2.3_1-0.1_1-2.3 1'
+
+        parsers._TREE_CACHE.clear()
+        for _ in range(3):
+            self.assertEqual(parsers.parse_text(string, self.var_man),
+                             expected)
+
+        info = parsers.tree_cache_info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (2, 1, 1))
+
+        cache = utils.LRUCache(2)
+        cache['a'] = 1
+        cache['b'] = 2
+        self.assertEqual(cache.get('a'), 1)
+        cache['c'] = 3
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+        self.assertEqual(cache.cache_info(), utils.CacheInfo(3, 1, 2, 2))
+
     def test_bad_strings(self):
         """Make sure we get errors for the things we expect."""
 
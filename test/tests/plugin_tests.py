@@ -3,14 +3,20 @@ from pavilion import commands
 from pavilion import config
 from pavilion import module_wrapper
 from pavilion import plugins
+from pavilion import schedulers
 from pavilion.result import parsers
 from pavilion import system_variables
 from pavilion import expression_functions
 from pavilion.test_config import variables
 from pavilion.unittest import PavTestCase
+from pathlib import Path
 import io
 import logging
+import os
+import shutil
 import subprocess
+import tempfile
+import time
 
 LOGGER = logging.getLogger(__name__)
 
@@ -254,3 +260,48 @@ class PluginTests(PavTestCase):
             self.assertIn(error_str, logs)
 
         plugins._reset_plugins()
+
+    def test_lazy_plugins(self):
+        """Check that plugins are loaded on demand when a valid plugin
+        manifest exists."""
+
+        tmp_dir = Path(tempfile.mkdtemp())
+        cfg_dir = tmp_dir/'config'
+        # This keeps the file and directory mtimes.
+        shutil.copytree((self.TEST_DATA_ROOT/'pav_config_dir2').as_posix(),
+                        cfg_dir.as_posix())
+
+        pav_cfg = self.pav_cfg.copy()
+        pav_cfg.config_dirs = [cfg_dir]
+
+        # Without a manifest, everything is loaded and a manifest is saved.
+        plugins.initialize_plugins(pav_cfg, lazy=True)
+        self.assertIn('blarg', commands._COMMANDS)
+        self.assertIn('run', commands._COMMANDS)
+        manifest_dir = pav_cfg.working_dir/plugins.MANIFEST_DIR
+        self.assertTrue(list(manifest_dir.iterdir()))
+        plugins._reset_plugins()
+        arguments.get_parser()
+
+        # Now plugins are only loaded as they're asked for.
+        plugins.initialize_plugins(pav_cfg, lazy=True)
+        self.assertEqual(commands._COMMANDS, {})
+        self.assertIsNotNone(commands.get_command('blarg'))
+        self.assertNotIn('run', commands._COMMANDS)
+        self.assertEqual(parsers._RESULT_PARSERS, {})
+        self.assertIsNotNone(parsers.get_plugin('regex'))
+        self.assertIn('raw', schedulers.list_plugins())
+        sys_vars = system_variables.get_vars(defer=True)
+        self.assertIn('sys_arch', sys_vars.keys())
+        plugins._reset_plugins()
+        arguments.get_parser()
+
+        # Changing a plugin file invalidates the manifest.
+        blarg_path = cfg_dir/'plugins'/'command'/'blarg.py'
+        past = time.time() - 100
+        os.utime(blarg_path.as_posix(), (past, past))
+        plugins.initialize_plugins(pav_cfg, lazy=True)
+        self.assertIn('run', commands._COMMANDS)
+        plugins._reset_plugins()
+
+        shutil.rmtree(tmp_dir.as_posix())
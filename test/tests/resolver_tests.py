@@ -3,14 +3,17 @@
 import copy
 import io
 import json
+import os
 import random
+import time
+from pathlib import Path
 
 from pavilion import arguments
 from pavilion import commands
 from pavilion import plugins
 from pavilion import system_variables
 from pavilion.pavilion_variables import PavVars
-from pavilion.test_config import TestConfigError, resolver
+from pavilion.test_config import TestConfigError, resolver, suite_cache
 from pavilion.test_config import variables
 from pavilion.unittest import PavTestCase
 
@@ -641,6 +644,74 @@ class ResolverTests(PavTestCase):
                     self.assertEqual(test_cfg['host'], host)
                     self.assertEqual(test_cfg['modes'], modes)
 
+    def test_suite_cache(self):
+        """Check that resolved suites are cached, and that the cache is
+        invalidated when the suite or host files change."""
+
+        cfg_dir = Path(self.tmp_dir.name)/'cache_cfg'
+        (cfg_dir/'tests').mkdir(parents=True)
+        (cfg_dir/'hosts').mkdir()
+        suite_path = cfg_dir/'tests'/'cache_suite.yaml'
+        host_path = cfg_dir/'hosts'/'cache_host.yaml'
+
+        def write(path, text, age):
+            """Write the file, and backdate it so it's not too new to
+            cache."""
+            with path.open('w') as file:
+                file.write(text)
+            then = time.time() - age
+            os.utime(str(path), (then, then))
+
+        write(suite_path, 'cached:\n  run:\n    cmds: "echo hi"\n', 100)
+        write(host_path, 'summary: "host a"\n', 100)
+
+        pav_cfg = copy.deepcopy(self.pav_cfg)
+        pav_cfg.config_dirs = [cfg_dir] + list(pav_cfg.config_dirs)
+        rslvr = resolver.TestConfigResolver(pav_cfg)
+
+        def summary():
+            """Get the summary of the loaded test."""
+            cfgs = rslvr.load_raw_configs(['cache_suite'], 'cache_host', [])
+            return cfgs[0]['summary']
+
+        self.assertEqual(summary(), 'host a')
+
+        cache_dir = pav_cfg.working_dir/suite_cache.CACHE_DIR
+        cache_path = suite_cache._cache_path(
+            cache_dir, [str(suite_path), 'cache_host', 'raw'])
+        self.assertTrue(cache_path.exists())
+
+        # Make sure the cached copy is what gets used.
+        with cache_path.open() as cache_file:
+            data = json.load(cache_file)
+        data['tests']['cached']['summary'] = 'from cache'
+        with cache_path.open('w') as cache_file:
+            json.dump(data, cache_file)
+        self.assertEqual(summary(), 'from cache')
+
+        # Resolving against a different base config (such as with other
+        # plugins loaded) doesn't use the entry, and replaces it.
+        self.assertEqual(
+            rslvr._cached_suite(suite_path, 'cache_host', 'raw',
+                                {'summary': 'other base'},
+                                lambda: {'other': {}}),
+            {'other': {}})
+        self.assertEqual(summary(), 'host a')
+
+        # Changing the host file invalidates the entry.
+        write(host_path, 'summary: "host b"\n', 50)
+        self.assertEqual(summary(), 'host b')
+
+        # As does changing the suite.
+        write(suite_path, 'cached:\n  summary: "suite"\n', 40)
+        self.assertEqual(summary(), 'suite')
+
+        # Files too new to trust aren't cached.
+        cache_path.unlink()
+        write(suite_path, 'cached:\n  summary: "new"\n', 0)
+        self.assertEqual(summary(), 'new')
+        self.assertFalse(cache_path.exists())
+
     def test_version_compatibility(self):
         """Make sure version compatibility checks are working and populate the
         results.json file correctly."""
@@ -0,0 +1,165 @@
+import io
+import json
+import logging
+import shutil
+import tempfile
+from pathlib import Path
+
+from pavilion import arguments
+from pavilion import commands
+from pavilion import plugins
+from pavilion import result_log
+from pavilion.log_setup import ResultLogHandler
+from pavilion.unittest import PavTestCase
+
+
+class ResultLogTests(PavTestCase):
+
+    def setUp(self):
+        plugins.initialize_plugins(self.pav_cfg)
+        self.tmp_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        plugins._reset_plugins()
+        shutil.rmtree(self.tmp_dir.as_posix())
+
+    @staticmethod
+    def _record(id_):
+        return {
+            'id': id_,
+            'uuid': 'uuid-{}'.format(id_),
+            'name': 'suite.test{}'.format(id_ % 3),
+            'sys_name': 'sys{}'.format(id_ % 2),
+            'created': '2020-01-01 00:00:{:02d}.000000'.format(id_),
+            'result': 'PASS' if id_ % 2 else 'FAIL',
+        }
+
+    def test_result_log_index(self):
+        """Check indexing, querying, pruning and compacting the result log."""
+
+        log_path = self.tmp_dir/'results.log'
+        handler = ResultLogHandler(log_path, max_bytes=2000, backup_count=3)
+        handler.setFormatter(logging.Formatter("{message}", style='{'))
+        logger = logging.getLogger('result_log_test')
+        logger.propagate = False
+        logger.addHandler(handler)
+
+        try:
+            for id_ in range(0, 20, 2):
+                # Records can also be logged together.
+                logger.info('\n'.join(json.dumps(self._record(i))
+                                      for i in (id_, id_ + 1)))
+        finally:
+            logger.removeHandler(handler)
+
+        # Records written without the index are still found.
+        with log_path.open('a') as log_file:
+            log_file.write(json.dumps(self._record(20)) + '\n')
+            log_file.write('not a record\n')
+
+        # The log rotated, but everything is still there.
+        self.assertGreater(len(result_log.segments(log_path)), 1)
+        ids = [rec['id'] for rec in result_log.query(log_path)]
+        self.assertEqual(ids, list(range(21)))
+
+        def ids_for(**kwargs):
+            return [rec['id'] for rec in result_log.query(log_path, **kwargs)]
+
+        self.assertEqual(ids_for(equal={'id': [3, 15]}), [3, 15])
+        self.assertEqual(ids_for(equal={'uuid': ['uuid-7']}), [7])
+        self.assertEqual(ids_for(equal={'sys_name': ['sys1'],
+                                        'result': ['PASS']}),
+                         list(range(1, 21, 2)))
+        self.assertEqual(
+            ids_for(ranges={'created': ('2020-01-01 00:00:05',
+                                        '2020-01-01 00:00:08.000000')}),
+            [5, 6, 7, 8])
+        self.assertEqual(ids_for(ranges={'id': (None, 2)}), [0, 1, 2])
+        self.assertEqual(ids_for(match=result_log.name_matcher('*test1')),
+                         list(range(1, 21, 3)))
+        self.assertEqual(ids_for(limit=3), [18, 19, 20])
+
+        # Pruned records disappear from queries right away, even if they
+        # aren't removed from the log files yet.
+        pruned = result_log.prune(log_path, ['3', 'uuid-4', '20'],
+                                  compact_ratio=result_log.COMPACT_RATIO)
+        self.assertEqual(sorted(rec['id'] for rec in pruned), [3, 4, 20])
+        self.assertEqual(ids_for(), [i for i in range(20) if i not in (3, 4)])
+
+        # Compacting removes them from the log files.
+        result_log.compact(log_path)
+        log_data = ''.join(seg.open().read()
+                           for seg in result_log.segments(log_path))
+        self.assertNotIn('uuid-3"', log_data)
+        self.assertNotIn('uuid-20"', log_data)
+        self.assertIn('not a record', log_data)
+        self.assertEqual(ids_for(), [i for i in range(20) if i not in (3, 4)])
+        self.assertEqual(ids_for(equal={'id': [5]}), [5])
+
+    def test_results_from_log(self):
+        """Check getting results from the result log via the results
+        command."""
+
+        tests = [self._quick_test() for _ in range(3)]
+        for test in tests:
+            test.save_results(test.gather_results(test.run()))
+
+        result_cmd = commands.get_command('results')
+        result_cmd.silence()
+        parser = arguments.get_parser()
+
+        args = parser.parse_args(
+            ['results', '--from-log', '--json', str(tests[0].id),
+             tests[2].uuid])
+        self.assertEqual(result_cmd.run(self.pav_cfg, args), 0)
+        out, err = result_cmd.clear_output()
+
+        records = [json.loads(line) for line in io.StringIO(out)]
+        self.assertEqual(sorted(rec['uuid'] for rec in records),
+                         sorted([tests[0].uuid, tests[2].uuid]))
+
+        args = parser.parse_args(['results', '--from-log', '--name',
+                                  tests[0].name])
+        self.assertEqual(result_cmd.run(self.pav_cfg, args), 0)
+        out, err = result_cmd.clear_output()
+        self.assertIn(tests[1].name, out)
+
+    def test_result_log_stale_entries(self):
+        """Check that index entries for deleted log segments are dropped on
+        rollover, and that entries that don't fit the segment they name are
+        ignored."""
+
+        log_path = self.tmp_dir/'results.log'
+        handler = ResultLogHandler(log_path, max_bytes=1000, backup_count=1)
+        handler.setFormatter(logging.Formatter("{message}", style='{'))
+        logger = logging.getLogger('result_log_stale_test')
+        logger.propagate = False
+        logger.addHandler(handler)
+
+        try:
+            for id_ in range(30):
+                logger.info(json.dumps(self._record(id_)))
+        finally:
+            logger.removeHandler(handler)
+
+        inodes = set(seg.stat().st_ino
+                     for seg in result_log.segments(log_path))
+        with result_log.index_path(log_path).open() as index_file:
+            entries = [json.loads(line) for line in index_file]
+        self.assertTrue(all(entry['ino'] in inodes for entry in entries))
+
+        ids = [rec['id'] for rec in result_log.query(log_path)]
+
+        # Entries for another segment with the same inode (as when a deleted
+        # segment's inode is reused), and entries past the end of their
+        # segment.
+        live = [entry for entry in entries
+                if entry['ino'] == log_path.stat().st_ino][0]
+        with result_log.index_path(log_path).open('a') as index_file:
+            index_file.write(json.dumps(
+                dict(live, seg=live['seg'] + 1, off=0)) + '\n')
+            index_file.write(json.dumps(
+                dict(live, off=log_path.stat().st_size)) + '\n')
+
+        self.assertEqual([rec['id'] for rec in result_log.query(log_path)],
+                         ids)
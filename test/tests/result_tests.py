@@ -14,7 +14,7 @@ from pavilion import plugins
 from pavilion import result
 from pavilion import utils
 from pavilion.plugins.commands import run
-from pavilion.result import parsers, ResultError, base
+from pavilion.result import parsers, ResultError, base, evaluations
 from pavilion.test_run import TestRun
 from pavilion.unittest import PavTestCase
 
@@ -521,6 +521,30 @@ class ResultParserTests(PavTestCase):
                         .format(evaluate_conf, exp_results[rkey],
                                 results[rkey], pprint.pformat(results)))
 
+    def test_evaluation_plan(self):
+        """Evaluations should be ordered by their references, and their
+        plans reused across tests."""
+
+        evals = OrderedDict()
+        evals['c'] = 'b + a'
+        evals['b'] = 'a * 2'
+        evals['a'] = 'return_value'
+        evals['d'] = '5'
+        evals['e'] = '"x" == "x"'
+
+        log = utils.IndentedLog()
+        plan = evaluations.get_evaluation_plan(evals, log)
+        self.assertEqual([key for key, _, _ in plan],
+                         ['a', 'd', 'e', 'b', 'c'])
+        self.assertIs(evaluations.get_evaluation_plan(evals, log), plan)
+
+        for return_value in 1, 2:
+            results = {'return_value': return_value}
+            evaluations.parse_evaluation_dict(evals, results, log)
+            self.assertEqual(results['c'], return_value * 3)
+            # Cached trees must survive being transformed more than once.
+            self.assertIs(results['e'], True)
+
     def test_evaluate_errors(self):
         error_confs = (
             {'val_a': 'undefined_a'},  # No such variable
@@ -616,6 +640,47 @@ class ResultParserTests(PavTestCase):
             self.fail("Result command failed: \n{}\n{}"
                       .format(cmd_out, cmd_err))
 
+    def test_result_cmd_jobs(self):
+        """Regathering results in parallel should give the same results
+        as doing it serially, and --save should log every test."""
+
+        result_cmd = commands.get_command('result')
+        result_cmd.silence()
+        run_cmd = commands.get_command('run')  # type: run.RunCommand
+        run_cmd.silence()
+
+        arg_parser = arguments.get_parser()
+        run_args = arg_parser.parse_args(['run', 'result_tests.*'])
+        if run_cmd.run(self.pav_cfg, run_args) != 0:
+            cmd_out, cmd_err = run_cmd.clear_output()
+            self.fail("Run command failed: \n{}\n{}".format(cmd_out, cmd_err))
+
+        for test in run_cmd.last_tests:
+            test.wait(3)
+
+        test_ids = tuple(str(test.id) for test in run_cmd.last_tests)
+
+        outputs = []
+        for jobs in '1', '3':
+            res_args = arg_parser.parse_args(
+                ('result', '--re-run', '--json', '--jobs', jobs) + test_ids)
+            self.assertEqual(result_cmd.run(self.pav_cfg, res_args), 0)
+            data, _ = result_cmd.clear_output()
+            outputs.append(json.loads(data))
+
+        self.assertEqual(outputs[0], outputs[1])
+
+        with self.pav_cfg['result_log'].open() as results_log:
+            log_len = len(results_log.readlines())
+
+        res_args = arg_parser.parse_args(
+            ('result', '--save', '--jobs', '2') + test_ids)
+        self.assertEqual(result_cmd.run(self.pav_cfg, res_args), 0)
+
+        with self.pav_cfg['result_log'].open() as results_log:
+            self.assertEqual(len(results_log.readlines()),
+                             log_len + len(test_ids))
+
     def test_re_search(self):
         """Check basic re functionality."""
 
@@ -781,3 +846,123 @@ class ResultParserTests(PavTestCase):
 
         self.assertEqual(flattened, answer)
         self.assertEqual(unflattened, answer)
+
+    def test_shared_file_parsing(self):
+        """Keys that parse the same files (with overlapping match positions)
+        should get the same results as when parsed on their own."""
+
+        cfg = self._quick_test_cfg()
+        cfg['run']['cmds'] = [
+            'echo "start"',
+            'echo "val 1"',
+            'echo "val 2"',
+            'echo "start"',
+            'echo "val 3"',
+            'echo "other 4"',
+        ]
+        cfg['result_parse'] = {
+            'regex': {
+                'first': {'regex': r'val (\d)'},
+                'last': {'regex': r'val (\d)', 'match_select': 'last'},
+                'all': {'regex': r'val (\d)', 'match_select': 'all'},
+                'after_start': {
+                    'regex': r'\w+ (\d)',
+                    'preceded_by': [r'start'],
+                    'match_select': 'all',
+                },
+                'missing': {
+                    'regex': r'val (\d)',
+                    'files': ['nope.txt'],
+                }
+            }
+        }
+
+        expected = {
+            'first': '1',
+            'last': '3',
+            'all': ['1', '2', '3'],
+            'after_start': ['1', '3'],
+            'missing': None,
+        }
+
+        test = self._quick_test(cfg, 'shared_file_test')
+        test.run()
+        results = test.gather_results(0)
+
+        for key in expected:
+            self.assertEqual(results.get(key), expected[key], msg=key)
+
+        self.assertIn("No matches for glob 'nope.txt' under key 'missing'",
+                      results[result.RESULT_ERRORS])
+
+    def test_fused_conditions(self):
+        """Match conditions are combined into a single regex where possible.
+        Make sure conditions that can't be combined still work."""
+
+        cfg = self._quick_test_cfg()
+        cfg['run']['cmds'] = [
+            'echo "Speed: 5"',
+            'echo "aa 6"',
+            'echo "flops 7"',
+        ]
+        cfg['result_parse'] = {
+            'regex': {
+                'speed': {'regex': r'(?i)speed: (\d)'},
+                'double': {'regex': r'(a)\1 (\d)'},
+                'flops': {
+                    'regex': r'(\d)',
+                    'for_lines_matching': r'^flops',
+                },
+                'named': {'regex': r'(?P<val>\d)', 'preceded_by': ['aa']},
+            }
+        }
+
+        test = self._quick_test(cfg, 'fused_cond_test')
+        test.run()
+        results = test.gather_results(0)
+
+        self.assertEqual(results['speed'], 5)
+        self.assertEqual(results['double'], ['a', 6])
+        self.assertEqual(results['flops'], 7)
+        self.assertEqual(results['named'], 7)
+
+    def test_scan_modes(self):
+        """Files are scanned as memory mapped bytes when possible, and in
+        text mode otherwise. Both should give the same results."""
+
+        cfg = self._quick_test_cfg()
+        cfg['run']['cmds'] = [
+            'printf "héllo 1\\nworld 2\\nend\\n" > mapped.out',
+            'printf "héllo 1\\r\\nworld 2\\r\\nend\\r\\n" > text.out',
+            'touch empty.out',
+        ]
+        cfg['result_parse'] = {
+            'regex': {
+                'hello': {
+                    'regex': r'\w+ (\d)$',
+                    'files': ['*.out'],
+                    'per_file': 'name',
+                },
+                'world': {
+                    'regex': r'(\d)',
+                    'preceded_by': [r'^h\wllo'],
+                    'files': ['*.out'],
+                    'per_file': 'name',
+                },
+                'ends': {
+                    'regex': r'^end$',
+                    'files': ['*.out'],
+                    'per_file': 'name',
+                    'action': 'store_true',
+                },
+            }
+        }
+
+        test = self._quick_test(cfg, 'scan_mode_test')
+        test.run()
+        results = test.gather_results(0)
+
+        for name in 'mapped', 'text':
+            self.assertEqual(results['per_file'][name],
+                             {'hello': 1, 'world': 2, 'ends': True})
+        self.assertFalse(results['per_file']['empty']['ends'])
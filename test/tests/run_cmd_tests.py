@@ -67,6 +67,37 @@ class RunCmdTests(PavTestCase):
             else:
                 self.assertEqual(test.scheduler, 'dummy')
 
+    def test_stream_tests(self):
+        """Test runs should be created as the stream of configs they come
+        from is consumed."""
+
+        pulled = []
+
+        def configs():
+            """Track which configs have been taken."""
+            for ptest in cmd_utils.iter_test_configs(
+                    pav_cfg=self.pav_cfg, host='this', test_files=[],
+                    tests=['hello_world'], modes=[], overrides={}):
+                pulled.append(ptest)
+                yield ptest
+
+        orig_threads = cmd_utils.CREATE_TEST_THREADS
+        cmd_utils.CREATE_TEST_THREADS = 1
+        try:
+            stream = cmd_utils.iter_configs_to_tests(self.pav_cfg, configs())
+            tests = [next(stream)]
+            self.assertEqual(len(pulled), 1)
+            tests.extend(stream)
+        finally:
+            cmd_utils.CREATE_TEST_THREADS = orig_threads
+
+        self.assertEqual(len(pulled), 3)
+        self.assertEqual([test.config for test in tests],
+                         [ptest.config for ptest in pulled])
+        self.assertEqual(
+            sorted(test.name for test in tests),
+            ['hello_world.hello', 'hello_world.narf', 'hello_world.world'])
+
     def test_run(self):
 
         arg_parser = arguments.get_parser()
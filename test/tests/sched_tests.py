@@ -1,5 +1,6 @@
 import inspect
 import re
+import time
 
 from pavilion import plugins
 from pavilion import schedulers
@@ -116,3 +117,31 @@ class SchedTests(PavTestCase):
         testlist = pav_cfg['env_setup']
         self.assertTrue(set(testlist).issubset(lines))
         self.assertTrue(re.match(r'pav _run.*', lines[-1]))
+
+    def test_schedule_tests(self):
+        """Check that tests can be scheduled in parallel."""
+
+        tests = [self._quick_test(name='sched_tests{}'.format(i))
+                 for i in range(4)]
+
+        scheduled = []
+        schedulers.schedule_tests(self.pav_cfg, tests, max_threads=3,
+                                  progress=scheduled.append)
+
+        self.assertEqual(sorted(test.id for test in scheduled),
+                         sorted(test.id for test in tests))
+
+        for test in tests:
+            self.assertIsNotNone(test.job_id)
+            test.wait(timeout=10)
+            self.assertEqual(test.status.current().state, 'COMPLETE')
+
+    def test_rate_limiter(self):
+        """Check that submissions are spaced out by the rate limiter."""
+
+        limiter = schedulers._RateLimiter(0.1)
+        start = time.time()
+        for _ in range(4):
+            limiter.wait()
+
+        self.assertGreaterEqual(time.time() - start, 0.3)
@@ -0,0 +1,89 @@
+import shutil
+
+from pavilion import plugins
+from pavilion import series_summary
+from pavilion import utils
+from pavilion.series import TestSeries, SeriesInfo
+from pavilion.unittest import PavTestCase
+
+
+class SeriesSummaryTests(PavTestCase):
+
+    def setUp(self):
+        plugins.initialize_plugins(self.pav_cfg)
+
+    def tearDown(self):
+        plugins._reset_plugins()
+
+    def test_series_summary(self):
+        """Check that the series summary tracks the state of its tests, and
+        that series info comes from it."""
+
+        tests = [self._quick_test(name='summary_test_{}'.format(i))
+                 for i in range(3)]
+        tests[0].result = tests[0].PASS
+        tests[0].set_run_complete()
+
+        series = TestSeries(self.pav_cfg, tests)
+
+        summary = series_summary.load(series.path)
+        self.assertIsNotNone(summary)
+        self.assertEqual(summary['num_tests'], 3)
+        self.assertEqual(summary['complete'], 1)
+        self.assertEqual(summary['passed'], 1)
+        self.assertEqual(summary['failed'], 0)
+        self.assertEqual(summary['user'], utils.get_login())
+        for test in tests:
+            self.assertEqual(test.series, series.sid)
+
+        # The tests update the summary as they change.
+        tests[1].result = tests[1].FAIL
+        tests[1].set_run_complete()
+        tests[2].result = tests[2].PASS
+        tests[2].save_attributes()
+
+        sinfo = SeriesInfo(series.path)
+        self.assertFalse(sinfo.complete)
+        self.assertEqual(sinfo.num_tests, 3)
+        self.assertEqual(sinfo.num_complete, 2)
+        self.assertEqual(sinfo.passed, 2)
+        self.assertEqual(sinfo.failed, 1)
+        self.assertEqual(sinfo.sys_name, tests[0].sys_name)
+
+        tests[2].set_run_complete()
+        self.assertTrue(SeriesInfo(series.path).complete)
+
+        # Series without a summary are examined the slow way.
+        (series.path/series_summary.SUMMARY_FN).unlink()
+        sinfo = SeriesInfo(series.path)
+        self.assertTrue(sinfo.complete)
+        self.assertEqual(sinfo.num_tests, 3)
+        self.assertEqual(sinfo.passed, 2)
+        self.assertEqual(sinfo.sys_name, tests[0].sys_name)
+
+    def test_series_summary_repair(self):
+        """Check that summaries left behind by failed updates (or deleted
+        tests) are fixed when they're read."""
+
+        tests = [self._quick_test(name='summary_repair_{}'.format(i))
+                 for i in range(3)]
+        series = TestSeries(self.pav_cfg, tests)
+        sum_path = series.path/series_summary.SUMMARY_FN
+
+        # Have the summary miss an update.
+        orig_summary = sum_path.read_text()
+        tests[0].result = tests[0].PASS
+        tests[0].set_run_complete()
+        sum_path.write_text(orig_summary)
+        shutil.rmtree(tests[1].path.as_posix())
+
+        sinfo = SeriesInfo(series.path)
+        self.assertEqual(sinfo.num_tests, 2)
+        self.assertEqual(sinfo.num_complete, 1)
+        self.assertEqual(sinfo.passed, 1)
+
+        # The summary file itself was fixed too.
+        summary = series_summary.load(series.path)
+        self.assertEqual(summary['num_tests'], 2)
+        self.assertEqual(summary['complete'], 1)
+        self.assertNotIn(str(tests[1].id), summary['tests'])
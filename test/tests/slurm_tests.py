@@ -2,6 +2,8 @@ import subprocess
 import time
 import unittest
 import logging
+import os
+from pathlib import Path
 
 from pavilion import config
 from pavilion import plugins
@@ -167,6 +169,45 @@ class SlurmTests(PavTestCase):
         self.assertEqual(sched_status.state, STATES.SCHEDULED)
         self.assertIn('COMPLETED', sched_status.note)
 
+    @unittest.skipIf(not has_slurm(), "Only runs on a system with slurm.")
+    def test_job_statuses(self):
+        """Make sure batched job status queries agree with individual ones."""
+
+        cfg = self._quick_test_cfg()
+        cfg['scheduler'] = 'slurm'
+
+        slurm = schedulers.get_plugin('slurm')
+
+        tests = []
+        for i in range(slurm.JOB_STATUS_BATCH_MIN + 1):
+            test = self._quick_test(cfg, name='slurm_job_statuses',
+                                    finalize=False)
+            test.status.set(STATES.SCHEDULED, "not really though.")
+            test.job_id = self._get_job('JobState=RUNNING')
+            tests.append(test)
+        missing = tests[-1]
+        missing.job_id = 'not_a_job'
+
+        statuses = slurm.job_statuses(self.pav_cfg, tests)
+        self.assertEqual(len(statuses), len(tests))
+        for status in statuses[:-1]:
+            self.assertEqual(status.state, STATES.SCHEDULED)
+            self.assertIn('RUNNING', status.note)
+        self.assertEqual(statuses[-1].state, STATES.SCHED_ERROR)
+
+        # The job info should be cached for single job queries too.
+        self.assertIsNotNone(slurm._cached_job_info())
+        status = slurm.job_status(self.pav_cfg, tests[0])
+        self.assertEqual(status.state, STATES.SCHEDULED)
+
+        # Jobs that aren't in the cached info (because they were submitted
+        # after it was gathered) should still be found.
+        slurm._job_info_cache = (time.time(), {})
+        statuses = slurm.job_statuses(self.pav_cfg, tests)
+        for status in statuses[:-1]:
+            self.assertEqual(status.state, STATES.SCHEDULED)
+        self.assertEqual(statuses[-1].state, STATES.SCHED_ERROR)
+
     @unittest.skipIf(not has_slurm(), "Only runs on a system with slurm.")
     def test_sched_vars(self):
         """Make sure the scheduler vars are reasonable when not on a node."""
@@ -229,6 +270,98 @@ class SlurmTests(PavTestCase):
 
         self.assertEqual(status.state, STATES.SCHED_CANCELLED)
 
+    def test_time_limits(self):
+        """Check slurm time limit conversion."""
+
+        slurm = schedulers.get_plugin('slurm')
+
+        for time_limit, secs in (
+                ('5', 5*60),
+                ('5:30', 5*60 + 30),
+                ('1:05:30', 3600 + 5*60 + 30),
+                ('2-3', 2*86400 + 3*3600),
+                ('2-3:04', 2*86400 + 3*3600 + 4*60),
+                ('2-3:04:05', 2*86400 + 3*3600 + 4*60 + 5)):
+            self.assertEqual(slurm._time_limit_secs(time_limit), secs)
+
+    @unittest.skipIf(not has_slurm(), "Only runs on a system with slurm.")
+    def test_run_suite(self):
+        """Check that tests sharing an allocation are packed together and
+        all run."""
+
+        slurm = schedulers.get_plugin('slurm')
+
+        cfg = self._quick_test_cfg()
+        cfg['scheduler'] = 'slurm'
+        cfg.setdefault('slurm', {})
+        cfg['slurm']['share_allocation'] = 'serial'
+        cfg['slurm']['time_limit'] = '5'
+        tests = [self._quick_test(cfg, name='slurm_suite{}'.format(i))
+                 for i in range(3)]
+        cfg['slurm']['share_allocation'] = 'false'
+        tests.append(self._quick_test(cfg, name='slurm_suite_alone'))
+
+        packed = slurm.pack_tests(tests)
+        self.assertEqual(sorted(len(group) for group in packed), [1, 3])
+        self.assertEqual(slurm._suite_time_limit(tests[:3], False),
+                         '0-00:15:00')
+
+        schedulers.schedule_tests(self.pav_cfg, tests, max_threads=2)
+
+        self.assertEqual(len(set(test.job_id for test in tests[:3])), 1)
+        self.assertNotEqual(tests[0].job_id, tests[3].job_id)
+
+        for test in tests:
+            test.wait(timeout=self.TEST_TIMEOUT)
+            self.assertEqual(test.status.current().state, STATES.COMPLETE)
+
+    def test_cancel_shared_jobs(self):
+        """Check that tests sharing a job only scancel that job once, and
+        that scancel failures are attributed to the right tests."""
+
+        slurm = schedulers.get_plugin('slurm')
+
+        # A stand-in scancel that records its arguments, and fails for
+        # job '3' the way scancel does.
+        bin_dir = Path(self.tmp_dir.name)/'bin'
+        bin_dir.mkdir()
+        args_path = bin_dir/'scancel.args'
+        scancel = bin_dir/'scancel'
+        scancel.write_text(
+            '#!/bin/sh\n'
+            'echo "$@" >> {}\n'
+            'for id in "$@"; do\n'
+            '    if [ "$id" = 3 ]; then\n'
+            '        echo "scancel: error: Kill job error on job id 3: '
+            'Invalid job id specified" >&2\n'
+            '        exit 1\n'
+            '    fi\n'
+            'done\n'.format(args_path))
+        scancel.chmod(0o755)
+
+        tests = []
+        for job_id in '1', '2', '1', '3', '1':
+            test = self._quick_test(build=False, finalize=False)
+            test.job_id = job_id
+            tests.append(test)
+
+        orig_path = os.environ['PATH']
+        os.environ['PATH'] = '{}:{}'.format(bin_dir, orig_path)
+        try:
+            statuses = slurm.cancel_jobs(tests)
+        finally:
+            os.environ['PATH'] = orig_path
+
+        self.assertEqual(args_path.read_text().split(), ['1', '2', '3'])
+        self.assertEqual([status.state for status in statuses],
+                         [STATES.SCHED_CANCELLED]*len(tests))
+        for test, status in zip(tests, statuses):
+            self.assertEqual('failed' in status.note, test.job_id == '3')
+
+        self.assertEqual(
+            slurm._scancel_failures('no job ids here', ['4', '5']),
+            {'4': 'no job ids here', '5': 'no job ids here'})
+
     @unittest.skipIf(not has_slurm(), "Only runs on a system with slurm.")
     def test_node_range(self):
         """Make sure node ranges work properly."""
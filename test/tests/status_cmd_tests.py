@@ -4,6 +4,7 @@ from pavilion import schedulers
 from pavilion import status_file
 from pavilion.series import TestSeries
 from pavilion.test_config import file_format, VariableSetManager
+from pavilion.plugins.commands import status
 from pavilion.unittest import PavTestCase
 from pavilion.test_run import TestRun
 import argparse
@@ -296,3 +297,27 @@ class StatusCmdTests(PavTestCase):
 
         # Testing that summary flags return correctly
         self.assertEqual(status_cmd.run(self.pav_cfg, args), 0)
+
+    def test_light_statuses(self):
+        """Check that statuses read without loading the test runs match
+        those from the test run objects."""
+
+        base_cfg = self._quick_test_cfg()
+        tests = []
+        for name in 'test1', 'test2', 'test3':
+            cfg = base_cfg.copy()
+            cfg['name'] = name
+            tests.append(self._quick_test(cfg, build=False, finalize=False))
+
+        tests[0].status.set(status_file.STATES.RUNNING, "running")
+        (tests[0].path/'run.log').touch()
+        tests[1].status.set(status_file.STATES.BUILDING, "building")
+        tests[2].status.set(status_file.STATES.COMPLETE, "done")
+
+        test_ids = [test.id for test in tests]
+        statuses = status.get_test_statuses(self.pav_cfg, test_ids)
+        full_statuses = status.statuses_from_test_objs(self.pav_cfg, tests)
+
+        self.assertEqual([stat['test_id'] for stat in statuses], test_ids)
+        for stat, full_stat in zip(statuses, full_statuses):
+            self.assertEqual(stat, full_stat)
@@ -1,6 +1,7 @@
 """Tests for various utils functions."""
 
 import datetime as dt
+import json
 import os
 import tempfile
 from pathlib import Path
@@ -123,3 +124,28 @@ class UtilsTests(unittest.PavTestCase):
                     self.assertFalse(Path(os.readlink(str(path))).is_absolute())
                 with path.open() as file:
                     self.assertEqual(file.read(), answer)
+
+    def test_atomic_write(self):
+        """Check that atomic writes replace the file whole, keep permissions
+        when asked, and leave nothing behind on failure."""
+
+        tmpdir = Path(tempfile.mkdtemp())
+        path = tmpdir/'data.json'
+
+        utils.atomic_write_json(path, {'a': 1})
+        path.chmod(0o640)
+        utils.atomic_write_json(path, {'a': 2}, keep_perms=True)
+        with path.open() as file:
+            self.assertEqual(json.load(file), {'a': 2})
+        self.assertEqual(path.stat().st_mode & 0o777, 0o640)
+
+        with self.assertRaises(TypeError):
+            utils.atomic_write_json(path, {'a': object()})
+        with self.assertRaises(RuntimeError):
+            with utils.atomic_write(path, 'wb') as file:
+                file.write(b'partial')
+                raise RuntimeError("Interrupted")
+
+        self.assertEqual(os.listdir(str(tmpdir)), ['data.json'])
+        with path.open() as file:
+            self.assertEqual(json.load(file), {'a': 2})
@@ -186,3 +186,55 @@ class TestVariables(PavTestCase):
                 pass
             else:
                 self.fail("Did not raise the appropriate error.")
+
+    def test_permutations(self):
+        """Check that permutations share unmodified values with the base
+        variable manager, and copy them on write."""
+
+        data = {
+            'var1': ['a', 'b', 'c'],
+            'var2': [{'x': '1', 'y': '2'}, {'x': '3', 'y': '4'}],
+            'var3': 'val3',
+        }
+
+        var_man = variables.VariableSetManager()
+        var_man.add_var_set('var', data)
+        var_man.add_var_set('sys', {'host': 'foo'})
+
+        per_vars = [('var', 'var1'), ('var', 'var2')]
+        perms = var_man.iter_permutations(per_vars)
+        # Permutations are generated lazily.
+        self.assertNotIsInstance(perms, list)
+        perms = list(perms)
+
+        self.assertEqual(len(perms), 6)
+        self.assertEqual(
+            [(perm['var1'], perm['var2.x']) for perm in perms],
+            [('a', '1'), ('a', '3'), ('b', '1'),
+             ('b', '3'), ('c', '1'), ('c', '3')])
+        self.assertEqual(perms, var_man.get_permutations(per_vars))
+
+        # Unpermuted values are shared rather than copied.
+        perm = perms[0]
+        self.assertIs(perm.variable_sets['sys'].data['host'],
+                      var_man.variable_sets['sys'].data['host'])
+        self.assertIs(perm.variable_sets['var'].data['var3'],
+                      var_man.variable_sets['var'].data['var3'])
+
+        # Modifying a shared value only changes that permutation.
+        perm._set_value('var3', 'new')
+        self.assertEqual(perm['var3'], 'new')
+        self.assertEqual(perms[1]['var3'], 'val3')
+        self.assertEqual(var_man['var3'], 'val3')
+
+        # And modifying the base doesn't change the permutations.
+        var_man._set_value('sys.host', 'bar')
+        self.assertEqual(perms[1]['sys.host'], 'foo')
+
+        # A single permutation is just the original.
+        self.assertEqual(list(var_man.iter_permutations([('var', 'var3')])),
+                         [var_man])
+        self.assertIs(var_man.get_permutations([])[0], var_man)
+
+        with self.assertRaises(KeyError):
+            var_man.iter_permutations([('var', 'nope')])
@@ -0,0 +1,93 @@
+"""
+Pavilion startup time benchmark.
+
+Usage: python3 startup_bench.py [-n RUNS] [--baseline FILE [--save]]
+                                [--tolerance PCT] [-- PAV_ARGS...]
+
+Times how long it takes to run 'bin/pav' with the given arguments ('status'
+by default), which is mostly Pavilion's startup time: finding and loading
+the config, setting up logging, and loading plugins. The first run is
+thrown away, as it may have to (re)build the plugin manifest.
+
+Given a baseline file, the median run time is compared against the one
+saved there, and this exits with an error if it's more than --tolerance
+percent slower. Use --save to (re)write the baseline.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PAV_PATH = Path(__file__).resolve().parents[2]/'bin'/'pav'
+
+
+def time_run(pav_args):
+    """Run pav once with the given arguments, and return how long it took."""
+
+    start = time.time()
+    subprocess.run([str(PAV_PATH)] + pav_args,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark Pavilion's startup time.")
+    parser.add_argument('-n', '--runs', type=int, default=20,
+                        help="The number of timed runs.")
+    parser.add_argument('--baseline', type=Path,
+                        help="A file of baseline times to compare against.")
+    parser.add_argument('--save', action='store_true', default=False,
+                        help="Save these times as the baseline.")
+    parser.add_argument('--tolerance', type=float, default=20,
+                        help="How much slower (in percent) than the baseline "
+                             "to allow.")
+    parser.add_argument('pav_args', nargs='*', default=['status'],
+                        help="The pav arguments to time.")
+    args = parser.parse_args()
+
+    # Warm up (and build any caches).
+    time_run(args.pav_args)
+
+    times = [time_run(args.pav_args) for _ in range(args.runs)]
+    results = {
+        'args': args.pav_args,
+        'runs': args.runs,
+        'min': min(times),
+        'median': statistics.median(times),
+        'mean': statistics.mean(times),
+    }
+
+    print("pav {}: min {min:.3f}s, median {median:.3f}s, mean {mean:.3f}s "
+          "over {runs} runs".format(' '.join(args.pav_args), **results))
+
+    if args.baseline is None:
+        return 0
+
+    if args.save:
+        with args.baseline.open('w') as baseline_file:
+            json.dump(results, baseline_file, indent=2)
+        print("Saved baseline to {}".format(args.baseline))
+        return 0
+
+    with args.baseline.open() as baseline_file:
+        baseline = json.load(baseline_file)
+
+    change = (results['median'] / baseline['median'] - 1) * 100
+    print("Median is {:+.1f}% compared to the baseline ({:.3f}s)."
+          .format(change, baseline['median']))
+
+    if change > args.tolerance:
+        print("Startup is more than {}% slower than the baseline."
+              .format(args.tolerance))
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())